@@ -1,10 +1,13 @@
 # ruff: noqa: F401
 
 from .auth import verify_apple_token, get_apple_fullname
+from .jwks import apple_keys, google_certs, google_certs_request
+from .password import authenticate_user, hash_password, password_hasher
 from .registration import register_user, set_phone, send_otp_to_user, validate_phone
 from .oauth2 import create_access_token
 from .service import get_services
-from .location import get_locations
+from .location import get_locations, get_locations_payload, search_addresses
+from .settlement import search_settlements, settlements_index
 from .user import (
     search_users,
     get_user_profile,
@@ -17,17 +20,53 @@ from .job import (
     search_jobs,
     get_jobs_on_home_page,
     job_statistics,
+    refresh_job_statistics,
     filter_jobs_by_locations,
     filter_and_order_jobs,
     create_out_search_jobs,
     get_job,
+    get_job_by_uuid,
     get_pending_jobs,
     get_in_progress_jobs,
     get_archived_jobs,
+    paginate_jobs_by_status,
+    create_jobs_by_status,
+    get_jobs_required_rates,
     get_completed_jobs_without_rate,
 )
-from .rate import update_user_average_rate, update_users_average_rate
-from .file import is_image_file, is_video_file, get_file_type, delete_file, create_file
+from .search import filter_jobs_by_search_query, search_jobs_ranked
+from .rate import (
+    add_user_rate,
+    change_user_rate,
+    fix_users_rates,
+)
+from .file import (
+    is_image_file,
+    is_video_file,
+    get_file_type,
+    create_file,
+    create_files,
+    upload_file,
+    create_presigned_upload,
+    complete_presigned_upload,
+)
+from .file_deletion import (
+    get_file_keys,
+    queue_file_deletion,
+    delete_file,
+    delete_queued_files,
+    collect_orphan_files,
+)
+from .image_variants import generate_files_variants, get_files_without_variants
 from .application import reject_other_not_accepted_applications
 
-from .push_notification import send_created_job_notification, notification_is_read_by_user
+from .push_notification import (
+    create_new_job_notification,
+    dispatch_notification,
+    notification_is_read_by_user,
+    get_user_notifications,
+    get_unread_notifications_count,
+    mark_notifications_as_read,
+)
+from .push_dispatcher import dispatch_push_notifications
+from .push_receipts import check_push_receipts
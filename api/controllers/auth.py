@@ -1,31 +1,37 @@
 import jwt
-
-from jwt import PyJWKClient
+import requests
+from fastapi import HTTPException, status
 
 from app import schema as s
 from config import config
 from app.logger import log
 
-CFG = config()
-
+from .jwks import apple_keys
 
-JWKS_CLIENT = PyJWKClient(CFG.APPLE_PUBLIC_KEY_URL)
+CFG = config()
 
 
 def verify_apple_token(auth_data: s.AppleAuthTokenIn) -> s.AppleTokenVerification:
     """Verifies the Apple auth token and returns the decoded token"""
-    # Fetch Apple's public keys
-    signing_key = JWKS_CLIENT.get_signing_key_from_jwt(auth_data.id_token)
-    apple_public_key = signing_key.key
-
-    # Verify the signature using the fetched public key
-    decoded_token_raw = jwt.decode(
-        auth_data.id_token,
-        apple_public_key,
-        issuer=CFG.APPLE_ISSUER,
-        audience=CFG.MOBILE_APP_ID,
-        algorithms=CFG.APPLE_DECODE_ALGORITHMS,
-    )
+    try:
+        # Apple's public keys are cached
+        signing_key = apple_keys.get_signing_key(auth_data.id_token)
+
+        # Verify the signature using the fetched public key
+        decoded_token_raw = jwt.decode(
+            auth_data.id_token,
+            signing_key.key,
+            issuer=CFG.APPLE_ISSUER,
+            audience=CFG.MOBILE_APP_ID,
+            algorithms=CFG.APPLE_DECODE_ALGORITHMS,
+        )
+    except jwt.InvalidTokenError as e:
+        log(log.ERROR, "Invalid apple token: %s", e)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid token")
+    except (requests.RequestException, ValueError) as e:
+        # keys request failed or returned invalid JSON
+        log(log.ERROR, "Apple public keys are not available: %s", e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Apple keys are not available")
 
     log(log.INFO, "Apple token verified, response: %s", decoded_token_raw)
 
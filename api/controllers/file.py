@@ -1,17 +1,29 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import NamedTuple
 from uuid import uuid4
+
+import filetype
+import sqlalchemy as sa
 from fastapi import UploadFile, status, HTTPException
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
+from jose import JWTError, jwt
 from mypy_boto3_s3 import S3Client
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app import schema as s
 from app import models as m
 
+from api.utils import FILE_HEADER_SIZE
 from app.logger import log
 from config import config
 
+from .file_deletion import cancel_file_deletion, queue_file_deletion, queue_pending_upload_deletion
+
 S3_UPLOAD_EXTRAS = {"ACL": "public-read-write"}
 
 RE_SPECIAL_CHARACTERS = "[^a-zA-Z0-9 \n\.]"
@@ -19,89 +31,265 @@ RE_SPECIAL_CHARACTERS = "[^a-zA-Z0-9 \n\.]"
 
 CFG = config()
 
+# big files are sent to S3 in multipart parts, parts of one file are sent concurrently
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=CFG.S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=CFG.S3_UPLOAD_PART_SIZE,
+    max_concurrency=CFG.S3_UPLOAD_CONCURRENCY,
+)
+# parts read from file and not yet sent, bounds memory of one upload
+S3_TRANSFER_CONFIG.max_in_memory_upload_chunks = CFG.S3_UPLOAD_CONCURRENCY
 
-def create_file(
+# bounded pool of file uploads, files of one request are uploaded in parallel
+upload_executor = ThreadPoolExecutor(max_workers=CFG.S3_UPLOAD_MAX_FILES, thread_name_prefix="upload")
+
+
+class UploadedFile(NamedTuple):
+    uuid: str
+    original_name: str
+    name: str
+    key: str
+    file_type: s.FileType
+
+
+def create_file_key(original_name: str, extension: str, file_name_url: str) -> tuple[str, str, str]:
+    """Returns uuid, unique name and S3 key of new file"""
+    filename_without_special_characters = re.sub(RE_SPECIAL_CHARACTERS, "", original_name)
+    filename_without_spaces = filename_without_special_characters.replace(" ", "_")
+    file_uuid = str(uuid4())
+    filename = f"{file_uuid}_{filename_without_spaces}"
+    short_name = filename.split(".")[0]
+
+    key = f"{file_name_url}/{short_name}" + f".{extension}"
+    return file_uuid, filename, key
+
+
+def upload_file(
     file: UploadFile,
-    db: Session,
     s3_client: S3Client,
     extension: str,
     file_type: s.FileType,
     content_type_override: str | None = None,
     file_name_url: str = "",
-) -> m.File:
-    try:
-        if not file.filename:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File name is required",
-            )
-        filename_without_special_characters = re.sub(RE_SPECIAL_CHARACTERS, "", file.filename)
-        filename_without_spaces = filename_without_special_characters.replace(" ", "_")
-        file_uuid = str(uuid4())
-        filename = f"{file_uuid}_{filename_without_spaces}"
-        short_name = filename.split(".")[0]
-
-        key = f"{file_name_url}/{short_name}" + f".{extension}"
-        log(log.INFO, "[create_file] key is %s", key)
-
-        # Create a BytesIO stream from the file bytes
+) -> UploadedFile:
+    """Streams file to S3 (multipart upload for big files), file is not read to memory at once"""
+    if not file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File name is required",
+        )
+    file_uuid, filename, key = create_file_key(file.filename, extension, file_name_url)
+    log(log.INFO, "[upload_file] key is %s", key)
 
-        extras = {
-            **S3_UPLOAD_EXTRAS,
-        }
+    extras = {
+        **S3_UPLOAD_EXTRAS,
+    }
 
-        if content_type_override:
-            extras["ContentType"] = content_type_override
+    if content_type_override:
+        extras["ContentType"] = content_type_override
 
+    file.file.seek(0)
+    try:
         s3_client.upload_fileobj(
-            file.file,  # Pass the BytesIO stream
+            file.file,
             CFG.AWS_S3_BUCKET_NAME,
             key,
             ExtraArgs=extras,
+            Config=S3_TRANSFER_CONFIG,
         )
-
-        file_model = m.File(
-            type=file_type.value,
-            uuid=file_uuid,
-            original_name=file.filename,
-            name=filename,
-            key=key,
-        )
-        db.add(file_model)
-        db.commit()
-        db.refresh(file_model)
-        log(log.INFO, "[create_file] file [%s] was created", file_model.name)
-        return file_model
     except ClientError as e:
-        log(log.ERROR, "[create_file] Error uploading file to S3 - [%s]", e)
+        log(log.ERROR, "[upload_file] Error uploading file to S3 - [%s]", e)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Error while uploading file to storage",
         )
+    return UploadedFile(file_uuid, file.filename, filename, key, file_type)
+
+
+def save_files(db: Session, uploaded_files: list[UploadedFile]) -> list[m.File]:
+    file_models = [
+        m.File(
+            type=uploaded_file.file_type.value,
+            uuid=uploaded_file.uuid,
+            original_name=uploaded_file.original_name,
+            name=uploaded_file.name,
+            key=uploaded_file.key,
+        )
+        for uploaded_file in uploaded_files
+    ]
+    try:
+        db.add_all(file_models)
+        db.commit()
     except SQLAlchemyError as e:
-        log(log.INFO, "[create_file] file [%s] was not created:\n %s", file_model.name, e)
+        log(log.INFO, "[save_files] files were not created:\n %s", e)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="file exists")
+    for file_model in file_models:
+        log(log.INFO, "[save_files] file [%s] was created", file_model.name)
+    return file_models
+
+
+def create_file(
+    file: UploadFile,
+    db: Session,
+    s3_client: S3Client,
+    extension: str,
+    file_type: s.FileType,
+    content_type_override: str | None = None,
+    file_name_url: str = "",
+) -> m.File:
+    uploaded_file = upload_file(file, s3_client, extension, file_type, content_type_override, file_name_url)
+    return save_files(db, [uploaded_file])[0]
 
 
-def delete_file(
+def create_files(
+    files: list[tuple[UploadFile, str, s.FileType]],
     db: Session,
-    file: m.File,
     s3_client: S3Client,
-) -> None:
+    file_name_url: str = "",
+) -> list[m.File]:
+    """Uploads files (with their extension and type) to S3 in parallel and saves them to db"""
+
+    futures = [
+        upload_executor.submit(upload_file, file, s3_client, extension, file_type, file_name_url=file_name_url)
+        for file, extension, file_type in files
+    ]
+    uploaded_files: list[UploadedFile] = []
+    error: Exception | None = None
+    # all uploads are finished before cleanup, so no file is left in S3 by running upload
+    for future in futures:
+        try:
+            uploaded_files.append(future.result())
+        except Exception as e:
+            log(log.ERROR, "[create_files] File was not uploaded: %s", e)
+            error = error or e
+    if error:
+        # files of request are saved all or none
+        queue_file_deletion(db, [uploaded_file.key for uploaded_file in uploaded_files])
+        db.commit()
+        if isinstance(error, HTTPException):
+            raise error
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Error while uploading file to storage")
+
     try:
-        s3_client.delete_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=file.key)
-    except ClientError as e:
-        log(log.ERROR, "Error deleting file from S3 - [%s]", e)
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Error occurred while deleting file from S3",
+        return save_files(db, uploaded_files)
+    except HTTPException:
+        db.rollback()
+        queue_file_deletion(db, [uploaded_file.key for uploaded_file in uploaded_files])
+        db.commit()
+        raise
+
+
+def create_presigned_upload(
+    file_in: s.FileUploadIn,
+    uploader_id: int,
+    db: Session,
+    s3_client: S3Client,
+    file_types: tuple[s.FileType, ...],
+    max_size: int,
+    file_name_url: str,
+) -> s.FileUploadOut:
+    """Returns presigned POST which lets client upload file straight to S3 (only of declared type and size)"""
+
+    file_kind = filetype.get_type(mime=file_in.content_type)
+    if not file_kind or get_file_type(file_kind.extension) not in file_types:
+        log(log.ERROR, "Unknown file content type [%s]", file_in.content_type)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown file extension")
+    if file_in.size > max_size:
+        log(log.ERROR, "File [%s] is too large: [%d]", file_in.filename, file_in.size)
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File is too large")
+
+    file_uuid, filename, key = create_file_key(file_in.filename, file_kind.extension, file_name_url)
+    fields = {"acl": S3_UPLOAD_EXTRAS["ACL"], "Content-Type": file_in.content_type}
+    presigned_post = s3_client.generate_presigned_post(
+        CFG.AWS_S3_BUCKET_NAME,
+        key,
+        Fields=fields,
+        Conditions=[
+            {"acl": fields["acl"]},
+            {"Content-Type": fields["Content-Type"]},
+            ["content-length-range", file_in.size, file_in.size],
+        ],
+        ExpiresIn=CFG.S3_PRESIGNED_UPLOAD_EXPIRATION,
+    )
+
+    token_data = s.FileUploadToken(
+        aud=s.FILE_UPLOAD_TOKEN_AUDIENCE,
+        uploader_id=uploader_id,
+        uuid=file_uuid,
+        name=filename,
+        original_name=file_in.filename,
+        key=key,
+        content_type=file_in.content_type,
+        size=file_in.size,
+        exp=datetime.utcnow() + timedelta(seconds=CFG.S3_PRESIGNED_UPLOAD_EXPIRATION),
+    )
+    # object is deleted if upload is not completed
+    queue_pending_upload_deletion(db, key)
+    db.commit()
+    log(log.INFO, "[create_presigned_upload] key is %s", key)
+    return s.FileUploadOut(
+        url=presigned_post["url"],
+        fields=presigned_post["fields"],
+        key=key,
+        upload_token=jwt.encode(token_data.model_dump(), CFG.JWT_SECRET),
+        expires_in=CFG.S3_PRESIGNED_UPLOAD_EXPIRATION,
+    )
+
+
+def complete_presigned_upload(
+    upload_token: str,
+    uploader_id: int,
+    db: Session,
+    s3_client: S3Client,
+    file_name_url: str,
+) -> m.File:
+    """Validates file uploaded with presigned POST (size, type and magic bytes) and saves it to db"""
+
+    try:
+        token_data = s.FileUploadToken.model_validate(
+            jwt.decode(upload_token, CFG.JWT_SECRET, audience=s.FILE_UPLOAD_TOKEN_AUDIENCE)
         )
+    except (JWTError, ValidationError):
+        log(log.ERROR, "Invalid upload token")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload token")
+    if token_data.uploader_id != uploader_id or not token_data.key.startswith(f"{file_name_url}/"):
+        log(log.ERROR, "Upload token of [%s] is not valid for user [%s]", token_data.key, uploader_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload token")
+
+    # completion may be repeated by client
+    file_model = db.scalar(sa.select(m.File).where(m.File.key == token_data.key))
+    if file_model:
+        return file_model
+
     try:
-        db.delete(file)
+        head = s3_client.head_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=token_data.key)
+    except ClientError as e:
+        log(log.ERROR, "[complete_presigned_upload] File [%s] was not uploaded - [%s]", token_data.key, e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File was not uploaded")
+
+    file_kind = None
+    if head["ContentLength"] == token_data.size and head.get("ContentType") == token_data.content_type:
+        # type is checked by magic bytes of the first chunk, not by declared content type
+        header = s3_client.get_object(
+            Bucket=CFG.AWS_S3_BUCKET_NAME, Key=token_data.key, Range=f"bytes=0-{FILE_HEADER_SIZE - 1}"
+        )["Body"].read()
+        file_kind = filetype.guess(header)
+    if not file_kind or file_kind.mime != token_data.content_type:
+        log(log.ERROR, "File [%s] does not match upload: [%s]", token_data.key, file_kind and file_kind.mime)
+        cancel_file_deletion(db, [token_data.key])
+        queue_file_deletion(db, [token_data.key])
         db.commit()
-    except SQLAlchemyError as e:
-        log(log.INFO, "file [%s] was not deleted:\n %s", file.name, e)
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="file exists")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File does not match its type or size")
+
+    uploaded_file = UploadedFile(
+        token_data.uuid,
+        token_data.original_name,
+        token_data.name,
+        token_data.key,
+        get_file_type(file_kind.extension),
+    )
+    cancel_file_deletion(db, [token_data.key])
+    return save_files(db, [uploaded_file])[0]
 
 
 def is_image_file(extension: str) -> bool:
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import sqlalchemy as sa
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, status
+from mypy_boto3_s3 import S3Client
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models as m
+from app.logger import log
+from config import config
+
+CFG = config()
+
+deletions = m.file_deletions
+
+
+def get_file_keys(file: m.File) -> list[str]:
+    """S3 keys of file and its variants"""
+    return [file.key, *(variant["key"] for variant in file.variants or [])]
+
+
+def queue_file_deletion(db: Session, keys: Sequence[str]):
+    """Puts S3 keys to deletion queue, objects are deleted later by delete-files command"""
+    if keys:
+        db.execute(sa.insert(deletions), [dict(key=key) for key in keys])
+
+
+def queue_pending_upload_deletion(db: Session, key: str):
+    """Queues deletion of presigned upload, it is cancelled when upload is completed"""
+    db.execute(
+        sa.insert(deletions).values(
+            key=key, next_attempt_at=datetime.utcnow() + timedelta(seconds=CFG.PENDING_UPLOAD_MAX_AGE)
+        )
+    )
+
+
+def cancel_file_deletion(db: Session, keys: Sequence[str]):
+    if keys:
+        db.execute(sa.delete(deletions).where(deletions.c.key.in_(keys)))
+
+
+def delete_file(db: Session, file: m.File) -> None:
+    """Deletes file from db, its objects are deleted from S3 later"""
+    try:
+        queue_file_deletion(db, get_file_keys(file))
+        db.delete(file)
+        db.commit()
+    except SQLAlchemyError as e:
+        log(log.INFO, "file [%s] was not deleted:\n %s", file.name, e)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="file exists")
+
+
+def delete_queued_files(db: Session, s3_client: S3Client) -> int:
+    """Deletes objects of queued keys from S3 (up to CFG.FILE_DELETIONS_BATCH keys by one request).
+    Returns count of processed keys
+    """
+
+    now = datetime.utcnow()
+    rows = db.execute(
+        sa.select(deletions.c.id, deletions.c.key, deletions.c.attempts)
+        .where(deletions.c.next_attempt_at <= now, deletions.c.attempts < CFG.FILE_DELETION_MAX_ATTEMPTS)
+        .order_by(deletions.c.next_attempt_at, deletions.c.id)
+        .limit(CFG.FILE_DELETIONS_BATCH)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.commit()
+        return 0
+
+    # lease keys, so they are deleted again later if request fails
+    db.execute(
+        sa.update(deletions)
+        .where(deletions.c.id.in_([row.id for row in rows]))
+        .values(
+            attempts=deletions.c.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=CFG.FILE_DELETION_LEASE_SECONDS),
+        )
+    )
+    db.commit()
+
+    try:
+        response = s3_client.delete_objects(
+            Bucket=CFG.AWS_S3_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in {row.key for row in rows}], "Quiet": True},
+        )
+    except ClientError as e:
+        log(log.ERROR, "[delete_queued_files] Error deleting files from S3 - [%s]", e)
+        return 0
+
+    # only failed keys are returned in quiet mode, they are retried after lease
+    errors = {error["Key"]: error.get("Message") or error.get("Code", "") for error in response.get("Errors", [])}
+    if errors:
+        db.execute(
+            sa.update(deletions)
+            .where(deletions.c.id == sa.bindparam("deletion_id"))
+            .values(error=sa.bindparam("deletion_error")),
+            [dict(deletion_id=row.id, deletion_error=errors[row.key][:256]) for row in rows if row.key in errors],
+        )
+    db.execute(sa.delete(deletions).where(deletions.c.id.in_([row.id for row in rows if row.key not in errors])))
+    db.commit()
+
+    log(log.INFO, "Files deleted from S3: [%d], failed: [%d]", len(rows) - len(errors), len(errors))
+    return len(rows)
+
+
+def collect_orphan_files(db: Session) -> int:
+    """Deletes files which are not attached to job or user avatar for CFG.ORPHAN_FILE_MAX_AGE.
+    Returns count of deleted files
+    """
+
+    updated_before = datetime.utcnow() - timedelta(seconds=CFG.ORPHAN_FILE_MAX_AGE)
+    is_orphan = (
+        m.File.updated_at < updated_before,
+        ~sa.exists().where(m.files_job.c.file_id == m.File.id),
+        ~sa.exists().where(m.User.avatar_id == m.File.id),
+    )
+    batch = sa.select(m.File.id).where(*is_orphan).order_by(m.File.id).limit(CFG.FILE_DELETIONS_BATCH)
+    # conditions are part of DELETE itself, keys are queued only for files which were still orphans
+    files = db.scalars(
+        sa.delete(m.File)
+        .where(m.File.id.in_(batch.scalar_subquery()), *is_orphan)
+        .returning(m.File)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not files:
+        return 0
+
+    queue_file_deletion(db, [key for file in files for key in get_file_keys(file)])
+    db.commit()
+
+    log(log.INFO, "Orphan files deleted: [%d]", len(files))
+    return len(files)
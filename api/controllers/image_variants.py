@@ -0,0 +1,120 @@
+import io
+from typing import Sequence
+
+import sqlalchemy as sa
+from botocore.exceptions import ClientError
+from mypy_boto3_s3 import S3Client
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from sqlalchemy.orm import Session
+
+from app import models as m
+from app import schema as s
+from app.logger import log
+from config import config
+
+from .file import S3_UPLOAD_EXTRAS
+from .file_deletion import cancel_file_deletion, queue_file_deletion
+
+CFG = config()
+
+# formats supported by installed Pillow
+VARIANT_FORMATS = [image_format for image_format in CFG.IMAGE_VARIANT_FORMATS if features.check(image_format)]
+
+
+def get_variant_key(key: str, name: str, image_format: str) -> str:
+    """Key of derivative next to original: jobs/files/abc.jpg -> jobs/files/abc_thumbnail.webp"""
+    return f"{key.rsplit('.', 1)[0]}_{name}.{image_format}"
+
+
+def create_image_variants(image: Image.Image) -> list[tuple[str, Image.Image]]:
+    """Returns square thumbnail and images fitted to CFG.IMAGE_VARIANT_WIDTHS (original is not upscaled)"""
+    variants = [
+        (
+            "thumbnail",
+            ImageOps.fit(image, (CFG.IMAGE_THUMBNAIL_SIZE, CFG.IMAGE_THUMBNAIL_SIZE), Image.Resampling.LANCZOS),
+        )
+    ]
+    for width in sorted(CFG.IMAGE_VARIANT_WIDTHS):
+        if width >= image.width:
+            break
+        variant = image.copy()
+        variant.thumbnail((width, width * image.height // image.width), Image.Resampling.LANCZOS)
+        variants.append((str(width), variant))
+    return variants
+
+
+def generate_file_variants(file: m.File, db: Session, s3_client: S3Client) -> list[dict]:
+    """Stores derivatives of image file to S3, returns their description (empty if file is not an image)"""
+
+    if file.type != s.FileType.IMAGE.value:
+        return []
+    s3_object = s3_client.get_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=file.key)
+    if s3_object["ContentLength"] > CFG.IMAGE_VARIANT_MAX_SOURCE_SIZE:
+        s3_object["Body"].close()
+        log(log.WARNING, "[generate_file_variants] File [%s] is too large for variants", file.key)
+        return []
+    try:
+        image: Image.Image = Image.open(io.BytesIO(s3_object["Body"].read()))
+        # JPEG is decoded at reduced scale if the largest variant is much smaller
+        largest = max([CFG.IMAGE_THUMBNAIL_SIZE, *CFG.IMAGE_VARIANT_WIDTHS])
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        log(log.ERROR, "[generate_file_variants] File [%s] is not a valid image: %s", file.key, e)
+        return []
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    variants: list[dict] = []
+    for name, variant in create_image_variants(image):
+        for image_format in VARIANT_FORMATS:
+            buffer = io.BytesIO()
+            variant.save(buffer, format=image_format.upper(), quality=CFG.IMAGE_VARIANT_QUALITY)
+            key = get_variant_key(file.key, name, image_format)
+            buffer.seek(0)
+            try:
+                s3_client.upload_fileobj(
+                    buffer,
+                    CFG.AWS_S3_BUCKET_NAME,
+                    key,
+                    ExtraArgs={
+                        **S3_UPLOAD_EXTRAS,
+                        "ContentType": f"image/{image_format}",
+                        # key of variant changes with original, so variants are cached forever
+                        "CacheControl": "public, max-age=31536000, immutable",
+                    },
+                )
+            except Exception:
+                # file keeps no variants, already uploaded ones would not be deleted with it
+                queue_file_deletion(db, [variant["key"] for variant in variants])
+                db.commit()
+                raise
+            variants.append(dict(name=name, format=image_format, width=variant.width, height=variant.height, key=key))
+    # keys could be queued for deletion by failed previous run
+    cancel_file_deletion(db, [variant["key"] for variant in variants])
+    log(log.INFO, "[generate_file_variants] File [%s] variants: [%d]", file.key, len(variants))
+    return variants
+
+
+def get_files_without_variants(db: Session) -> Sequence[int]:
+    return db.scalars(
+        sa.select(m.File.id).where(m.File.variants.is_(None), m.File.is_deleted.is_(False)).order_by(m.File.id)
+    ).all()
+
+
+def generate_files_variants(db: Session, s3_client: S3Client, file_ids: Sequence[int]) -> int:
+    """Generates variants of selected files which have none yet. Returns count of processed files"""
+
+    files = db.scalars(
+        sa.select(m.File).where(m.File.id.in_(file_ids), m.File.variants.is_(None), m.File.is_deleted.is_(False))
+    ).all()
+    for file in files:
+        try:
+            file.variants = generate_file_variants(file, db, s3_client)
+        except ClientError as e:
+            # original is not in S3 (yet) or variant was not uploaded, file is tried again by next run of command
+            log(log.ERROR, "[generate_files_variants] File [%s] variants were not created: %s", file.key, e)
+            continue
+        db.commit()
+    return len(files)
@@ -1,12 +1,16 @@
-from typing import Sequence
+from datetime import datetime
+from typing import NamedTuple, Sequence
 from fastapi import HTTPException, status
 
 import sqlalchemy as sa
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
 
-from api.utils import format_location_string
+from api.utils import decode_cursor, encode_cursor, format_location_string
+from .search import filter_jobs_by_search_query, search_jobs_ranked
 import app.models as m
 import app.schema as s
+from app.controllers import region_names
+from app.database import dialect_insert
 from app.schema.language import Language
 from config import config
 from app.logger import log
@@ -15,11 +19,40 @@ from app.utilities import pop_keys
 
 CFG = config()
 CARDS_LIMIT = 10
+MIN_SORT_DATE = datetime(1970, 1, 1)
 
 service_alias = aliased(m.Service)
 
 
+def create_job_cards(jobs: Sequence[m.Job], lang: str | None, saved_job_ids: set[int], db: Session) -> list[s.JobCard]:
+    """Creates list of JobCard from jobs"""
+
+    cards: list[s.JobCard] = []
+
+    for job in jobs:
+        # None == All Ukraine
+        location = None
+
+        if job.location_id is not None:
+            location = region_names.get(job.location_id, db).location_strings(lang)
+
+        cards.append(
+            s.JobCard(
+                id=job.id,
+                uuid=job.uuid,
+                title=job.title,
+                description=job.description,
+                cost=job.cost or 0,
+                is_saved=job.id in saved_job_ids,
+                location=location,
+            )
+        )
+    return cards
+
+
 def get_jobs_on_home_page(query: s.JobHomePage, current_user: m.User, db: Session) -> s.JobsCardList:
+    """Returns job cards for home page. Number of queries doesn't depend on number of jobs"""
+
     stmt = sa.select(m.Job).where(
         sa.and_(
             m.Job.is_deleted.is_(False),
@@ -28,45 +61,21 @@ def get_jobs_on_home_page(query: s.JobHomePage, current_user: m.User, db: Sessio
         )
     )
 
-    recommended_jobs: Sequence[m.Job] = db.scalars(stmt.order_by(m.Job.id)).fetchmany(CARDS_LIMIT)
+    recommended_jobs: Sequence[m.Job] = db.scalars(stmt.order_by(m.Job.id).limit(CARDS_LIMIT)).all()
 
     if query.location_uuid:
         stmt = stmt.join(m.Location).where(m.Location.uuid == query.location_uuid)
 
-    jobs_near_you: Sequence[m.Job] = db.scalars(stmt).fetchmany(CARDS_LIMIT)
-    user_saved_jobs: Sequence[m.Job] = db.scalars(
-        sa.select(m.Job).join(m.SavedJob).where(m.SavedJob.user_id == current_user.id)
-    ).all()
+    jobs_near_you: Sequence[m.Job] = db.scalars(stmt.limit(CARDS_LIMIT)).all()
 
-    recommended_jobs_out = [
-        s.JobCard(
-            location=s.LocationStrings(
-                uuid=job.location.uuid,
-                name=job.location.region[0].name_ua if query.lang == CFG.UA else job.location.region[0].name_en,
-            ),
-            is_saved=job in user_saved_jobs,
-            # TODO: remove location from job.__dict__ add like property in Job model
-            **pop_keys(job.__dict__, ["location"]),
-        )
-        for job in recommended_jobs
-    ]
-    jobs_near_you_out = [
-        s.JobCard(
-            location=s.LocationStrings(
-                uuid=job.location.uuid,
-                name=job.location.region[0].name_ua if query.lang == CFG.UA else job.location.region[0].name_en,
-            ),
-            is_saved=job in user_saved_jobs,
-            # TODO: remove location from job.__dict__ add like property in Job model
-            **pop_keys(job.__dict__, ["location"]),
-        )
-        for job in jobs_near_you
-    ]
+    saved_job_ids: set[int] = set(
+        db.scalars(sa.select(m.saved_jobs.c.job_id).where(m.saved_jobs.c.user_id == current_user.id)).all()
+    )
 
     return s.JobsCardList(
         lang=query.lang,
-        recommended_jobs=recommended_jobs_out,
-        jobs_near_you=jobs_near_you_out,
+        recommended_jobs=create_job_cards(recommended_jobs, query.lang, saved_job_ids, db),
+        jobs_near_you=create_job_cards(jobs_near_you, query.lang, saved_job_ids, db),
     )
 
 
@@ -79,29 +88,23 @@ def search_jobs(query: s.JobSearchIn, me: m.User, db: Session) -> s.JobsSearchOu
         )
     )
 
-    if query.query:
-        stmt = stmt.where(
-            sa.or_(
-                m.Job.title.ilike(f"%{query.query}%"),
-                m.Job.description.ilike(f"%{query.query}%"),
-            )
-        )
-
     if query.selected_services:
         stmt = stmt.join(m.JobService).join(service_alias).where(service_alias.name.in_(query.selected_services))
 
     if query.selected_locations:
         stmt = stmt.join(m.Location).where(m.Location.name_ua.in_(query.selected_locations))
 
-    jobs: Sequence[m.Job] = db.scalars(stmt).all()
+    jobs: Sequence[m.Job] = search_jobs_ranked(stmt, query.query or "", db)
     return s.JobsSearchOut(
         lang=query.lang,
         query=query.query,
         jobs=[
             s.JobSearch(
-                location=s.LocationStrings(
-                    uuid=job.location.uuid,
-                    name=job.location.region[0].name_ua if query.lang == CFG.UA else job.location.region[0].name_en,
+                # None == All Ukraine
+                location=(
+                    region_names.get(job.location_id, db).location_strings(query.lang)
+                    if job.location_id is not None
+                    else None
                 ),
                 is_saved=False,
                 **pop_keys(job.__dict__, ["location"]),
@@ -111,27 +114,67 @@ def search_jobs(query: s.JobSearchIn, me: m.User, db: Session) -> s.JobsSearchOu
     )
 
 
+def refresh_job_statistics(db: Session, location_ids: Sequence[int | None] | None = None):
+    """Recalculates jobs and experts counts of locations (all locations if location_ids is None)"""
+
+    stmt = (
+        sa.select(
+            m.Job.location_id,
+            sa.func.count(m.Job.id).label("jobs_count"),
+            sa.func.count(sa.func.distinct(m.Job.worker_id)).label("experts_count"),
+        )
+        .where(m.Job.location_id.is_not(None))
+        .group_by(m.Job.location_id)
+    )
+    if location_ids is not None:
+        location_ids = [location_id for location_id in location_ids if location_id is not None]
+        if not location_ids:
+            return
+        stmt = stmt.where(m.Job.location_id.in_(location_ids))
+
+    rows = {row.location_id: row for row in db.execute(stmt)}
+    # locations left without jobs are kept with zero counts
+    values = [
+        dict(
+            location_id=location_id,
+            jobs_count=rows[location_id].jobs_count if location_id in rows else 0,
+            experts_count=rows[location_id].experts_count if location_id in rows else 0,
+        )
+        for location_id in (rows if location_ids is None else set(location_ids))
+    ]
+
+    if location_ids is None:
+        db.execute(sa.delete(m.JobStatistics).where(m.JobStatistics.location_id.not_in(list(rows))))
+    if values:
+        insert_stmt = dialect_insert(m.JobStatistics, db).values(values)
+        db.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[m.JobStatistics.location_id],
+                set_=dict(
+                    jobs_count=insert_stmt.excluded.jobs_count,
+                    experts_count=insert_stmt.excluded.experts_count,
+                    updated_at=sa.func.now(),
+                ),
+            )
+        )
+    log(log.DEBUG, "Job statistics refreshed for [%d] locations", len(values))
+
+
 def job_statistics(db: Session) -> s.PublicJobDict:
     """
-    Get statistics for jobs and experts per location
+    Get statistics for jobs and experts per location (precomputed by refresh_job_statistics)
     """
 
-    jobs_count = sa.func.count(m.Job.id)
-    experts_count = sa.func.count(sa.func.distinct(m.Job.worker_id))
-
-    stmt = sa.select(m.Job.location_id, jobs_count, experts_count).group_by(m.Job.location_id)
-    result = db.execute(stmt).all()
+    stmt = sa.select(m.JobStatistics).where(m.JobStatistics.jobs_count > 0).order_by(m.JobStatistics.location_id)
 
     result_dict = {
-        int(row[0]): s.PublicJobStatistics(jobs_count=row[1], experts_count=row[2])
-        for row in result
-        if row[0] is not None
+        statistics.location_id: s.PublicJobStatistics.model_validate(statistics) for statistics in db.scalars(stmt)
     }
     return s.PublicJobDict(statistics=result_dict)
 
 
 def filter_jobs_by_locations(
-    selected_locations: list[str] | None, db: Session, current_user: m.User, db_jobs: sa.Select
+    selected_locations: list[str] | None, db: Session, current_user: s.UserPrincipal, db_jobs: sa.Select
 ):
     if selected_locations:
         if CFG.ALL_UKRAINE in selected_locations:
@@ -140,52 +183,97 @@ def filter_jobs_by_locations(
         locations = db.execute(sa.select(m.Location).where(m.Location.uuid.in_(selected_locations))).scalars().all()
         db_jobs = db_jobs.where(m.Job.location.has(m.Location.uuid.in_([loc.uuid for loc in locations])))
     else:
-        db_jobs = db_jobs.where(m.Job.location.has(m.Location.uuid.in_([loc.uuid for loc in current_user.locations])))
+        db_jobs = db_jobs.where(m.Job.location_id.in_(current_user.location_ids))
 
     return db_jobs
 
 
+def get_jobs_sort_key(order_by: s.JobsOrderBy, current_user: s.UserPrincipal) -> sa.ColumnElement:
+    """Returns not nullable sort key used for ordering and keyset pagination of jobs"""
+
+    if order_by == s.JobsOrderBy.START_DATE:
+        return sa.func.coalesce(m.Job.start_date, MIN_SORT_DATE)
+    if order_by == s.JobsOrderBy.COST:
+        return sa.func.coalesce(m.Job.cost, 0)
+    if order_by == s.JobsOrderBy.NEAR:
+        return sa.case((m.Job.location_id.in_(current_user.location_ids), 1), else_=0)
+    return sa.func.coalesce(m.Job.created_at, MIN_SORT_DATE)
+
+
+def decode_jobs_cursor(cursor: str, order_by: s.JobsOrderBy) -> tuple[datetime | float, int]:
+    """Decodes jobs cursor into last sort key value and last job id"""
+
+    cursor_values = decode_cursor(cursor)
+
+    try:
+        last_sort_value, last_id = cursor_values
+        if order_by in (s.JobsOrderBy.CREATED_AT, s.JobsOrderBy.START_DATE):
+            last_sort_value = datetime.fromisoformat(last_sort_value)
+        elif not isinstance(last_sort_value, (int, float)):
+            raise ValueError("Sort value must be a number")
+        if not isinstance(last_id, int):
+            raise ValueError("Job id must be an integer")
+    except (TypeError, ValueError) as e:
+        log(log.ERROR, "Invalid jobs cursor [%s]: %s", cursor, e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return last_sort_value, last_id
+
+
 def filter_and_order_jobs(
-    query: str, lang: Language, db: Session, current_user: m.User, db_jobs: sa.Select, order_by: s.JobsOrderBy
-):
-    """Filters and orders users by query params"""
-
-    query = query.strip()
-
-    if query:
-        if lang == Language.UA:
-            search_by_service = m.Job.services.any(m.Service.name_ua.ilike(f"%{query}%"))
-        else:
-            search_by_service = m.Job.services.any(m.Service.name_en.ilike(f"%{query}%"))
-
-        db_jobs = db_jobs.where(sa.or_(m.Job.title.ilike(f"%{query}%"), search_by_service))
-
-    # TODO: Finalize default ordering
-    if order_by == s.JobsOrderBy.CREATED_AT:
-        users = db.execute(db_jobs.order_by(m.Job.created_at.desc())).scalars().all()
-    elif order_by == s.JobsOrderBy.START_DATE:
-        users = db.execute(db_jobs.order_by(m.Job.start_date.desc())).scalars().all()
-    elif order_by == s.JobsOrderBy.COST:
-        users = db.execute(db_jobs.order_by(m.Job.cost.desc())).scalars().all()
-    elif order_by == s.UsersOrderBy.NEAR:
-        users = (
-            db.execute(
-                db_jobs.order_by(
-                    m.Job.location.has(m.Location.id.in_([loc.id for loc in current_user.locations])).desc()
-                )
-            )
-            .scalars()
-            .all()
-        )
+    query: str,
+    db: Session,
+    current_user: s.UserPrincipal,
+    db_jobs: sa.Select,
+    order_by: s.JobsOrderBy,
+    ascending: bool = True,
+    limit: int = CFG.JOBS_PAGE_LIMIT,
+    cursor: str | None = None,
+) -> tuple[Sequence[m.Job], str | None]:
+    """Filters and orders jobs by query params. Returns page of jobs and cursor of the next page"""
+
+    db_jobs = filter_jobs_by_search_query(db_jobs, query, db)
+
+    sort_key = get_jobs_sort_key(order_by, current_user)
+
+    # ascending=True keeps the previous default order: the newest (nearest, most expensive) jobs first
+    is_descending = ascending
+
+    if cursor:
+        last_sort_value, last_id = decode_jobs_cursor(cursor, order_by)
+        last_key = sa.tuple_(sa.literal(last_sort_value, sort_key.type), sa.literal(last_id))
+        job_key = sa.tuple_(sort_key, m.Job.id)
+        db_jobs = db_jobs.where(job_key < last_key if is_descending else job_key > last_key)
+
+    if is_descending:
+        db_jobs = db_jobs.order_by(None).order_by(sort_key.desc(), m.Job.id.desc())
     else:
-        users = db.execute(db_jobs).scalars().all()
+        db_jobs = db_jobs.order_by(None).order_by(sort_key.asc(), m.Job.id.asc())
+
+    rows = db.execute(db_jobs.add_columns(sort_key).limit(limit + 1)).all()
 
-    return users
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_job, last_sort_value = rows[-1]
+        next_cursor = encode_cursor([last_sort_value, last_job.id])
 
+    return [row[0] for row in rows], next_cursor
 
-def create_out_search_jobs(db_jobs: Sequence[m.Job], lang: Language, current_user: m.User) -> list[s.JobOutput]:
+
+def create_out_search_jobs(
+    db_jobs: Sequence[m.Job], lang: Language, current_user: s.UserPrincipal, db: Session
+) -> list[s.JobOutput]:
     """Creates list of JobOutput from db jobs"""
 
+    favorite_job_ids = set(
+        db.scalars(
+            sa.select(m.favorite_jobs.c.job_id).where(
+                m.favorite_jobs.c.user_id == current_user.id,
+                m.favorite_jobs.c.job_id.in_([db_job.id for db_job in db_jobs]),
+            )
+        )
+    )
     jobs: list[s.JobOutput] = []
 
     for db_job in db_jobs:
@@ -197,11 +285,8 @@ def create_out_search_jobs(db_jobs: Sequence[m.Job], lang: Language, current_use
         # None == All Ukraine
         location = None
 
-        if db_job.location is not None:
-            location = s.LocationStrings(
-                name=db_job.location.region[0].name_ua if lang == Language.UA else db_job.location.region[0].name_en,
-                uuid=db_job.location.uuid,
-            )
+        if db_job.location_id is not None:
+            location = region_names.get(db_job.location_id, db).location_strings(lang)
 
         jobs.append(
             s.JobOutput(
@@ -216,12 +301,32 @@ def create_out_search_jobs(db_jobs: Sequence[m.Job], lang: Language, current_use
                 files=[s.File.model_validate(file) for file in db_job.files],
                 services=services,
                 location=location,
-                is_favorite=db_job in current_user.favorite_jobs,
+                is_favorite=db_job.id in favorite_job_ids,
             )
         )
     return jobs
 
 
+def get_job_by_uuid(job_uuid: str, db: Session) -> m.Job | None:
+    """Returns job with owner, worker, files, services and applicants loaded for job info"""
+
+    applicants = selectinload(m.Job.applications).joinedload(m.Application.worker)
+    return db.scalar(
+        sa.select(m.Job)
+        .where(m.Job.uuid == job_uuid)
+        .options(
+            joinedload(m.Job.owner),
+            joinedload(m.Job.worker),
+            joinedload(m.Job.address),
+            selectinload(m.Job.services),
+            selectinload(m.Job.files),
+            # worker location names are taken from region names cache
+            applicants.selectinload(m.User.services),
+            applicants.selectinload(m.User.locations),
+        )
+    )
+
+
 def get_job(job: m.Job, lang: Language, db: Session, job_owner: m.User) -> s.JobInfo:
     ALL_UKRAINE = "Вся Україна" if lang == Language.UA else "All Ukraine"
 
@@ -232,8 +337,8 @@ def get_job(job: m.Job, lang: Language, db: Session, job_owner: m.User) -> s.Job
             service_names.append(service.name_ua if lang == Language.UA else service.name_en)
 
     job_location = ALL_UKRAINE
-    if job.location:
-        job_location = job.location.region[0].name_ua if lang == Language.UA else job.location.region[0].name_en
+    if job.location_id:
+        job_location = region_names.get(job.location_id, db).name(lang)
 
     job_address = None
     if job.address:
@@ -245,7 +350,7 @@ def get_job(job: m.Job, lang: Language, db: Session, job_owner: m.User) -> s.Job
 
     if job.applications:
         for application in job.applications:
-            worker = db.scalar(sa.select(m.User).where(m.User.id == application.worker_id))
+            worker = application.worker
             if not worker:
                 log(log.ERROR, "Worker [%s] not found", application.worker_id)
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Worker not found")
@@ -253,11 +358,7 @@ def get_job(job: m.Job, lang: Language, db: Session, job_owner: m.User) -> s.Job
             app_location = ALL_UKRAINE
 
             if worker.locations:
-                app_location = (
-                    worker.locations[0].region[0].name_ua
-                    if lang == Language.UA
-                    else worker.locations[0].region[0].name_en
-                )
+                app_location = region_names.get(worker.locations[0].id, db).name(lang)
 
             services = []
             if worker.services:
@@ -304,179 +405,140 @@ def get_job(job: m.Job, lang: Language, db: Session, job_owner: m.User) -> s.Job
     )
 
 
-def get_pending_jobs(
-    db_jobs: Sequence[m.Job],
-    current_user: m.User,
-    job_user_status: s.JobUserStatus,
-    lang: Language,
-    db: Session,
-):
-    job_out: list[s.JobByStatus] = []
+ACTIVE_JOB_STATUSES = [s.JobStatus.IN_PROGRESS.value, s.JobStatus.APPROVED.value, s.JobStatus.ON_CONFIRMATION.value]
+ARCHIVED_JOB_STATUSES = [s.JobStatus.COMPLETED.value, s.JobStatus.CANCELED.value]
 
-    for job in db_jobs:
-        if (
-            job.owner_id == current_user.id
-            and job.status == s.JobStatus.PENDING.value
-            and job_user_status == s.JobUserStatus.OWNER
-        ):
-            job_location, job_address = format_location_string(job.location, job.address, lang)
-
-            job_out.insert(
-                0,
-                s.JobByStatus(
-                    uuid=job.uuid,
-                    title=job.title,
-                    location=job_location,
-                    address=job_address,
-                    start_date=job.start_date,
-                    end_date=job.end_date,
-                    cost=job.cost,
-                    status=s.JobStatus(job.status),
-                    required_rate_owner=job.required_rate_owner,
-                    required_rate_worker=job.required_rate_worker,
-                    files=[s.File.model_validate(file) for file in job.files],
-                ),
-            )
 
-    applications = db.scalars(
-        sa.select(m.Application).where(
-            m.Application.worker_id == current_user.id, m.Application.status == m.ApplicationStatus.PENDING
-        )
-    ).all()
+def get_user_jobs(current_user: m.User, job_user_status: s.JobUserStatus, statuses: list[str]) -> sa.Select:
+    """Returns query of user jobs (as owner or worker) with given statuses"""
+    user_column = m.Job.owner_id if job_user_status == s.JobUserStatus.OWNER else m.Job.worker_id
+    # uses (owner_id, status, updated_at) and (worker_id, status, updated_at) indexes
+    return sa.select(m.Job).where(
+        user_column == current_user.id,
+        m.Job.status.in_(statuses),
+        m.Job.is_deleted.is_(False),
+    )
 
-    if applications and job_user_status == s.JobUserStatus.WORKER:
-        app_jobs_ids = [a.job_id for a in applications]
-        jobs = [job for job in db_jobs if job.id in app_jobs_ids]
-
-        for job in jobs:
-            job_location, job_address = format_location_string(job.location, job.address, lang)
-
-            job_out.insert(
-                0,
-                s.JobByStatus(
-                    uuid=job.uuid,
-                    title=job.title,
-                    location=job_location,
-                    address=job_address,
-                    start_date=job.start_date,
-                    end_date=job.end_date,
-                    cost=job.cost,
-                    status=s.JobStatus(job.status),
-                    required_rate_owner=job.required_rate_owner,
-                    required_rate_worker=job.required_rate_worker,
-                    files=[s.File.model_validate(file) for file in job.files],
-                ),
-            )
 
-    return job_out
+def get_pending_jobs(current_user: m.User, job_user_status: s.JobUserStatus) -> sa.Select:
+    """Returns query of pending jobs of owner or jobs with pending applications of worker"""
+    if job_user_status == s.JobUserStatus.OWNER:
+        return get_user_jobs(current_user, job_user_status, [s.JobStatus.PENDING.value])
 
+    applied_jobs_ids = sa.select(m.Application.job_id).where(
+        m.Application.worker_id == current_user.id,
+        m.Application.status == m.ApplicationStatus.PENDING,
+    )
+    return sa.select(m.Job).where(m.Job.id.in_(applied_jobs_ids), m.Job.is_deleted.is_(False))
 
-def get_in_progress_jobs(
-    db_jobs: Sequence[m.Job],
-    current_user: m.User,
-    job_user_status: s.JobUserStatus,
-    lang: Language,
-):
-    jobs_out = []
 
-    if job_user_status == s.JobUserStatus.OWNER:
-        for job in db_jobs:
-            if job.owner_id == current_user.id and job.is_in_progress:
-                job_location, job_address = format_location_string(job.location, job.address, lang)
-
-                jobs_out.append(
-                    s.JobByStatus(
-                        uuid=job.uuid,
-                        title=job.title,
-                        location=job_location,
-                        address=job_address,
-                        start_date=job.start_date,
-                        end_date=job.end_date,
-                        cost=job.cost,
-                        status=s.JobStatus(job.status),
-                        required_rate_owner=job.required_rate_owner,
-                        required_rate_worker=job.required_rate_worker,
-                        files=[s.File.model_validate(file) for file in job.files],
-                    )
-                )
+def get_in_progress_jobs(current_user: m.User, job_user_status: s.JobUserStatus) -> sa.Select:
+    """Returns query of active jobs (in progress, approved and on confirmation)"""
+    return get_user_jobs(current_user, job_user_status, ACTIVE_JOB_STATUSES)
 
-    if job_user_status == s.JobUserStatus.WORKER:
-        for job in db_jobs:
-            if job.worker_id == current_user.id and job.is_in_progress:
-                job_location, job_address = format_location_string(job.location, job.address, lang)
-
-                jobs_out.append(
-                    s.JobByStatus(
-                        uuid=job.uuid,
-                        title=job.title,
-                        location=job_location,
-                        address=job_address,
-                        start_date=job.start_date,
-                        end_date=job.end_date,
-                        cost=job.cost,
-                        status=s.JobStatus(job.status),
-                        required_rate_owner=job.required_rate_owner,
-                        required_rate_worker=job.required_rate_worker,
-                        files=[s.File.model_validate(file) for file in job.files],
-                    )
-                )
 
-    return jobs_out
+def get_archived_jobs(current_user: m.User, job_user_status: s.JobUserStatus) -> sa.Select:
+    """Returns query of archived jobs (completed and canceled)"""
+    return get_user_jobs(current_user, job_user_status, ARCHIVED_JOB_STATUSES)
 
 
-def get_archived_jobs(
-    db_jobs: Sequence[m.Job],
-    current_user: m.User,
-    job_user_status: s.JobUserStatus,
-    lang: Language,
-):
-    jobs_out = []
+def paginate_jobs_by_status(
+    db_jobs: sa.Select, limit: int, cursor: str | None, db: Session
+) -> tuple[Sequence[m.Job], str | None]:
+    """Returns page of jobs (the last updated first) and cursor of the next page"""
 
-    if job_user_status == s.JobUserStatus.OWNER:
-        for job in db_jobs:
-            if job.owner_id == current_user.id and (
-                job.status == s.JobStatus.COMPLETED.value or job.status == s.JobStatus.CANCELED.value
-            ):
-                job_location, job_address = format_location_string(job.location, job.address, lang)
-
-                jobs_out.append(
-                    s.JobByStatus(
-                        uuid=job.uuid,
-                        title=job.title,
-                        location=job_location,
-                        address=job_address,
-                        start_date=job.start_date,
-                        end_date=job.end_date,
-                        cost=job.cost,
-                        status=s.JobStatus(job.status),
-                        required_rate_owner=job.required_rate_owner,
-                        required_rate_worker=job.required_rate_worker,
-                        files=[s.File.model_validate(file) for file in job.files],
-                    )
-                )
+    if cursor:
+        cursor_values = decode_cursor(cursor)
+        try:
+            last_updated_at, last_id = cursor_values
+            last_updated_at = datetime.fromisoformat(last_updated_at)
+            if not isinstance(last_id, int):
+                raise ValueError("Job id must be an integer")
+        except (TypeError, ValueError) as e:
+            log(log.ERROR, "Invalid jobs cursor [%s]: %s", cursor, e)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
-    if job_user_status == s.JobUserStatus.WORKER:
-        for job in db_jobs:
-            if job.worker_id == current_user.id and (
-                job.status == s.JobStatus.COMPLETED.value or job.status == s.JobStatus.CANCELED.value
-            ):
-                job_location, job_address = format_location_string(job.location, job.address, lang)
-
-                jobs_out.append(
-                    s.JobByStatus(
-                        uuid=job.uuid,
-                        title=job.title,
-                        location=job_location,
-                        address=job_address,
-                        start_date=job.start_date,
-                        end_date=job.end_date,
-                        cost=job.cost,
-                        status=s.JobStatus(job.status),
-                        required_rate_owner=job.required_rate_owner,
-                        required_rate_worker=job.required_rate_worker,
-                        files=[s.File.model_validate(file) for file in job.files],
-                    )
-                )
+        last_key = sa.tuple_(sa.literal(last_updated_at, m.Job.updated_at.type), sa.literal(last_id))
+        db_jobs = db_jobs.where(sa.tuple_(m.Job.updated_at, m.Job.id) < last_key)
+
+    db_jobs = (
+        db_jobs.order_by(m.Job.updated_at.desc(), m.Job.id.desc())
+        .options(selectinload(m.Job.files), selectinload(m.Job.address))
+        .limit(limit + 1)
+    )
+    jobs = db.scalars(db_jobs).all()
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = encode_cursor([jobs[-1].updated_at, jobs[-1].id])
+
+    return jobs, next_cursor
+
+
+class RequiredRates(NamedTuple):
+    # owner or worker of completed job did not rate it yet
+    owner: bool
+    worker: bool
+
+
+def get_jobs_required_rates(db_jobs: Sequence[m.Job], db: Session) -> dict[int, RequiredRates]:
+    """Returns required rate flags of jobs (same as Job.required_rate_owner/worker) with one query"""
+
+    completed_ids = [job.id for job in db_jobs if job.status == s.JobStatus.COMPLETED.value]
+
+    # job id -> (owner rated, worker rated)
+    rated: dict[int, tuple[bool, bool]] = {}
+    if completed_ids:
+        stmt = (
+            sa.select(
+                m.Job.id,
+                sa.func.max(sa.case((m.Rate.gives_id == m.Job.owner_id, 1), else_=0)),
+                sa.func.max(sa.case((m.Rate.gives_id == m.Job.worker_id, 1), else_=0)),
+            )
+            .join(m.job_rates, m.job_rates.c.job_id == m.Job.id)
+            .join(m.Rate, m.Rate.id == m.job_rates.c.rate_id)
+            .where(m.Job.id.in_(completed_ids))
+            .group_by(m.Job.id)
+        )
+        rated = {
+            job_id: (bool(owner_rated), bool(worker_rated)) for job_id, owner_rated, worker_rated in db.execute(stmt)
+        }
+
+    required_rates: dict[int, RequiredRates] = {}
+    for job in db_jobs:
+        is_completed = job.status == s.JobStatus.COMPLETED.value
+        owner_rated, worker_rated = rated.get(job.id, (False, False))
+        required_rates[job.id] = RequiredRates(
+            owner=is_completed and not owner_rated, worker=is_completed and not worker_rated
+        )
+    return required_rates
+
+
+def create_jobs_by_status(db_jobs: Sequence[m.Job], lang: Language, db: Session) -> list[s.JobByStatus]:
+    """Creates list of JobByStatus from db jobs"""
+
+    jobs_out: list[s.JobByStatus] = []
+    required_rates = get_jobs_required_rates(db_jobs, db)
+
+    for job in db_jobs:
+        job_location, job_address = format_location_string(job.location_id, job.address, lang, db)
+
+        jobs_out.append(
+            s.JobByStatus(
+                uuid=job.uuid,
+                title=job.title,
+                location=job_location,
+                address=job_address,
+                start_date=job.start_date,
+                end_date=job.end_date,
+                cost=job.cost,
+                status=s.JobStatus(job.status),
+                required_rate_owner=required_rates[job.id].owner,
+                required_rate_worker=required_rates[job.id].worker,
+                files=[s.File.model_validate(file) for file in job.files],
+            )
+        )
 
     return jobs_out
 
@@ -487,41 +549,21 @@ def get_completed_jobs_without_rate(db: Session, current_user: m.User) -> list[s
     jobs = db.scalars(
         sa.select(m.Job)
         .where(
-            sa.or_(
-                sa.and_(
-                    m.Job.is_deleted.is_(False),
-                    m.Job.status == s.JobStatus.COMPLETED.value,
-                    m.Job.owner_id == current_user.id,
-                    ~sa.exists().where(
-                        sa.and_(
-                            m.Rate.job_id == m.Job.id,
-                            m.Rate.gives_id == current_user.id,
-                        )
-                    ),
-                ),
-                sa.and_(
-                    m.Job.is_deleted.is_(False),
-                    m.Job.status == s.JobStatus.COMPLETED.value,
-                    m.Job.worker_id == current_user.id,
-                    ~sa.exists().where(
-                        sa.and_(
-                            m.Rate.job_id == m.Job.id,
-                            m.Rate.gives_id == current_user.id,
-                        )
-                    ),
-                ),
-            )
+            m.Job.is_deleted.is_(False),
+            m.Job.status == s.JobStatus.COMPLETED.value,
+            sa.or_(m.Job.owner_id == current_user.id, m.Job.worker_id == current_user.id),
         )
         .order_by(m.Job.updated_at.desc())
     ).all()
 
-    # if not jobs:
-    #     log(log.ERROR, "Job not found")
-    #     return []
-
     log(log.INFO, "Jobs [%s] found", len(jobs))
 
-    jobs_out: list[str] = [job.uuid for job in jobs]
+    required_rates = get_jobs_required_rates(jobs, db)
+    jobs_out: list[str] = [
+        job.uuid
+        for job in jobs
+        if (required_rates[job.id].owner if job.owner_id == current_user.id else required_rates[job.id].worker)
+    ]
 
     log(log.INFO, "Jobs [%s] without rate found", len(jobs_out))
 
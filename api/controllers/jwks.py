@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from typing import Any
+
+import jwt
+import requests
+from google.auth import exceptions, transport
+
+from app.logger import log
+from config import config
+
+CFG = config()
+
+
+class KeySetCache:
+    """In-process cache of identity provider public keys (JWKS or Google certs)
+
+    Nothing is fetched at import, keys are fetched by the first login. Keys older than ttl are still used
+    while one background thread refreshes them (stale-while-revalidate). Unknown key id (keys rotation)
+    refreshes keys at once, but not more often than min_refresh_interval seconds.
+    """
+
+    def __init__(self, url: str, ttl: int, min_refresh_interval: int):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.document: dict[str, Any] | None = None
+        self.keys: dict[str, jwt.PyJWK] = {}
+        self.fetched_at = 0.0
+        self.is_refreshing = False
+        # lock guards cached keys, fetch_lock lets one thread fetch them while others use stale keys
+        self.lock = threading.Lock()
+        self.fetch_lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.document = None
+            self.keys = {}
+            self.fetched_at = 0.0
+
+    def fetch(self):
+        response = requests.get(self.url, timeout=CFG.JWKS_REQUEST_TIMEOUT)
+        response.raise_for_status()
+        document = response.json()
+        keys: dict[str, jwt.PyJWK] = {}
+        for key_data in document.get("keys", []):
+            try:
+                keys[key_data["kid"]] = jwt.PyJWK(key_data)
+            except (KeyError, jwt.PyJWKError) as e:
+                log(log.WARNING, "Skipped key of [%s]: %s", self.url, e)
+        with self.lock:
+            self.document = document
+            self.keys = keys
+            self.fetched_at = time.monotonic()
+        log(log.INFO, "Keys of [%s] fetched: [%d]", self.url, len(document.get("keys", document)))
+
+    def is_refresh_needed(self, force: bool) -> bool:
+        with self.lock:
+            age = time.monotonic() - self.fetched_at
+            return self.document is None or (force and age > self.min_refresh_interval)
+
+    def refresh(self, force: bool = False):
+        """Fetches keys if they are missing (or force is set and they are older than min_refresh_interval)"""
+        if not self.is_refresh_needed(force):
+            return
+        with self.fetch_lock:
+            # keys could be fetched by other thread while waiting
+            if self.is_refresh_needed(force):
+                self.fetch()
+
+    def refresh_in_background(self):
+        try:
+            with self.fetch_lock:
+                self.fetch()
+        except (requests.RequestException, ValueError) as e:
+            # stale keys are used until the next try
+            log(log.ERROR, "Keys of [%s] were not refreshed: %s", self.url, e)
+        finally:
+            self.is_refreshing = False
+
+    def get_document(self) -> dict[str, Any]:
+        self.refresh()
+        with self.lock:
+            if time.monotonic() - self.fetched_at > self.ttl and not self.is_refreshing:
+                self.is_refreshing = True
+                threading.Thread(target=self.refresh_in_background, daemon=True).start()
+            assert self.document is not None
+            return self.document
+
+    def get_signing_key(self, token: str) -> jwt.PyJWK:
+        """Returns JWKS key which signed token"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise jwt.InvalidTokenError("Token has no key id")
+
+        self.get_document()
+        key = self.keys.get(kid)
+        if key is None:
+            self.refresh(force=True)
+            key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown key id [{kid}]")
+        return key
+
+
+class CachedCertsResponse(transport.Response):
+    def __init__(self, document: dict[str, Any]):
+        self._data = json.dumps(document).encode()
+
+    @property
+    def status(self) -> int:
+        return 200
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"content-type": "application/json"}
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+
+class CachedCertsRequest(transport.Request):
+    """google-auth transport which answers certs requests of id_token.verify_oauth2_token from cache"""
+
+    def __init__(self, keys: KeySetCache):
+        self.keys = keys
+
+    def __call__(self, url: str, method: str = "GET", body=None, headers=None, timeout=None, **kwargs):
+        try:
+            return CachedCertsResponse(self.keys.get_document())
+        except (requests.RequestException, ValueError) as e:
+            raise exceptions.TransportError(f"Could not fetch certificates at {self.keys.url}") from e
+
+
+apple_keys = KeySetCache(CFG.APPLE_PUBLIC_KEY_URL, CFG.JWKS_CACHE_TTL, CFG.JWKS_MIN_REFRESH_INTERVAL)
+google_certs = KeySetCache(CFG.GOOGLE_CERTS_URL, CFG.JWKS_CACHE_TTL, CFG.JWKS_MIN_REFRESH_INTERVAL)
+google_certs_request = CachedCertsRequest(google_certs)
@@ -1,4 +1,7 @@
-from typing import Sequence
+import gzip
+import hashlib
+import re
+from typing import NamedTuple, Sequence
 
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
@@ -6,22 +9,93 @@ from sqlalchemy.sql.expression import Executable
 
 from app import models as m
 from app import schema as s
+from app.controllers import region_names
+from app.logger import log
+from app.models.address import normalize_address_name
 from config import config
 
 CFG = config()
 
 
-def get_locations(query: s.LocationsIn, db: Session) -> s.LocationsOut:
-    """Get locations"""
-    stmt: Executable = sa.select(m.Region).where(m.Region.is_deleted == sa.false())
+class LocationsPayload(NamedTuple):
+    version: tuple
+    locations: list[s.Location]
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+# lang -> serialized locations (with svg maps), rebuilt when regions change
+locations_payloads: dict[s.Language, LocationsPayload] = {}
+
+
+def get_locations_payload(lang: s.Language, db: Session) -> LocationsPayload:
+    """Returns precomputed locations response for language"""
+
+    # region names cache keeps current version of regions table
+    region_names.refresh(db)
+    payload = locations_payloads.get(lang)
+    if payload and payload.version == region_names.version:
+        return payload
+
+    stmt: Executable = sa.select(m.Region).where(m.Region.is_deleted == sa.false()).order_by(m.Region.id)
     db_regions: Sequence[m.Region] = db.scalars(stmt).all()
     locations: list[s.Location] = [
         s.Location(
-            uuid=region.location.uuid,
-            name=region.name_ua if query.lang == CFG.UA else region.name_en,
+            uuid=region_names.get(region.location_id, db).location_uuid,
+            name=region.name_ua if lang == s.Language.UA else region.name_en,
             svg=region.svg_value,
         )
         for region in db_regions
     ]
 
-    return s.LocationsOut(lang=query.lang, locations=locations, selected=query.selected)
+    body = s.LocationsOut(lang=lang.value, locations=locations, selected=[]).model_dump_json().encode()
+    payload = LocationsPayload(
+        version=region_names.version or (),
+        locations=locations,
+        body=body,
+        gzip_body=gzip.compress(body, mtime=0),
+        etag=f'"{hashlib.sha256(body).hexdigest()}"',
+    )
+    locations_payloads[lang] = payload
+    log(log.DEBUG, "Locations payload [%s] built: [%d] bytes", lang.value, len(body))
+    return payload
+
+
+def get_locations(query: s.LocationsIn, db: Session) -> s.LocationsOut:
+    """Get locations"""
+    lang = s.Language.UA if query.lang == CFG.UA else s.Language.EN
+    payload = get_locations_payload(lang, db)
+    return s.LocationsOut(lang=query.lang, locations=payload.locations, selected=query.selected)
+
+
+def search_addresses(query: str, city_id: str, lang: s.Language, limit: int, db: Session) -> list[s.AddressOutput]:
+    """Returns addresses of settlement which names contain all query words. Names starting with query go first"""
+
+    words = [normalize_address_name(word) for word in re.sub(CFG.RE_WORD, " ", query).split()]
+    if not words:
+        return []
+
+    is_ua_lang = lang == s.Language.UA
+    # (city_id, search_*) index narrows scan to addresses of one settlement
+    search_name = m.Address.search_ua if is_ua_lang else m.Address.search_en
+    stmt = (
+        sa.select(m.Address)
+        .where(
+            m.Address.city_id == city_id,
+            m.Address.is_deleted == sa.false(),
+            *[search_name.contains(word, autoescape=True) for word in words],
+        )
+        .order_by(
+            sa.case((search_name.startswith(words[0], autoescape=True), 0), else_=1),
+            search_name,
+        )
+        .limit(limit)
+    )
+
+    addresses: list[s.AddressOutput] = []
+    for address in db.scalars(stmt):
+        name_lang = address.line1 if is_ua_lang else address.line2
+        type_lang = address.street_type_ua if is_ua_lang else address.street_type_en
+        addresses.append(s.AddressOutput(uuid=address.street_id, name=f"{type_lang.lower()} {name_lang}".strip()))
+    return addresses
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from fastapi import status
 from jose import JWTError, jwt
@@ -5,6 +6,7 @@ from fastapi import HTTPException
 from pydantic import ValidationError
 
 import app.schema as s
+from api.utils import TTLCache
 from config import config
 
 CFG = config()
@@ -18,6 +20,9 @@ INVALID_CREDENTIALS_EXCEPTION = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+# token -> decoded token data, tokens are not decoded again by every request
+access_tokens: TTLCache[str, s.TokenData] = TTLCache(CFG.ACCESS_TOKEN_CACHE_TTL, CFG.AUTH_CACHE_SIZE)
+
 
 def create_access_token(user_id: int) -> str:
     to_encode = s.TokenData(
@@ -31,6 +36,10 @@ def create_access_token(user_id: int) -> str:
 
 
 def verify_access_token(token: str, credentials_exception) -> s.TokenData:
+    token_data = access_tokens.get(token)
+    if token_data:
+        return token_data
+
     try:
         payload = jwt.decode(token, SECRET_KEY)
         token_data = s.TokenData.model_validate(payload)
@@ -39,4 +48,6 @@ def verify_access_token(token: str, credentials_exception) -> s.TokenData:
     except JWTError:
         raise credentials_exception
 
+    # cached token is not used after it expires
+    access_tokens.set(token, token_data, token_data.exp.timestamp() - time.time())
     return token_data
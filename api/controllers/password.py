@@ -0,0 +1,117 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+import sqlalchemy as sa
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app import models as m
+from app.logger import log
+from config import config
+
+CFG = config()
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs password hashing (CPU-heavy key derivation) in a separate process pool
+
+    Requests wait not more than CFG.PASSWORD_HASH_QUEUE_TIMEOUT seconds for one of
+    workers + queue_size slots, otherwise they are rejected with 503 (backpressure).
+    With workers = 0 passwords are hashed in request thread.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self.executor: Executor | None = None
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> Executor:
+        # processes are started by the first login, not at import (before uvicorn forks workers).
+        # API worker is multi-threaded, forked child could inherit a lock held by other thread, so they are spawned
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self.executor
+
+    def reset_executor(self, executor: Executor):
+        """Drops broken pool (e.g. its process was killed), new one is started by the next login"""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        if not self.slots.acquire(timeout=CFG.PASSWORD_HASH_QUEUE_TIMEOUT):
+            log(log.WARNING, "Password hashing queue is full")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(CFG.PASSWORD_HASH_RETRY_AFTER)},
+            )
+        try:
+            if not self.workers:
+                return func(*args)
+            executor = self.get_executor()
+            try:
+                return executor.submit(func, *args).result()
+            except BrokenProcessPool as e:
+                log(log.ERROR, "Password hashing pool is broken: %s", e)
+                self.reset_executor(executor)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Try again later",
+                    headers={"Retry-After": str(CFG.PASSWORD_HASH_RETRY_AFTER)},
+                )
+        finally:
+            self.slots.release()
+
+    def hash(self, password: str) -> str:
+        return self.run(generate_password_hash, password, CFG.PASSWORD_HASH_METHOD)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self.run(check_password_hash, password_hash, password)
+
+
+password_hasher = PasswordHasher(CFG.PASSWORD_HASH_WORKERS, CFG.PASSWORD_HASH_QUEUE_SIZE)
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+
+@lru_cache
+def get_hash_method_prefix(method: str) -> str:
+    """Method with all its parameters as stored in hash: "scrypt" -> "scrypt:32768:8:1" (computed once)"""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if password was hashed by other method or cost than CFG.PASSWORD_HASH_METHOD"""
+    return password_hash.split("$", 1)[0] != get_hash_method_prefix(CFG.PASSWORD_HASH_METHOD)
+
+
+def authenticate_user(phone: str, password: str, db: Session) -> m.User | None:
+    """Returns user if password is valid. Password hash is upgraded to current method and cost on login"""
+    assert phone and password, "phone and password must be provided"
+    user = db.scalar(m.User.select().where(sa.func.lower(m.User.phone) == sa.func.lower(phone)))
+    if not user:
+        log(log.WARNING, "user:[%s] not found", phone)
+        return None
+    if not user.password_hash or not password_hasher.check(user.password_hash, password):
+        return None
+
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = password_hasher.hash(password)
+        db.commit()
+        log(log.INFO, "Password of user [%s] rehashed with [%s]", user.id, CFG.PASSWORD_HASH_METHOD)
+    return user
@@ -0,0 +1,272 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import NamedTuple, Sequence
+
+import requests
+import sqlalchemy as sa
+from exponent_server_sdk import PushClient, PushMessage, PushServerError, PushTicket
+from requests.exceptions import RequestException
+from sqlalchemy.orm import Session, selectinload
+
+from app import models as m
+from app import schema as s
+from app.logger import log
+from config import config
+
+CFG = config()
+
+outbox = m.notification_devices
+
+# bounded pool of senders, every thread keeps its own keep-alive session to Expo
+executor = ThreadPoolExecutor(max_workers=CFG.PUSH_MAX_WORKERS, thread_name_prefix="push")
+thread_local = threading.local()
+
+# per message errors which may pass on retry
+RETRYABLE_TICKET_ERRORS = (PushTicket.ERROR_MESSAGE_RATE_EXCEEDED,)
+
+
+class OutboxMessage(NamedTuple):
+    id: int
+    notification_id: int
+    device_id: int
+    attempts: int
+    message: PushMessage
+
+
+class ChunkResult(NamedTuple):
+    messages: list[OutboxMessage]
+    tickets: list[PushTicket] | None  # None if request failed
+    error: str
+    is_retryable: bool
+
+
+def get_push_client() -> PushClient:
+    """Returns Expo client with session of current thread"""
+    if not hasattr(thread_local, "session"):
+        session = requests.Session()
+        session.headers.update(
+            {
+                "Authorization": f"Bearer {CFG.EXPO_TOKEN}",
+                "accept": "application/json",
+                "accept-encoding": "gzip, deflate",
+                "content-type": "application/json",
+            }
+        )
+        thread_local.session = session
+    return PushClient(
+        host=CFG.EXPO_HOST,
+        session=thread_local.session,
+        max_message_count=CFG.PUSH_CHUNK_SIZE,
+        timeout=CFG.EXPO_REQUEST_TIMEOUT,
+    )
+
+
+def create_push_message(notification: m.PushNotification, push_token: str) -> PushMessage:
+    return PushMessage(
+        to=push_token,
+        body=notification.content,
+        title=notification.title,
+        data=notification.data,
+        priority="high",
+        channel_id="default",
+        sound="default",
+    )
+
+
+def prune_devices(db: Session, device_ids: set[int]):
+    """Marks devices with tokens not registered in Expo (app uninstalled) as deleted, no messages are sent to them"""
+    if not device_ids:
+        return
+    for device in db.scalars(sa.select(m.Device).where(m.Device.id.in_(device_ids))):
+        device.mark_as_deleted()
+    log(log.INFO, "Devices marked as deleted: [%d]", len(device_ids))
+
+
+def update_delivery_stats(db: Session, notification_ids: set[int]):
+    """Recounts delivery stats of notifications from outbox"""
+    if not notification_ids:
+        return
+
+    def count_messages(*statuses: s.PushDeliveryStatus) -> sa.ScalarSelect:
+        return (
+            sa.select(sa.func.count())
+            .where(
+                outbox.c.notification_id == m.PushNotification.id,
+                outbox.c.status.in_([status.value for status in statuses]),
+            )
+            .scalar_subquery()
+        )
+
+    db.execute(
+        sa.update(m.PushNotification)
+        .where(m.PushNotification.id.in_(notification_ids))
+        .values(
+            sent_count=count_messages(s.PushDeliveryStatus.SENT, s.PushDeliveryStatus.DELIVERED),
+            delivered_count=count_messages(s.PushDeliveryStatus.DELIVERED),
+            failed_count=count_messages(s.PushDeliveryStatus.FAILED),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_push_messages(db: Session, limit: int, notification_id: int | None = None) -> list[OutboxMessage]:
+    """Takes due messages from outbox and leases them to current dispatcher"""
+
+    now = datetime.utcnow()
+    stmt = (
+        sa.select(
+            outbox.c.id,
+            outbox.c.attempts,
+            outbox.c.notification_id,
+            outbox.c.device_id,
+            m.Device.push_token,
+            m.Device.is_deleted,
+        )
+        .join(m.Device, m.Device.id == outbox.c.device_id)
+        .where(outbox.c.status == s.PushDeliveryStatus.PENDING.value, outbox.c.next_attempt_at <= now)
+        .order_by(outbox.c.next_attempt_at, outbox.c.id)
+        .limit(limit)
+        # concurrent dispatchers (PostgreSQL) skip messages claimed by others
+        .with_for_update(of=outbox, skip_locked=True)
+    )
+    if notification_id is not None:
+        stmt = stmt.where(outbox.c.notification_id == notification_id)
+    rows = db.execute(stmt).all()
+    if not rows:
+        db.commit()
+        return []
+
+    # messages which can not be sent are failed at once
+    failed_notification_ids: set[int] = set()
+    for error, failed_rows in (
+        ("Device deleted", [row for row in rows if row.is_deleted]),
+        ("Invalid push token", [row for row in rows if not PushClient.is_exponent_push_token(row.push_token)]),
+    ):
+        if failed_rows:
+            db.execute(
+                sa.update(outbox)
+                .where(outbox.c.id.in_([row.id for row in failed_rows]))
+                .values(status=s.PushDeliveryStatus.FAILED.value, error=error)
+            )
+            failed_notification_ids.update(row.notification_id for row in failed_rows)
+    update_delivery_stats(db, failed_notification_ids)
+
+    rows = [row for row in rows if not row.is_deleted and PushClient.is_exponent_push_token(row.push_token)]
+    db.execute(
+        sa.update(outbox)
+        .where(outbox.c.id.in_([row.id for row in rows]))
+        .values(attempts=outbox.c.attempts + 1, next_attempt_at=now + timedelta(seconds=CFG.PUSH_LEASE_SECONDS))
+    )
+
+    notifications = {
+        notification.id: notification
+        for notification in db.scalars(
+            sa.select(m.PushNotification)
+            .where(m.PushNotification.id.in_({row.notification_id for row in rows}))
+            .options(selectinload(m.PushNotification.job))
+        )
+    }
+    messages = [
+        OutboxMessage(
+            row.id,
+            row.notification_id,
+            row.device_id,
+            row.attempts + 1,
+            create_push_message(notifications[row.notification_id], row.push_token),
+        )
+        for row in rows
+    ]
+    db.commit()
+
+    return messages
+
+
+def send_push_chunk(messages: list[OutboxMessage]) -> ChunkResult:
+    """Sends one request (up to CFG.PUSH_CHUNK_SIZE messages) to Expo"""
+    try:
+        tickets = get_push_client().publish_multiple([message.message for message in messages])
+    except PushServerError as exc:
+        # invalid request is not retried, overloaded server is
+        status_code = exc.response.status_code if exc.response is not None else 0
+        log(log.ERROR, "[send_push_chunk] PushServerError [%s]: %s", status_code, exc.errors or exc.message)
+        return ChunkResult(messages, None, str(exc.errors or exc.message), status_code >= 500 or status_code == 429)
+    except RequestException as exc:
+        log(log.ERROR, "[send_push_chunk] Request failed: %s", exc)
+        return ChunkResult(messages, None, str(exc), True)
+
+    return ChunkResult(messages, tickets, "", False)
+
+
+def get_retry_values(outbox_id: int, attempts: int, error: str, now: datetime) -> dict:
+    """Reschedules message with exponential backoff or fails it after CFG.PUSH_MAX_ATTEMPTS"""
+    if attempts >= CFG.PUSH_MAX_ATTEMPTS:
+        return dict(outbox_id=outbox_id, status=s.PushDeliveryStatus.FAILED.value, next_attempt_at=now, error=error)
+    delay = CFG.PUSH_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return dict(
+        outbox_id=outbox_id,
+        status=s.PushDeliveryStatus.PENDING.value,
+        next_attempt_at=now + timedelta(seconds=delay),
+        error=error,
+    )
+
+
+def save_chunk_results(db: Session, results: Sequence[ChunkResult]):
+    """Stores tickets and errors of sent chunks to outbox"""
+
+    now = datetime.utcnow()
+    receipt_at = now + timedelta(seconds=CFG.PUSH_RECEIPT_DELAY)
+    sent: list[dict] = []
+    retried: list[dict] = []
+    failed: list[dict] = []
+    unregistered_device_ids: set[int] = set()
+
+    for result in results:
+        if result.tickets is None:
+            for message in result.messages:
+                if result.is_retryable:
+                    retried.append(get_retry_values(message.id, message.attempts, result.error[:256], now))
+                else:
+                    failed.append(dict(outbox_id=message.id, error=result.error[:256]))
+            continue
+
+        for message, ticket in zip(result.messages, result.tickets):
+            if ticket.is_success():
+                sent.append(dict(outbox_id=message.id, ticket_id=ticket.id, sent_at=now, next_attempt_at=receipt_at))
+                continue
+
+            error = (ticket.details or {}).get("error") or ticket.message
+            log(log.WARNING, "[save_chunk_results] Push to [%s] failed: %s", ticket.push_message.to, error)
+            if error in RETRYABLE_TICKET_ERRORS:
+                retried.append(get_retry_values(message.id, message.attempts, error[:256], now))
+            else:
+                failed.append(dict(outbox_id=message.id, error=error[:256]))
+            if error == PushTicket.ERROR_DEVICE_NOT_REGISTERED:
+                unregistered_device_ids.add(message.device_id)
+
+    update_stmt = sa.update(outbox).where(outbox.c.id == sa.bindparam("outbox_id"))
+    if sent:
+        db.execute(update_stmt.values(status=s.PushDeliveryStatus.SENT.value), sent)
+    if retried:
+        db.execute(update_stmt, retried)
+    if failed:
+        db.execute(update_stmt.values(status=s.PushDeliveryStatus.FAILED.value), failed)
+    prune_devices(db, unregistered_device_ids)
+    update_delivery_stats(db, {message.notification_id for result in results for message in result.messages})
+    db.commit()
+
+    log(log.INFO, "Push messages sent: [%d], retried: [%d], failed: [%d]", len(sent), len(retried), len(failed))
+
+
+def dispatch_push_notifications(db: Session, notification_id: int | None = None) -> int:
+    """Sends due messages of outbox (of one notification if notification_id is set). Returns count of messages"""
+
+    messages = claim_push_messages(db, CFG.PUSH_DISPATCH_BATCH, notification_id)
+    if not messages:
+        return 0
+
+    chunks = [messages[i : i + CFG.PUSH_CHUNK_SIZE] for i in range(0, len(messages), CFG.PUSH_CHUNK_SIZE)]
+    results = list(executor.map(send_push_chunk, chunks))
+    save_chunk_results(db, results)
+
+    return len(messages)
@@ -1,75 +1,39 @@
-import os
+from datetime import datetime
 
-import requests
 import sqlalchemy as sa
-from exponent_server_sdk import (
-    DeviceNotRegisteredError,
-    PushClient,
-    PushMessage,
-    PushServerError,
-    PushTicket,
-    PushTicketError,
-)
-from requests.exceptions import ConnectionError, HTTPError
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session as DbSession
 
-# Optionally providing an access token within a session if you have enabled push security
+from api.utils import decode_cursor, encode_cursor
 from app import models as m
 from app import schema as s
+from app.database import db, dialect_insert
 from app.logger import log
 from config import config
 
+from .push_dispatcher import dispatch_push_notifications
+
 CFG = config()
-session = requests.Session()
-session.headers.update(
-    {
-        "Authorization": f"Bearer {os.getenv('EXPO_TOKEN')}",
-        "accept": "application/json",
-        "accept-encoding": "gzip, deflate",
-        "content-type": "application/json",
-    }
-)
-
-
-def send_push_notification(notification: m.PushNotification) -> None:
-    try:
-        responses: list[PushTicket] = PushClient(session=session).publish_multiple(
-            [
-                PushMessage(
-                    to=device.push_token,
-                    body=notification.content,
-                    title=notification.title,
-                    data=notification.data,
-                    priority="high",
-                    channel_id="default",
-                    sound="default",
-                )
-                for device in notification.sent_to
-            ]
+
+
+def add_notification_recipients(db: DbSession, notification: m.PushNotification, users_filter: sa.Select):
+    """Adds active devices of users (selected by users_filter ids) to notification outbox with one query"""
+    db.flush()
+    devices = sa.select(
+        sa.literal(notification.id),
+        m.Device.id,
+        sa.literal(s.PushDeliveryStatus.PENDING.value),
+        sa.literal(datetime.utcnow(), sa.DateTime),
+    ).where(m.Device.user_id.in_(users_filter), m.Device.is_deleted.is_(False))
+    db.execute(
+        sa.insert(m.notification_devices).from_select(
+            ["notification_id", "device_id", "status", "next_attempt_at"], devices
         )
-    except PushServerError as exc:
-        # Encountered some likely formatting/validation error.
-        log(log.ERROR, "[send_push_notification] PushServerError: %s", str(exc.errors))
-        return
-    except (ConnectionError, HTTPError) as exc:
-        log(log.ERROR, "[send_push_notification] ConnectionError or HTTPError: %s", exc)
-        return
-    for response in responses:
-        try:
-            # We got a response back, but we don't know whether it's an error yet.
-            # This call raises errors so we can handle them with normal exception
-            # flows.
-            response.validate_response()
-
-        except DeviceNotRegisteredError as exc:
-            # Mark the push token as inactive
-            log(log.WARNING, "[send_push_notification] DeviceNotRegisteredError: %s", exc)
-        except PushTicketError as exc:
-            # Encountered some other per-notification error.
-            log(log.ERROR, "[send_push_notification] PushTicketError: %s", exc)
+    )
 
 
 def create_new_job_notification(db: DbSession, job: m.Job) -> m.PushNotification:
+    """Puts new job notification to outbox for users of job location"""
     notification = m.PushNotification(
         title="New job available",
         content=f"A new job '{job.title}' is available, check it out!",
@@ -81,22 +45,140 @@ def create_new_job_notification(db: DbSession, job: m.Job) -> m.PushNotification
     db.add(notification)
 
     #  get all users whose id is not equal to job owner id and job.location is locations of user
-
-    users = db.scalars(
-        sa.select(m.User).join(m.User.locations).filter(m.User.id != job.owner_id, m.Location.id == job.location_id)
-    ).all()
-
-    for user in users:
-        notification.sent_to.extend(user.active_devices)
+    users = sa.select(m.user_locations.c.user_id).where(
+        m.user_locations.c.location_id == job.location_id, m.user_locations.c.user_id != job.owner_id
+    )
+    add_notification_recipients(db, notification, users)
     db.commit()
 
     return notification
 
 
-def send_created_job_notification(db: DbSession, job: m.Job) -> None:
-    notification = create_new_job_notification(db, job)
-    send_push_notification(notification)
+def dispatch_notification(notification_id: int) -> None:
+    """Sends notification right after request (background task). Failed messages are retried by dispatcher"""
+    with db.Session() as session:
+        while dispatch_push_notifications(session, notification_id):
+            pass
+    log(log.DEBUG, "Notification [%s] dispatched", notification_id)
+
+
+def notification_is_read_by_user(notification: m.PushNotification, user_id: int, db: DbSession) -> bool:
+    """Checks read mark by (user_id, notification_id) index, readers of notification are not loaded"""
+    return bool(
+        db.scalar(
+            sa.select(
+                sa.exists().where(
+                    m.notification_users.c.user_id == user_id,
+                    m.notification_users.c.notification_id == notification.id,
+                )
+            )
+        )
+    )
+
+
+def get_user_notification_ids(user: s.UserPrincipal) -> sa.Select:
+    """Ids of notifications sent to any device of user"""
+    return (
+        sa.select(m.notification_devices.c.notification_id)
+        .join(m.Device, m.Device.id == m.notification_devices.c.device_id)
+        .where(m.Device.user_id == user.id)
+    )
+
+
+def is_read_by_user(user: s.UserPrincipal) -> sa.Exists:
+    """EXISTS clause, True if notification is read by user"""
+    return sa.exists().where(
+        m.notification_users.c.user_id == user.id,
+        m.notification_users.c.notification_id == m.PushNotification.id,
+    )
 
 
-def notification_is_read_by_user(notification: m.PushNotification, user: m.User) -> bool:
-    return user in notification.read_by
+def get_user_notifications(
+    current_user: s.UserPrincipal, limit: int | None, cursor: str | None, db: DbSession
+) -> s.PushNotificationsList:
+    """Returns page of user notifications (the newest first) and cursor of the next page (all if limit is None)"""
+
+    stmt = (
+        sa.select(
+            m.PushNotification.id,
+            m.PushNotification.uuid,
+            m.PushNotification.n_type,
+            m.PushNotification.created_at,
+            m.Job.uuid.label("job_uuid"),
+            m.Job.title.label("job_title"),
+            is_read_by_user(current_user).label("read_by_me"),
+        )
+        .join(m.Job, m.Job.id == m.PushNotification.job_id)
+        .where(
+            m.PushNotification.is_deleted.is_(False),
+            m.PushNotification.id.in_(get_user_notification_ids(current_user)),
+        )
+        .order_by(m.PushNotification.id.desc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    if cursor:
+        cursor_values = decode_cursor(cursor)
+        if len(cursor_values) != 1 or not isinstance(cursor_values[0], int):
+            log(log.ERROR, "Invalid notifications cursor [%s]", cursor)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        stmt = stmt.where(m.PushNotification.id < cursor_values[0])
+
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].id])
+
+    return s.PushNotificationsList(
+        items=[
+            s.PushNotificationOut(
+                uuid=row.uuid,
+                job_uuid=row.job_uuid,
+                n_type=s.PushNotificationType(row.n_type),
+                job_title=row.job_title,
+                created_at=row.created_at,
+                read_by_me=row.read_by_me,
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+def get_unread_notifications_count(current_user: s.UserPrincipal, db: DbSession) -> int:
+    """Counts notifications of user which are not read yet"""
+    return (
+        db.scalar(
+            sa.select(sa.func.count(m.PushNotification.id)).where(
+                m.PushNotification.is_deleted.is_(False),
+                m.PushNotification.id.in_(get_user_notification_ids(current_user)),
+                ~is_read_by_user(current_user),
+            )
+        )
+        or 0
+    )
+
+
+def mark_notifications_as_read(
+    current_user: s.UserPrincipal, db: DbSession, notification_ids: sa.Select | list[int] | None = None
+) -> int:
+    """Marks notifications of user (all if notification_ids is None) as read with one query.
+    Already read notifications are skipped by ON CONFLICT DO NOTHING. Returns count of marked notifications
+    """
+
+    notifications = sa.select(m.PushNotification.id, sa.literal(current_user.id)).where(
+        m.PushNotification.is_deleted.is_(False),
+        m.PushNotification.id.in_(get_user_notification_ids(current_user)),
+    )
+    if notification_ids is not None:
+        notifications = notifications.where(m.PushNotification.id.in_(notification_ids))
+
+    result = db.execute(
+        dialect_insert(m.notification_users, db)
+        .from_select(["notification_id", "user_id"], notifications)
+        .on_conflict_do_nothing(index_elements=["user_id", "notification_id"])
+    )
+    db.commit()
+    log(log.INFO, "User [%s] marked [%d] notifications as read", current_user.id, result.rowcount)
+    return result.rowcount
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from exponent_server_sdk import PushReceipt, PushServerError, PushTicket
+from requests.exceptions import RequestException
+from sqlalchemy.orm import Session
+
+from app import schema as s
+from app.logger import log
+from config import config
+
+from .push_dispatcher import (
+    RETRYABLE_TICKET_ERRORS,
+    get_push_client,
+    get_retry_values,
+    outbox,
+    prune_devices,
+    update_delivery_stats,
+)
+
+CFG = config()
+
+
+def check_push_receipts(db: Session) -> int:
+    """Gets Expo receipts of sent messages in bulk, marks devices with unregistered tokens as deleted.
+    Returns count of checked messages
+    """
+
+    now = datetime.utcnow()
+    rows = db.execute(
+        sa.select(
+            outbox.c.id,
+            outbox.c.notification_id,
+            outbox.c.device_id,
+            outbox.c.attempts,
+            outbox.c.ticket_id,
+            outbox.c.sent_at,
+        )
+        .where(
+            outbox.c.status == s.PushDeliveryStatus.SENT.value,
+            outbox.c.next_attempt_at <= now,
+            # only messages with Expo ticket have receipts
+            outbox.c.ticket_id != "",
+        )
+        .order_by(outbox.c.next_attempt_at, outbox.c.id)
+        .limit(CFG.PUSH_RECEIPTS_BATCH)
+        .with_for_update(of=outbox, skip_locked=True)
+    ).all()
+    if not rows:
+        db.commit()
+        return 0
+
+    # lease messages, so receipts are checked again later if request fails
+    db.execute(
+        sa.update(outbox)
+        .where(outbox.c.id.in_([row.id for row in rows]))
+        .values(next_attempt_at=now + timedelta(seconds=CFG.PUSH_LEASE_SECONDS))
+    )
+    db.commit()
+
+    tickets = [
+        PushTicket(push_message=None, status=PushTicket.SUCCESS_STATUS, message="", details=None, id=row.ticket_id)
+        for row in rows
+    ]
+    try:
+        receipts: dict[str, PushTicket] = {
+            receipt.id: receipt for receipt in get_push_client().check_receipts_multiple(tickets)
+        }
+    except (PushServerError, RequestException) as exc:
+        # leased messages are checked again after CFG.PUSH_LEASE_SECONDS
+        log(log.ERROR, "[check_push_receipts] Request failed: %s", exc)
+        return 0
+
+    delivered: list[dict] = []
+    retried: list[dict] = []
+    failed: list[dict] = []
+    waiting: list[dict] = []
+    unregistered_device_ids: set[int] = set()
+    for row in rows:
+        receipt = receipts.get(row.ticket_id)
+        if receipt is None:
+            # receipt is not ready yet or already expired
+            if row.sent_at and row.sent_at < now - timedelta(seconds=CFG.PUSH_RECEIPT_MAX_AGE):
+                failed.append(dict(outbox_id=row.id, error="Receipt not found"))
+            else:
+                waiting.append(dict(outbox_id=row.id, next_attempt_at=now + timedelta(seconds=CFG.PUSH_RECEIPT_DELAY)))
+            continue
+
+        if receipt.is_success():
+            delivered.append(dict(outbox_id=row.id))
+            continue
+
+        error = (receipt.details or {}).get("error") or receipt.message
+        log(log.WARNING, "[check_push_receipts] Push [%s] failed: %s", row.ticket_id, error)
+        if error in RETRYABLE_TICKET_ERRORS:
+            # message is sent again by dispatcher
+            retried.append(get_retry_values(row.id, row.attempts, error[:256], now))
+        else:
+            failed.append(dict(outbox_id=row.id, error=error[:256]))
+        if error == PushReceipt.ERROR_DEVICE_NOT_REGISTERED:
+            unregistered_device_ids.add(row.device_id)
+
+    update_stmt = sa.update(outbox).where(outbox.c.id == sa.bindparam("outbox_id"))
+    if delivered:
+        db.execute(update_stmt.values(status=s.PushDeliveryStatus.DELIVERED.value), delivered)
+    if retried:
+        db.execute(update_stmt, retried)
+    if failed:
+        db.execute(update_stmt.values(status=s.PushDeliveryStatus.FAILED.value), failed)
+    if waiting:
+        db.execute(update_stmt, waiting)
+    prune_devices(db, unregistered_device_ids)
+    update_delivery_stats(db, {row.notification_id for row in rows})
+    db.commit()
+
+    log(
+        log.INFO,
+        "Push receipts delivered: [%d], retried: [%d], failed: [%d], waiting: [%d]",
+        len(delivered),
+        len(retried),
+        len(failed),
+        len(waiting),
+    )
+    return len(rows)
@@ -10,33 +10,66 @@ from config import config
 CFG = config()
 
 
-def update_user_average_rate(user: m.User, db: Session):
-    """Update user average rate"""
-    stmt = sa.select(m.Rate).where(m.Rate.receiver_id == user.id)
-    rates = db.scalars(stmt).all()
-
-    if not rates:
-        return
-
-    total_rate = 0
-    for rate in rates:
-        total_rate += rate.rate
+def add_user_rate(user_id: int, rate: int, db: Session):
+    """Add new received rate to user rates count, sum and average rate"""
+    stmt_update = (
+        sa.update(m.User)
+        .where(m.User.id == user_id)
+        .values(
+            owned_rates_count=m.User.owned_rates_count + 1,
+            rates_sum=m.User.rates_sum + rate,
+            average_rate=sa.cast(m.User.rates_sum + rate, sa.Float) / (m.User.owned_rates_count + 1),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    db.execute(stmt_update)
+    log(log.DEBUG, "User %s received rate %s", user_id, rate)
 
-    average_rate = total_rate / len(rates)
 
+def change_user_rate(user_id: int, old_rate: int, new_rate: int, db: Session):
+    """Replace one of received rates in user rates sum and average rate"""
     stmt_update = (
         sa.update(m.User)
-        .where(m.User.id == user.id)
-        .values(average_rate=average_rate)
+        .where(m.User.id == user_id, m.User.owned_rates_count > 0)
+        .values(
+            rates_sum=m.User.rates_sum + (new_rate - old_rate),
+            average_rate=sa.cast(m.User.rates_sum + (new_rate - old_rate), sa.Float) / m.User.owned_rates_count,
+        )
         .execution_options(synchronize_session="fetch")
     )
     db.execute(stmt_update)
-    db.flush()
-    log(log.DEBUG, "User %s average rate updated to %s", user.id, average_rate)
+    log(log.DEBUG, "User %s rate changed from %s to %s", user_id, old_rate, new_rate)
+
 
+def fix_users_rates(db: Session, user_ids: Sequence[int] | None = None):
+    """Recalculate rates count, sum and average rate of users (all users if user_ids is None)"""
+    totals_stmt = sa.select(
+        m.Rate.receiver_id,
+        sa.func.count(m.Rate.id).label("rates_count"),
+        sa.func.sum(m.Rate.rate).label("rates_sum"),
+    ).group_by(m.Rate.receiver_id)
+    users_filter: sa.ColumnElement[bool] = sa.true()
+    if user_ids is not None:
+        totals_stmt = totals_stmt.where(m.Rate.receiver_id.in_(user_ids))
+        users_filter = m.User.id.in_(user_ids)
+    totals = totals_stmt.subquery()
 
-def update_users_average_rate(users: Sequence[m.User], db: Session):
-    """Update users average rate"""
-    for user in users:
-        update_user_average_rate(user, db)
-    return
+    db.flush()
+    db.execute(
+        sa.update(m.User)
+        .where(users_filter)
+        .values(owned_rates_count=0, rates_sum=0, average_rate=0)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        sa.update(m.User)
+        .where(m.User.id == totals.c.receiver_id)
+        .values(
+            owned_rates_count=totals.c.rates_count,
+            rates_sum=totals.c.rates_sum,
+            average_rate=sa.cast(totals.c.rates_sum, sa.Float) / totals.c.rates_count,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.expire_all()
+    log(log.DEBUG, "Users rates updated")
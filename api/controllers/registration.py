@@ -8,6 +8,7 @@ from app import schema as s
 from app.logger import log
 
 from .oauth2 import create_access_token
+from .password import hash_password
 
 
 def register_user(user_data: s.RegistrationIn, db: Session) -> s.Token:
@@ -35,7 +36,7 @@ def register_user(user_data: s.RegistrationIn, db: Session) -> s.Token:
         fullname=user_data.fullname,
         phone=user_data.phone,
         auth_accounts=[m.AuthAccount(auth_type=s.AuthType.BASIC, email=user_data.email)],
-        password=password,
+        password_hash=hash_password(password),
         is_volunteer=user_data.is_volunteer,
     )
     db.add(user)
@@ -0,0 +1,102 @@
+import re
+from typing import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, selectinload
+
+import app.models as m
+from config import config
+
+CFG = config()
+
+# text search configuration of jobs.search_vector and services.search_vector columns
+SEARCH_CONFIG = "simple"
+
+# same weights as ts_rank uses for setweight "A" (title) and "B" (description)
+TITLE_RANK = 1.0
+DESCRIPTION_RANK = 0.4
+SERVICE_RANK = 1.0
+
+
+def get_search_words(query: str) -> list[str]:
+    """Splits search query into words"""
+    return re.sub(CFG.RE_WORD, " ", query).split()
+
+
+def is_full_text_search_enabled(db: Session) -> bool:
+    """Full text search columns and indexes exist only in PostgreSQL (see migration)"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def get_ts_query(words: list[str], operator: str = "&") -> sa.ColumnElement:
+    """Creates prefix tsquery (each word is a prefix) joined by operator"""
+    return sa.func.to_tsquery(SEARCH_CONFIG, f" {operator} ".join(f"{word}:*" for word in words))
+
+
+def filter_jobs_by_search_query(db_jobs: sa.Select, query: str, db: Session) -> sa.Select:
+    """Filters jobs, every word must be found in title, description or job services names (UA or EN)"""
+
+    words = get_search_words(query)
+
+    if is_full_text_search_enabled(db):
+        for word in words:
+            ts_query = get_ts_query([word])
+            db_jobs = db_jobs.where(
+                sa.or_(
+                    m.Job.search_vector.op("@@")(ts_query),
+                    m.Job.services.any(m.Service.search_vector.op("@@")(ts_query)),
+                )
+            )
+        return db_jobs
+
+    for word in words:
+        db_jobs = db_jobs.where(
+            sa.or_(
+                m.Job.title.ilike(f"%{word}%"),
+                m.Job.description.ilike(f"%{word}%"),
+                m.Job.services.any(sa.or_(m.Service.name_ua.ilike(f"%{word}%"), m.Service.name_en.ilike(f"%{word}%"))),
+            )
+        )
+    return db_jobs
+
+
+def get_jobs_search_rank(words: list[str]) -> sa.ColumnElement:
+    """Returns SQL rank of job for search words (PostgreSQL only)"""
+
+    ts_query = get_ts_query(words, "|")
+    service_match = m.Job.services.any(m.Service.search_vector.op("@@")(ts_query))
+    return sa.func.ts_rank(m.Job.search_vector, ts_query) + sa.case((service_match, SERVICE_RANK), else_=0.0)
+
+
+def rank_job(job: m.Job, words: list[str]) -> float:
+    """Returns rank of job for search words. Used when full text search is not available"""
+
+    title = job.title.lower()
+    description = job.description.lower()
+    services = " ".join(f"{service.name_ua} {service.name_en}" for service in job.services).lower()
+
+    rank = 0.0
+    for word in map(str.lower, words):
+        if word in title:
+            rank += TITLE_RANK
+        if word in description:
+            rank += DESCRIPTION_RANK
+        if word in services:
+            rank += SERVICE_RANK
+    return rank
+
+
+def search_jobs_ranked(db_jobs: sa.Select, query: str, db: Session) -> Sequence[m.Job]:
+    """Returns jobs found by search query, the most relevant first"""
+
+    words = get_search_words(query)
+    if not words:
+        return db.scalars(db_jobs).all()
+
+    db_jobs = filter_jobs_by_search_query(db_jobs, query, db)
+
+    if is_full_text_search_enabled(db):
+        return db.scalars(db_jobs.order_by(get_jobs_search_rank(words).desc(), m.Job.id.desc())).all()
+
+    jobs = db.scalars(db_jobs.options(selectinload(m.Job.services))).all()
+    return sorted(jobs, key=lambda job: rank_job(job, words), reverse=True)
@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+from typing import NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app import models as m
+from app import schema as s
+from app.controllers import region_names
+from app.logger import log
+from config import config
+
+CFG = config()
+
+TRIGRAM_LENGTH = 3
+
+SETTLEMENT_TYPE_PREFIXES = {
+    s.SettlementType.CITY.name: {s.Language.UA: "м. ", s.Language.EN: "c. "},
+    s.SettlementType.VILLAGE.name: {s.Language.UA: "с. ", s.Language.EN: "v. "},
+}
+
+
+class SettlementEntry(NamedTuple):
+    # lower-cased names used for search
+    name_ua: str
+    name_en: str
+    is_city: bool
+    # preformatted responses
+    settlement_ua: s.Settlement
+    settlement_en: s.Settlement
+
+
+def get_trigrams(word: str) -> set[str]:
+    return {word[i : i + TRIGRAM_LENGTH] for i in range(len(word) - TRIGRAM_LENGTH + 1)}
+
+
+class SettlementsIndex:
+    """In-memory autocomplete index of settlements (trigram index over UA and EN names)
+
+    Built on first search in every API worker and rebuilt when settlements or regions are changed
+    (checked not more often than CFG.SETTLEMENTS_CHECK_INTERVAL seconds).
+    """
+
+    def __init__(self, check_interval: int):
+        self.check_interval = check_interval
+        self.entries: list[SettlementEntry] = []
+        self.trigrams: dict[s.Language, dict[str, list[int]]] = {s.Language.UA: {}, s.Language.EN: {}}
+        self.version: tuple | None = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        self.version = None
+        self.checked_at = 0.0
+
+    def refresh(self, db: Session):
+        if self.version is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return
+
+        with self.lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.check_interval:
+                return
+
+            region_names.refresh(db)
+            version = tuple(
+                db.execute(sa.select(sa.func.count(m.Settlement.id), sa.func.max(m.Settlement.updated_at))).one()
+            ) + (region_names.version,)
+            if version != self.version:
+                self.build(db)
+                self.version = version
+
+            self.checked_at = time.monotonic()
+
+    def build(self, db: Session):
+        start = time.perf_counter()
+
+        # district_id -> "район <rayon>, <region>"
+        districts: dict[str, str] = {
+            district_id: f"район {name_ua}, {region_names.get(location_id, db).name_ua}"
+            for district_id, name_ua, location_id in db.execute(
+                sa.select(m.Rayon.district_id, m.Rayon.name_ua, m.Rayon.location_id)
+            )
+        }
+
+        entries: list[SettlementEntry] = []
+        trigrams: dict[s.Language, dict[str, list[int]]] = {s.Language.UA: {}, s.Language.EN: {}}
+        for settlement in db.execute(
+            sa.select(
+                m.Settlement.city_id,
+                m.Settlement.type,
+                m.Settlement.name_ua,
+                m.Settlement.name_en,
+                m.Settlement.district_id,
+            ).order_by(m.Settlement.id)
+        ):
+            district = districts.get(settlement.district_id)
+            if not district:
+                log(log.WARNING, "Rayon [%s] of settlement [%s] not found", settlement.district_id, settlement.city_id)
+                continue
+
+            prefixes = SETTLEMENT_TYPE_PREFIXES.get(settlement.type, {})
+            entry = SettlementEntry(
+                name_ua=settlement.name_ua.lower(),
+                name_en=settlement.name_en.lower(),
+                is_city=settlement.type == s.SettlementType.CITY.name,
+                settlement_ua=s.Settlement(
+                    uuid=settlement.city_id,
+                    location=f"{prefixes.get(s.Language.UA, '')}{settlement.name_ua}, {district}",
+                ),
+                settlement_en=s.Settlement(
+                    uuid=settlement.city_id,
+                    location=f"{prefixes.get(s.Language.EN, '')}{settlement.name_ua}, {district}",
+                ),
+            )
+            index = len(entries)
+            entries.append(entry)
+            for lang, name in ((s.Language.UA, entry.name_ua), (s.Language.EN, entry.name_en)):
+                for trigram in get_trigrams(name):
+                    trigrams[lang].setdefault(trigram, []).append(index)
+
+        self.entries = entries
+        self.trigrams = trigrams
+        log(log.INFO, "Settlements index built: [%d] in [%.3f] sec", len(entries), time.perf_counter() - start)
+
+    def search(self, words: list[str], lang: s.Language, limit: int, db: Session) -> list[s.Settlement]:
+        """Returns settlements which names contain all words. Cities and names starting with query go first"""
+
+        self.refresh(db)
+        words = [word.lower() for word in words]
+        entries = self.entries
+        trigrams = self.trigrams[lang]
+
+        # candidates by trigrams of words long enough, the rest are checked by substring
+        candidates: set[int] | None = None
+        for word in words:
+            for trigram in get_trigrams(word):
+                ids = trigrams.get(trigram, [])
+                candidates = set(ids) if candidates is None else candidates.intersection(ids)
+                if not candidates:
+                    return []
+
+        is_ua = lang == s.Language.UA
+        first_word = words[0] if words else ""
+        found = []
+        for i in range(len(entries)) if candidates is None else candidates:
+            name = entries[i].name_ua if is_ua else entries[i].name_en
+            if all(word in name for word in words):
+                found.append((not entries[i].is_city, not name.startswith(first_word), i))
+        found.sort()
+
+        return [entries[i].settlement_ua if is_ua else entries[i].settlement_en for _, _, i in found[:limit]]
+
+
+settlements_index = SettlementsIndex(CFG.SETTLEMENTS_CHECK_INTERVAL)
+
+
+def search_settlements(query: str, lang: s.Language, limit: int, db: Session) -> list[s.Settlement]:
+    """Returns settlements found by query"""
+    return settlements_index.search(re.sub(CFG.RE_WORD, " ", query).split(), lang, limit, db)
@@ -1,13 +1,14 @@
 import re
-from typing import Sequence, Tuple
+from collections import defaultdict
+from typing import Sequence
 
 import sqlalchemy as sa
 from fastapi import HTTPException, status
-from sqlalchemy.engine.result import Result
 from sqlalchemy.orm import Session, aliased
 
 import app.models as m
 import app.schema as s
+from app.controllers import region_names
 from app.schema.language import Language
 from app.utilities import pop_keys
 from config import config
@@ -19,42 +20,64 @@ service_alias = aliased(m.Service)
 def create_out_search_users(
     db_users: Sequence[m.User], lang: Language, db: Session, me: m.User | None = None
 ) -> list[s.UserSearchOut]:
-    """Creates list of UserSearchOut from db users"""
-
-    users: list[s.UserSearchOut] = []
-
-    for db_user in db_users:
-        services = [
-            s.Service(uuid=service.uuid, name=service.name_ua if lang == Language.UA else service.name_en)
-            for service in db_user.services
-        ]
-        regions: Result[Tuple[str, str]] = db.execute(
-            sa.select(m.Region.name_ua if lang == Language.UA else m.Region.name_en, m.Location.uuid)
-            .join(m.Location)
-            .join(m.user_locations)
-            .where(m.user_locations.c.user_id == db_user.id)
+    """Creates list of UserSearchOut from db users (related data is loaded for all users at once)"""
+
+    if not db_users:
+        return []
+
+    user_ids = {db_user.id for db_user in db_users}
+
+    services: dict[int, list[s.Service]] = defaultdict(list)
+    for user_id, uuid, name in db.execute(
+        sa.select(
+            m.user_services.c.user_id,
+            m.Service.uuid,
+            m.Service.name_ua if lang == Language.UA else m.Service.name_en,
         )
-        locations: list[s.LocationStrings] = [s.LocationStrings(name=name, uuid=uuid) for name, uuid in regions]
-        users.append(
-            s.UserSearchOut(
-                **pop_keys(db_user.__dict__, ["services", "locations"]),
-                services=services,
-                locations=locations,
-                owned_rates_count=db_user.owned_rates_count,
-                is_favorite=db_user in me.favorite_experts if me else False,
-            )
+        .join(m.Service, m.Service.id == m.user_services.c.service_id)
+        .where(m.user_services.c.user_id.in_(user_ids))
+    ):
+        services[user_id].append(s.Service(uuid=uuid, name=name))
+
+    locations: dict[int, list[s.LocationStrings]] = defaultdict(list)
+    for user_id, location_id in db.execute(
+        sa.select(m.user_locations.c.user_id, m.user_locations.c.location_id).where(
+            m.user_locations.c.user_id.in_(user_ids)
         )
-    return users
+    ):
+        locations[user_id].append(region_names.get(location_id, db).location_strings(lang))
+
+    favorite_ids: set[int] = set()
+    if me:
+        favorite_ids = set(
+            db.scalars(
+                sa.select(m.favorite_experts.c.expert_id).where(
+                    m.favorite_experts.c.user_id == me.id,
+                    m.favorite_experts.c.expert_id.in_(user_ids),
+                )
+            ).all()
+        )
+
+    return [
+        s.UserSearchOut(
+            id=db_user.id,
+            uuid=db_user.uuid,
+            fullname=db_user.fullname,
+            average_rate=db_user.average_rate,
+            services=services[db_user.id],
+            locations=locations[db_user.id],
+            owned_rates_count=db_user.owned_rates_count,
+            is_favorite=db_user.id in favorite_ids,
+        )
+        for db_user in db_users
+    ]
 
 
 def search_users(query: s.UserSearchIn, me: m.User, db: Session) -> s.UsersSearchOut:
     """filters users"""
 
     user_locations: set[s.Location] = {
-        s.Location(
-            uuid=location.uuid,
-            name=location.region[0].name_en if query.lang == Language.EN else location.region[0].name_ua,
-        )
+        s.Location(uuid=location.uuid, name=region_names.get(location.id, db).name(query.lang))
         for location in me.locations
     }
 
@@ -143,13 +166,9 @@ def get_user_profile(user_uuid: str, lang: Language, db: Session) -> s.UserProfi
         s.Service(uuid=service.uuid, name=service.name_ua if lang == Language.UA else service.name_en)
         for service in db_user.services
     ]
-    regions: Result[Tuple[str, str]] = db.execute(
-        sa.select(m.Region.name_ua if lang == Language.UA else m.Region.name_en, m.Location.uuid)
-        .join(m.Location)
-        .join(m.user_locations)
-        .where(m.user_locations.c.user_id == db_user.id)
-    )
-    locations: list[s.LocationStrings] = [s.LocationStrings(name=name, uuid=uuid) for name, uuid in regions]
+    locations: list[s.LocationStrings] = [
+        region_names.get(location.id, db).location_strings(lang) for location in db_user.locations
+    ]
 
     auth_accounts: list[s.AuthAccountOut] = [
         s.AuthAccountOut(
@@ -188,8 +207,8 @@ def get_user_profile(user_uuid: str, lang: Language, db: Session) -> s.UserProfi
     for job in db_user.favorite_jobs:
         location = ALL_UKRAINE
 
-        if job.location:
-            location = job.location.region[0].name_ua if lang == Language.UA else job.location.region[0].name_en
+        if job.location_id:
+            location = region_names.get(job.location_id, db).name(lang)
 
         address = None
         if job.address:
@@ -228,7 +247,7 @@ def get_user_profile(user_uuid: str, lang: Language, db: Session) -> s.UserProfi
 
         if expert.locations:
             for loc in expert.locations:
-                expert_locations.append(loc.region[0].name_ua if lang == Language.UA else loc.region[0].name_en)
+                expert_locations.append(region_names.get(loc.id, db).name(lang))
 
         favorite_expert.append(
             s.UserFavoriteExpert(
@@ -240,12 +259,17 @@ def get_user_profile(user_uuid: str, lang: Language, db: Session) -> s.UserProfi
 
     return s.UserProfileOut(
         # TODO: remove  user.__dict__ add like property in User model and use s.UserProfileOut.model_validate
-        **pop_keys(db_user.__dict__, ["favorite_jobs", "favorite_experts", "services", "locations", "auth_accounts"]),
+        # (pop_keys changes user.__dict__, so owned_rates_count must be read before it)
+        owned_rates_count=db_user.owned_rates_count,
+        **pop_keys(
+            db_user.__dict__,
+            ["favorite_jobs", "favorite_experts", "services", "locations", "auth_accounts", "owned_rates_count"],
+        ),
         auth_accounts=auth_accounts,
         services=services,
         locations=locations,
-        owned_rates_count=db_user.owned_rates_count,
         avatar_url=db_user.avatar_url,
+        avatar_thumbnail_url=db_user.avatar_thumbnail_url,
         completed_jobs_count=completed_jobs_count if completed_jobs_count else 0,
         announced_jobs_count=announced_jobs_count if announced_jobs_count else 0,
         favorite_jobs=favorite_jobs,
@@ -312,19 +336,15 @@ def get_public_user_profile(user_uuid: str, lang: Language, db: Session) -> s.Pu
         s.Service(uuid=service.uuid, name=service.name_ua if lang == Language.UA else service.name_en)
         for service in db_user.services
     ]
-    regions: Result[Tuple[str, str]] = db.execute(
-        sa.select(m.Region.name_ua if lang == Language.UA else m.Region.name_en, m.Location.uuid)
-        .join(m.Location)
-        .join(m.user_locations)
-        .where(m.user_locations.c.user_id == db_user.id)
-    )
-    locations: list[s.LocationStrings] = [s.LocationStrings(name=name, uuid=uuid) for name, uuid in regions]
+    locations: list[s.LocationStrings] = [
+        region_names.get(location.id, db).location_strings(lang) for location in db_user.locations
+    ]
 
     return s.PublicUserProfileOut(
-        **pop_keys(db_user.__dict__, ["services", "locations"]),
+        owned_rates_count=db_user.owned_rates_count,
+        **pop_keys(db_user.__dict__, ["services", "locations", "owned_rates_count"]),
         services=services,
         locations=locations,
-        owned_rates_count=db_user.owned_rates_count,
     )
 
 
@@ -372,8 +392,7 @@ def filter_and_order_users(
     if order_by == s.UsersOrderBy.AVERAGE_RATE:
         users = db.execute(db_users.order_by(m.User.average_rate.desc())).scalars().all()
     elif order_by == s.UsersOrderBy.OWNED_RATES_COUNT:
-        users = db.execute(db_users).scalars().all()
-        users = sorted(users, key=lambda user: user.owned_rates_count, reverse=True)
+        users = db.execute(db_users.order_by(m.User.owned_rates_count.desc())).scalars().all()
     elif order_by == s.UsersOrderBy.NEAR:
         users = (
             db.execute(
@@ -1,4 +1,4 @@
 # ruff: noqa: F401
-from .user import get_current_user, get_user
+from .user import get_current_user, get_current_principal, get_user, invalidate_user_principal
 from .s3_client import get_s3_connect
 from app.database import get_db
@@ -9,29 +9,78 @@ from app.database import get_db
 import app.models as m
 import app.schema as s
 from app.logger import log
+from api.utils import TTLCache
+from config import config
+
+CFG = config()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# user id -> principal, shared by requests of API worker.
+# Entries are dropped only in the worker which changed the user, other workers and Flask admin
+# (e.g. soft-delete of user) are picked up after CFG.USER_PRINCIPAL_CACHE_TTL seconds
+user_principals: TTLCache[int, s.UserPrincipal] = TTLCache(CFG.USER_PRINCIPAL_CACHE_TTL, CFG.AUTH_CACHE_SIZE)
 
-def get_current_user(
+
+def load_user_principal(user_id: int, db: Session) -> s.UserPrincipal | None:
+    user_uuid = db.scalar(sa.select(m.User.uuid).where(m.User.id == user_id, m.User.is_deleted == sa.false()))
+    if not user_uuid:
+        return None
+    return s.UserPrincipal(
+        id=user_id,
+        uuid=user_uuid,
+        location_ids=list(
+            db.scalars(sa.select(m.user_locations.c.location_id).where(m.user_locations.c.user_id == user_id))
+        ),
+        service_ids=list(
+            db.scalars(sa.select(m.user_services.c.service_id).where(m.user_services.c.user_id == user_id))
+        ),
+    )
+
+
+def invalidate_user_principal(user_id: int):
+    """Drops cached principal of user in current process, call it when user is deleted
+    or user locations or services are changed
+    """
+    user_principals.pop(user_id)
+
+
+def get_current_principal(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> m.User:
-    """Raises an exception if the current user is not authenticated"""
+) -> s.UserPrincipal:
+    """Raises an exception if the current user is not authenticated. User model is not loaded,
+    so deleted user is accepted until cached principal expires. Use get_current_user if route must reject it at once
+    """
     token_data: s.TokenData = verify_access_token(token, INVALID_CREDENTIALS_EXCEPTION)
+    principal = user_principals.get(token_data.user_id)
+    if principal:
+        return principal
+
+    principal = load_user_principal(token_data.user_id, db)
+    if not principal:
+        log(log.INFO, "User wasn`t authorized")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User was not authorized",
+        )
+    user_principals.set(principal.id, principal)
+    return principal
+
+
+def get_current_user(
+    principal: s.UserPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+) -> m.User:
+    """Raises an exception if the current user is not authenticated. Use it if route needs user model"""
     user = db.scalar(
         sa.select(m.User).where(
-            m.User.id == token_data.user_id,
+            m.User.id == principal.id,
             m.User.is_deleted == sa.false(),
         )
     )
     if not user:
-        log(log.INFO, "User wasn`t authorized")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User was not authorized",
-        )
-    if user.is_deleted:
+        invalidate_user_principal(principal.id)
         log(log.INFO, "User was not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
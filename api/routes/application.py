@@ -132,6 +132,7 @@ def update_application(
 
         job.status = s.JobStatus.APPROVED.value
         job.worker_id = application.worker_id
+        c.refresh_job_statistics(db, [job.location_id])
         log(log.INFO, "Updated job [%s] status to APPROVED", application.job_id)
 
     if data.status == m.ApplicationStatus.REJECTED:
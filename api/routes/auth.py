@@ -5,7 +5,6 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 from google.oauth2 import id_token
-from google.auth.transport import requests
 
 import app.models as m
 from api.dependency import get_db, get_current_user
@@ -22,10 +21,15 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 CFG = config()
 
 
-@router.post("/login", status_code=status.HTTP_200_OK, response_model=s.Token)
+@router.post(
+    "/login",
+    status_code=status.HTTP_200_OK,
+    response_model=s.Token,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Too many requests"}},
+)
 def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db=Depends(get_db)):
     """Logs in a user"""
-    user = m.User.authenticate(form_data.username, form_data.password, session=db)
+    user = c.authenticate_user(form_data.username, form_data.password, db)
     if not user:
         log(log.ERROR, "User [%s] wrong username or password", form_data.username)
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid credentials")
@@ -54,10 +58,11 @@ def logout(device_id: str, db=Depends(get_db), current_user: m.User = Depends(ge
     "/token",
     status_code=status.HTTP_200_OK,
     response_model=s.Token,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Too many requests"}},
 )
 def get_token(auth_data: s.Auth, db=Depends(get_db)):
     """Logs in a user"""
-    user = m.User.authenticate(auth_data.phone, auth_data.password, session=db)
+    user = c.authenticate_user(auth_data.phone, auth_data.password, db)
     if not user:
         log(log.ERROR, "User [%s] wrong phone or password", auth_data.phone)
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid credentials")
@@ -78,7 +83,7 @@ def google_auth(auth_data: s.GoogleAuthIn, db: Session = Depends(get_db)):
     try:
         id_info_res: s.GoogleTokenVerification = id_token.verify_oauth2_token(
             auth_data.id_token,
-            requests.Request(),
+            c.google_certs_request,
             CFG.GOOGLE_CLIENT_ID,
         )
 
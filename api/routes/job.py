@@ -1,17 +1,18 @@
+import hashlib
 from datetime import datetime
 from typing import Annotated, Any, List, Union
 
 import sqlalchemy as sa
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, UploadFile
 from sqlalchemy.orm import Session
 from mypy_boto3_s3 import S3Client
 
 import api.controllers as c
 
-from api.utils import get_file_extension
+from api.utils import get_file_extension, is_etag_matched
 import app.models as m
 import app.schema as s
-from api.dependency import get_current_user, get_s3_connect
+from api.dependency import get_current_principal, get_current_user, get_s3_connect
 from app.database import get_db
 from app.logger import log
 from app.schema.language import Language
@@ -30,19 +31,19 @@ job_router = APIRouter(prefix="/jobs", tags=["jobs"])
         status.HTTP_404_NOT_FOUND: {"description": "Job not found"},
         status.HTTP_403_FORBIDDEN: {"description": "User does not own job"},
     },
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def get_job(
     job_uuid: str,
     lang: Language = Language.UA,
     db: Session = Depends(get_db),
 ):
-    job: m.Job | None = db.scalar(sa.select(m.Job).where(m.Job.uuid == job_uuid))
+    job = c.get_job_by_uuid(job_uuid, db)
     if not job:
         log(log.ERROR, "Job [%s] not found", job_uuid)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
-    job_owner = db.scalar(sa.select(m.User).where(m.User.id == job.owner_id))
+    job_owner = job.owner
     if not job_owner:
         log(log.ERROR, "Owner [%s] not found", job.owner_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Owner not found")
@@ -62,21 +63,19 @@ def get_jobs(
     selected_locations: Annotated[Union[List[str], None], Query()] = None,
     order_by: s.JobsOrderBy = s.JobsOrderBy.CREATED_AT,
     ascending: bool = True,
-    current_user: m.User = Depends(get_current_user),
+    limit: int = Query(default=CFG.JOBS_PAGE_LIMIT, ge=1, le=CFG.MAX_JOBS_PAGE_LIMIT),
+    cursor: str | None = None,
+    current_user: s.UserPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """Get jobs by query params"""
-
-    db_jobs = (
-        sa.select(m.Job)
-        .where(
-            m.Job.is_deleted.is_(False),
-            m.Job.status == s.JobStatus.PENDING.value,
-            m.Job.is_public.is_(True),
-            m.Job.worker_id.is_(None),
-            m.Job.owner_id != current_user.id,
-        )
-        .order_by(m.Job.updated_at.desc())
+    """Get jobs by query params. Use next_cursor from response as cursor to get the next page"""
+
+    db_jobs = sa.select(m.Job).where(
+        m.Job.is_deleted.is_(False),
+        m.Job.status == s.JobStatus.PENDING.value,
+        m.Job.is_public.is_(True),
+        m.Job.worker_id.is_(None),
+        m.Job.owner_id != current_user.id,
     )
 
     current_user_applications = db.scalars(
@@ -92,74 +91,56 @@ def get_jobs(
     if applications_ids:
         db_jobs = db_jobs.where(~m.Job.id.in_(applications_ids))
 
-    if selected_locations or current_user.locations:
+    if selected_locations or current_user.location_ids:
         db_jobs = c.filter_jobs_by_locations(selected_locations, db, current_user, db_jobs)
 
-    jobs = c.filter_and_order_jobs(query, lang, db, current_user, db_jobs, order_by)
+    jobs, next_cursor = c.filter_and_order_jobs(query, db, current_user, db_jobs, order_by, ascending, limit, cursor)
 
     if not jobs:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jobs not found")
 
-    if not ascending:
-        jobs = jobs[::-1]
+    jobs_out = c.create_out_search_jobs(jobs, lang, current_user, db)
 
-    jobs_out = c.create_out_search_jobs(jobs, lang, current_user)
-
-    return s.JobsOut(items=jobs_out)
+    return s.JobsOut(items=jobs_out, next_cursor=next_cursor)
 
 
 @job_router.get(
     "/jobs-by-status/",
     status_code=status.HTTP_200_OK,
     response_model=s.JobsByStatusList,
-    responses={status.HTTP_404_NOT_FOUND: {"description": "Jobs not found"}},
+    responses={status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"}},
 )
 def get_jobs_by_status(
     job_status: s.JobStatus = s.JobStatus.PENDING,
     job_user_status: s.JobUserStatus = s.JobUserStatus.OWNER,
     lang: Language = Language.UA,
+    limit: int = Query(default=CFG.JOBS_PAGE_LIMIT, ge=1, le=CFG.MAX_JOBS_PAGE_LIMIT),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: m.User = Depends(get_current_user),
 ):
-    """Get jobs by status"""
+    """Get jobs of current user by status. Use next_cursor from response as cursor to get the next page"""
     # TODO: add search by query
 
-    db_jobs = db.scalars(
-        sa.select(m.Job)
-        .where(
-            m.Job.is_deleted.is_(False),
-        )
-        .order_by(m.Job.updated_at.desc())
-    ).all()
-
-    if not db_jobs:
-        log(log.ERROR, "Jobs not found")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jobs not found")
-
-    jobs_out: list[s.JobByStatus] = []
+    db_jobs: sa.Select | None = None
 
     if job_status == s.JobStatus.PENDING:
-        jobs_out = c.get_pending_jobs(db_jobs, current_user, job_user_status, lang, db)
+        db_jobs = c.get_pending_jobs(current_user, job_user_status)
 
     # get active jobs (in progress, approved and on confirmation)
     if job_status == s.JobStatus.IN_PROGRESS:
-        active_jobs = db.scalars(
-            sa.select(m.Job)
-            .where(
-                m.Job.is_deleted.is_(False),
-                m.Job.status.in_(
-                    [s.JobStatus.IN_PROGRESS.value, s.JobStatus.APPROVED.value, s.JobStatus.ON_CONFIRMATION.value]
-                ),
-            )
-            .order_by(m.Job.updated_at.desc())
-        ).all()
-        jobs_out = c.get_in_progress_jobs(active_jobs, current_user, job_user_status, lang)
+        db_jobs = c.get_in_progress_jobs(current_user, job_user_status)
 
     # get archive jobs (completed and canceled)
     if job_status == s.JobStatus.COMPLETED:
-        jobs_out = c.get_archived_jobs(db_jobs, current_user, job_user_status, lang)
+        db_jobs = c.get_archived_jobs(current_user, job_user_status)
+
+    if db_jobs is None:
+        return s.JobsByStatusList(items=[])
 
-    return s.JobsByStatusList(items=jobs_out)
+    jobs, next_cursor = c.paginate_jobs_by_status(db_jobs, limit, cursor, db)
+
+    return s.JobsByStatusList(items=c.create_jobs_by_status(jobs, lang, db), next_cursor=next_cursor)
 
 
 @job_router.post(
@@ -224,6 +205,8 @@ def create_job(
         new_job.address_id = address.id
         log(log.INFO, "Address [%s] was added to job [%s]", address.id, new_job.id)
 
+    c.refresh_job_statistics(db, [new_job.location_id])
+
     new_job_service = m.JobService(job_id=new_job.id, service_id=service.id)
     db.add_all([new_job_service, new_job])
     db.commit()
@@ -250,7 +233,8 @@ def create_job(
     job_out = s.BaseJob.model_validate(new_job)
 
     log(log.INFO, "Job [%s] was created", new_job.id)
-    background_tasks.add_task(c.send_created_job_notification, db, new_job)
+    notification = c.create_new_job_notification(db, new_job)
+    background_tasks.add_task(c.dispatch_notification, notification.id)
 
     return s.JobOut(
         **job_out.model_dump(),
@@ -270,17 +254,16 @@ def create_job(
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Unknown file extension"},
     },
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def upload_job_file(
     files: list[UploadFile],
     db: Session = Depends(get_db),
     s3_client: S3Client = Depends(get_s3_connect),
 ):
-    """Uploads file for new job"""
-
-    files_out: list[s.FileOut] = []
+    """Uploads files for new job"""
 
+    job_files: list[tuple[UploadFile, str, s.FileType]] = []
     for file in files:
         extension = get_file_extension(file)
 
@@ -290,20 +273,64 @@ def upload_job_file(
             log(log.ERROR, "Unknown file extension [%s]", extension)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown file extension")
 
-        file_model = c.create_file(
-            file=file,
-            db=db,
-            s3_client=s3_client,
-            extension=extension,
-            file_type=file_type,
-            file_name_url="jobs/files",
-        )
+        job_files.append((file, extension, file_type))
+
+    # files are uploaded in parallel
+    file_models = c.create_files(job_files, db=db, s3_client=s3_client, file_name_url="jobs/files")
+    log(log.INFO, "Files [%s] were uploaded", [file_model.uuid for file_model in file_models])
+
+    return [file_model.uuid for file_model in file_models]
+
+
+# presigned upload, client sends file straight to S3
+@job_router.post(
+    "/files/upload-url",
+    status_code=status.HTTP_201_CREATED,
+    response_model=s.FileUploadOut,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Unknown file extension"},
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"description": "File is too large"},
+    },
+)
+def create_job_file_upload(
+    file: s.FileUploadIn,
+    db: Session = Depends(get_db),
+    s3_client: S3Client = Depends(get_s3_connect),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Returns presigned POST to upload file for new job"""
+
+    return c.create_presigned_upload(
+        file,
+        current_user.id,
+        db,
+        s3_client,
+        file_types=(s.FileType.IMAGE, s.FileType.VIDEO),
+        max_size=CFG.MAX_JOB_FILE_SIZE,
+        file_name_url="jobs/files",
+    )
 
-        log(log.INFO, "File [%s] was uploaded", file_model.uuid)
 
-        files_out.append(s.FileOut.model_validate(file_model))
+@job_router.post(
+    "/files/complete",
+    status_code=status.HTTP_201_CREATED,
+    response_model=s.FileOut,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid upload token or file"},
+        status.HTTP_404_NOT_FOUND: {"description": "File was not uploaded"},
+    },
+)
+def complete_job_file_upload(
+    data: s.FileUploadCompleteIn,
+    db: Session = Depends(get_db),
+    s3_client: S3Client = Depends(get_s3_connect),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Checks file uploaded with presigned POST and saves it for new job"""
 
-    return [file.uuid for file in files_out]
+    file_model = c.complete_presigned_upload(data.upload_token, current_user.id, db, s3_client, "jobs/files")
+    log(log.INFO, "File [%s] was uploaded", file_model.uuid)
+    return file_model
 
 
 # deleted file
@@ -313,12 +340,11 @@ def upload_job_file(
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "File not found"},
     },
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def delete_job_file(
     file_uuid: str,
     db: Session = Depends(get_db),
-    s3_client: S3Client = Depends(get_s3_connect),
 ):
     """Deletes file for new job"""
 
@@ -328,11 +354,8 @@ def delete_job_file(
         log(log.ERROR, "File [%s] not found", file_uuid)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 
-    # delete file from s3 because new job was not created yet
-    s3_client.delete_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=file.key)
-
-    db.delete(file)
-    db.commit()
+    # file is deleted from s3 (later, in batch) because new job was not created yet
+    c.delete_file(db, file)
 
     log(log.INFO, "File was deleted")
 
@@ -358,7 +381,10 @@ def put_job(
 
     data_filtered: dict[str, Any] = {key: value for key, value in job_data.model_dump().items() if value is not None}
 
+    old_location_id = job.location_id
     db.execute(sa.update(m.Job).where(m.Job.id == job_id).values(**data_filtered))
+    if "location_id" in data_filtered:
+        c.refresh_job_statistics(db, [old_location_id, data_filtered["location_id"]])
     db.commit()
     log(log.INFO, "Updated job [%s]", job_id)
     return job
@@ -387,13 +413,28 @@ def get_jobs_on_home_page(
     return c.get_jobs_on_home_page(query, current_user, db)
 
 
-@job_router.get("/public-job-statistics/", status_code=status.HTTP_200_OK, response_model=s.PublicJobDict)
+@job_router.get(
+    "/public-job-statistics/",
+    status_code=status.HTTP_200_OK,
+    response_model=s.PublicJobDict,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Statistics not modified"}},
+)
 def get_public_job_statistics(
+    request: Request,
     db: Session = Depends(get_db),
 ):
-    """Get statistics for jobs per location"""
+    """Get statistics for jobs per location. Supports ETag (If-None-Match)"""
+
+    body = c.job_statistics(db).model_dump_json().encode()
+    headers = {
+        "Cache-Control": f"public, max-age={CFG.JOB_STATISTICS_MAX_AGE}",
+        "ETag": f'"{hashlib.sha256(body).hexdigest()}"',
+    }
+
+    if is_etag_matched(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return c.job_statistics(db)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @job_router.delete(
@@ -1,13 +1,11 @@
-import re
-from typing import Sequence
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-import sqlalchemy as sa
 
 import app.schema as s
 from api import controllers as c
-from api.dependency.user import get_current_user
-from app import models as m
+from api.dependency.user import get_current_principal
+from api.utils import is_etag_matched
+from app.controllers import region_names
 from app.database import get_db
 from app.logger import log
 from config import config
@@ -26,6 +24,38 @@ def get_locations(query: s.LocationsIn, db: Session = Depends(get_db)):
     return c.get_locations(query, db)
 
 
+@location_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=s.LocationsOut,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Locations not modified"}},
+)
+def get_cached_locations(
+    request: Request,
+    lang: s.Language = s.Language.UA,
+    db: Session = Depends(get_db),
+):
+    """Returns all locations with svg maps. Supports ETag (If-None-Match) and gzip"""
+
+    payload = c.get_locations_payload(lang, db)
+
+    body = payload.body
+    etag = payload.etag
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = payload.gzip_body
+        # strong ETag must differ for every content encoding
+        etag = f'{payload.etag[:-1]}-gzip"'
+        headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = etag
+
+    if is_etag_matched(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @location_router.get(
     "/all",
     status_code=status.HTTP_200_OK,
@@ -37,15 +67,7 @@ def get_all_locations(
 ):
     """Returns all locations"""
 
-    db_locations = db.scalars(sa.select(m.Location)).all()
-
-    locations_out = [
-        s.LocationStrings(
-            name=location.region[0].name_ua if lang == s.Language.UA else location.region[0].name_en,
-            uuid=location.uuid,
-        )
-        for location in db_locations
-    ]
+    locations_out = [region.location_strings(lang) for region in region_names.all(db)]
 
     return s.LocationsListOut(locations=locations_out)
 
@@ -54,11 +76,12 @@ def get_all_locations(
     "/settlements",
     status_code=status.HTTP_200_OK,
     response_model=s.SettlementsListOut,
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def get_settlements(
     query: str = "",
     lang: s.Language = s.Language.UA,
+    limit: int = Query(default=CFG.SETTLEMENTS_LIMIT, ge=1, le=CFG.MAX_SETTLEMENTS_LIMIT),
     db: Session = Depends(get_db),
 ):
     """Returns the settlements"""
@@ -67,55 +90,20 @@ def get_settlements(
         log(log.ERROR, "Query is empty")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query is empty")
 
-    wordList = re.sub(CFG.RE_WORD, " ", query).split()
-
-    settlements_name_lang = m.Settlement.name_ua if lang == s.Language.UA else m.Settlement.name_en
-    lookups = [settlements_name_lang.ilike(f"%{keyword}%") for keyword in wordList]
-
-    # City first
-    type_order = sa.desc(m.Settlement.type == s.SettlementType.CITY.name)
-    settlements: Sequence[m.Settlement] = db.scalars(sa.select(m.Settlement).where(*lookups).order_by(type_order)).all()
+    settlements = c.search_settlements(query, lang, limit, db)
 
     if not settlements:
         log(log.INFO, "Settlements not found by query [%s]", query)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Settlements not found")
 
-    rayons_ids = [settlement.district_id for settlement in settlements]
-
-    rayons = db.scalars(sa.select(m.Rayon).where(m.Rayon.district_id.in_(rayons_ids))).all()
-    if not rayons:
-        log(log.INFO, "Rayons not found by query [%s]", query)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rayons not found")
-
-    settlements_data_out = []
-
-    for settlement in settlements:
-        if settlement.type == s.SettlementType.CITY.name:
-            type = "м. " if lang == s.Language.UA else "c. "
-        elif settlement.type == s.SettlementType.VILLAGE.name:
-            type = "с. " if lang == s.Language.UA else "v. "
-        else:
-            type = ""
-
-        rayon = [rayon for rayon in rayons if rayon.district_id == settlement.district_id][0]
-        rayon_name = rayon.name_ua
-        region_name = rayon.location.region[0].name_ua
-
-        settlements_data_out.append(
-            s.Settlement(
-                uuid=settlement.city_id,
-                location=f"{type}{settlement.name_ua}, район {rayon_name}, {region_name}",
-            )
-        )
-
-    return s.SettlementsListOut(settlements=settlements_data_out)
+    return s.SettlementsListOut(settlements=settlements)
 
 
 @location_router.get(
     "/addresses",
     status_code=status.HTTP_200_OK,
     response_model=s.AddressesListOut,
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "Addresses not found"},
     },
@@ -124,6 +112,7 @@ def get_addresses(
     query: str = "",
     uuid: str = "",
     lang: s.Language = s.Language.UA,
+    limit: int = Query(default=CFG.ADDRESSES_LIMIT, ge=1, le=CFG.MAX_ADDRESSES_LIMIT),
     db: Session = Depends(get_db),
 ):
     """Returns the addresses by settlement uuid"""
@@ -136,25 +125,10 @@ def get_addresses(
         log(log.ERROR, "UUID must be provided")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="UUID must be provided")
 
-    wordList = re.sub(CFG.RE_WORD, " ", query).split()
-    is_ua_lang = lang == s.Language.UA
-
-    address_name_lang = m.Address.line1 if is_ua_lang else m.Address.line2
-
-    lookups = [address_name_lang.ilike(f"%{keyword}%") for keyword in wordList]
-    address_filter = sa.and_(*lookups, m.Address.city_id == uuid)
-    addresses: Sequence[m.Address] = db.scalars(sa.select(m.Address).where(address_filter)).all()
+    addresses = c.search_addresses(query, uuid, lang, limit, db)
 
     if not addresses:
         log(log.INFO, "Addresses not found by query [%s]", query)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Addresses not found")
 
-    addresses_list: list[s.AddressOutput] = []
-
-    for address in addresses:
-        name_lang = address.line1 if is_ua_lang else address.line2
-        type_lang = address.street_type_ua if is_ua_lang else address.line2
-
-        addresses_list.append(s.AddressOutput(uuid=address.street_id, name=f"{type_lang.lower()} {name_lang}"))
-
-    return s.AddressesListOut(addresses=addresses_list)
+    return s.AddressesListOut(addresses=addresses)
@@ -1,13 +1,16 @@
 import sqlalchemy as sa
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from api import controllers as c
-from api.dependency.user import get_current_user
+from api.dependency.user import get_current_principal
 from app import models as m
 from app import schema as s
 from app.database import get_db
 from app.logger import log
+from config import config
+
+CFG = config()
 
 push_notification_router = APIRouter(prefix="/push_notifications", tags=["push_notifications"])
 
@@ -15,27 +18,51 @@ push_notification_router = APIRouter(prefix="/push_notifications", tags=["push_n
 @push_notification_router.get("/", status_code=status.HTTP_200_OK, response_model=list[s.PushNotificationOut])
 def get_notifications(
     db: Session = Depends(get_db),
-    current_user: m.User = Depends(get_current_user),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
 ):
-    notifications = db.scalars(
-        sa.select(m.PushNotification).where(
-            sa.and_(
-                m.PushNotification.is_deleted.is_(False),
-                m.PushNotification.sent_to.any(m.Device.user_id == current_user.id),
-            )
-        )
-    )
-    return [
-        s.PushNotificationOut(
-            uuid=notification.uuid,
-            job_uuid=notification.job.uuid,
-            n_type=s.PushNotificationType(notification.n_type),
-            job_title=notification.job.title,
-            created_at=notification.created_at,
-            read_by_me=c.notification_is_read_by_user(notification, current_user),
-        )
-        for notification in notifications
-    ]
+    """Get all notifications of current user (the newest first). Use /inbox to get them by pages"""
+    return c.get_user_notifications(current_user, None, None, db).items
+
+
+@push_notification_router.get(
+    "/inbox",
+    status_code=status.HTTP_200_OK,
+    response_model=s.PushNotificationsList,
+    responses={status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"}},
+)
+def get_notifications_inbox(
+    limit: int = Query(default=CFG.NOTIFICATIONS_PAGE_LIMIT, ge=1, le=CFG.MAX_NOTIFICATIONS_PAGE_LIMIT),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Get notifications of current user (the newest first). Use next_cursor from response to get the next page"""
+    return c.get_user_notifications(current_user, limit, cursor, db)
+
+
+@push_notification_router.get(
+    "/unread-count", status_code=status.HTTP_200_OK, response_model=s.UnreadNotificationsCount
+)
+def get_unread_notifications_count(
+    db: Session = Depends(get_db),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Get count of not read notifications of current user"""
+    return s.UnreadNotificationsCount(count=c.get_unread_notifications_count(current_user, db))
+
+
+@push_notification_router.put("/read", status_code=status.HTTP_200_OK, response_model=s.UnreadNotificationsCount)
+def mark_notifications_as_read(
+    data: s.PushNotificationsReadIn,
+    db: Session = Depends(get_db),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Mark notifications (all if uuids are not set) as read. Returns count of not read notifications"""
+    notification_ids = None
+    if data.uuids is not None:
+        notification_ids = sa.select(m.PushNotification.id).where(m.PushNotification.uuid.in_(data.uuids))
+    c.mark_notifications_as_read(current_user, db, notification_ids)
+    return s.UnreadNotificationsCount(count=c.get_unread_notifications_count(current_user, db))
 
 
 @push_notification_router.put(
@@ -44,7 +71,7 @@ def get_notifications(
 def mark_notification_as_read(
     notification_uuid: str,
     db: Session = Depends(get_db),
-    current_user: m.User = Depends(get_current_user),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
 ):
     notification = db.scalar(
         sa.select(m.PushNotification).where(
@@ -56,14 +83,13 @@ def mark_notification_as_read(
         log(log.ERROR, "Query is empty")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query is empty")
 
-    if not c.notification_is_read_by_user(notification, current_user):
-        notification.read_by.append(current_user)
-        db.commit()
+    if not c.notification_is_read_by_user(notification, current_user.id, db):
+        c.mark_notifications_as_read(current_user, db, [notification.id])
     return s.PushNotificationOut(
         uuid=notification.uuid,
         job_uuid=notification.job.uuid,
         n_type=s.PushNotificationType(notification.n_type),
         job_title=notification.job.title,
         created_at=notification.created_at,
-        read_by_me=c.notification_is_read_by_user(notification, current_user),
+        read_by_me=c.notification_is_read_by_user(notification, current_user.id, db),
     )
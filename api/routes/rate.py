@@ -5,7 +5,8 @@ import sqlalchemy as sa
 
 import app.models as m
 import app.schema as s
-from api.dependency import get_current_user
+import api.controllers as c
+from api.dependency import get_current_principal, get_current_user
 from app.database import get_db
 
 from app.logger import log
@@ -18,7 +19,7 @@ rate_router = APIRouter(prefix="/rates", tags=["rates"])
     status_code=status.HTTP_200_OK,
     response_model=s.RateOut,
     responses={status.HTTP_404_NOT_FOUND: {"description": "Rate not found"}},
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def get_rate(
     rate_uuid: str,
@@ -42,7 +43,7 @@ def get_rate(
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "Specialist not found"},
     },
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def get_rates(
     specialist_uuid: str,
@@ -109,6 +110,7 @@ def get_rates(
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "Job not found"},
         status.HTTP_403_FORBIDDEN: {"description": "User is not owner or worker of job"},
+        status.HTTP_409_CONFLICT: {"description": "Job has no worker"},
     },
 )
 def create_rate(
@@ -142,6 +144,10 @@ def create_rate(
         log(log.ERROR, "User [%s] is not owner or worker of job [%s]", current_user.uuid, job.uuid)
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not owner or worker of job")
 
+    if not receiver_id:
+        log(log.ERROR, "Job [%s] has no worker", job.uuid)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job has no worker")
+
     # Create rate
     rate = m.Rate(
         rate=data.rate,
@@ -152,6 +158,7 @@ def create_rate(
     )
 
     db.add(rate)
+    c.add_user_rate(receiver_id, data.rate, db)
     db.commit()
     db.refresh(rate)
 
@@ -192,6 +199,9 @@ def update_rate(
         log(log.ERROR, "Rate [%s] not belongs to user [%s]", rate_uuid, current_user.uuid)
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Rate not belongs to user")
 
+    if rate_db.rate != rate.rate:
+        c.change_user_rate(rate_db.receiver_id, rate_db.rate, rate.rate, db)
+
     rate_db.rate = rate.rate
     rate_db.review = rate.review
 
@@ -5,7 +5,6 @@ from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
 from google.oauth2 import id_token
-from google.auth.transport import requests
 
 import api.controllers as c
 from api.controllers.user import create_out_search_users, get_user_auth_account
@@ -13,7 +12,7 @@ from api.dependency.s3_client import get_s3_connect
 from api.utils import get_file_extension, mark_as_deleted
 import app.models as m
 import app.schema as s
-from api.dependency import get_current_user
+from api.dependency import get_current_principal, get_current_user, invalidate_user_principal
 from app.database import get_db
 from app.logger import log
 from app.schema.language import Language
@@ -96,7 +95,7 @@ def search_users(
     responses={
         status.HTTP_404_NOT_FOUND: {"description": "User not found"},
     },
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
 )
 def get_user_profile(
     user_uuid: str,
@@ -174,7 +173,7 @@ def register_google_account(
     try:
         id_info_res: s.GoogleTokenVerification = id_token.verify_oauth2_token(
             auth_data.id_token,
-            requests.Request(),
+            c.google_certs_request,
             CFG.GOOGLE_CLIENT_ID,
         )
 
@@ -290,6 +289,7 @@ def update_user(
         basic_auth.email = user_data.email
 
     db.commit()
+    invalidate_user_principal(current_user.id)
     log(log.INFO, "User [%s] successfully updated profile", current_user.fullname)
 
     return s.UserPut(
@@ -332,6 +332,7 @@ def delete_user(
         auth_account.oauth_id = deleted_mark
 
     db.commit()
+    invalidate_user_principal(current_user.id)
     log(log.INFO, "User [%s] successfully deleted profile", current_user.fullname)
 
 
@@ -516,6 +517,69 @@ def delete_favorite_experts(
     log(log.INFO, "User [%s] successfully updated favorite experts list", current_user.id)
 
 
+@user_router.post(
+    "/avatar/upload-url",
+    status_code=status.HTTP_201_CREATED,
+    response_model=s.FileUploadOut,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Unknown file extension"},
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"description": "File is too large"},
+    },
+)
+def create_user_avatar_upload(
+    file: s.FileUploadIn,
+    db: Session = Depends(get_db),
+    s3_client: S3Client = Depends(get_s3_connect),
+    current_user: s.UserPrincipal = Depends(get_current_principal),
+):
+    """Returns presigned POST to upload user avatar"""
+
+    return c.create_presigned_upload(
+        file,
+        current_user.id,
+        db,
+        s3_client,
+        file_types=(s.FileType.IMAGE,),
+        max_size=CFG.MAX_AVATAR_FILE_SIZE,
+        file_name_url=f"users/{current_user.uuid}/avatar",
+    )
+
+
+@user_router.put(
+    "/avatar/complete",
+    status_code=status.HTTP_200_OK,
+    response_model=s.UserPut,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid upload token or file"},
+        status.HTTP_404_NOT_FOUND: {"description": "File was not uploaded"},
+    },
+)
+def complete_user_avatar_upload(
+    data: s.FileUploadCompleteIn,
+    db: Session = Depends(get_db),
+    s3_client: S3Client = Depends(get_s3_connect),
+    current_user: m.User = Depends(get_current_user),
+):
+    """Checks avatar uploaded with presigned POST and sets it to user"""
+
+    file_model = c.complete_presigned_upload(
+        data.upload_token, current_user.id, db, s3_client, f"users/{current_user.uuid}/avatar"
+    )
+    current_user.avatar_id = file_model.id
+    db.commit()
+
+    log(log.INFO, "User [%s] avatar was added", current_user.id)
+
+    return s.UserPut(
+        fullname=current_user.fullname,
+        email=current_user.basic_auth_account.email,
+        description=current_user.description,
+        locations=[loc.uuid for loc in current_user.locations],
+        services=[s.uuid for s in current_user.services],
+        avatar_url=file_model.url,
+    )
+
+
 @user_router.put(
     "/avatar",
     status_code=status.HTTP_200_OK,
@@ -523,7 +587,6 @@ def delete_favorite_experts(
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Unknown file extension"},
     },
-    dependencies=[Depends(get_current_user)],
 )
 def upload_user_avatar(
     file: UploadFile,
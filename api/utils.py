@@ -1,19 +1,36 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from typing import Any, Generic, Hashable, TypeVar
+
 import filetype
 from fastapi import UploadFile, HTTPException, status
 from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
 import app.models as m
+from app.controllers import region_names
 
 from app.logger import log
 from app.schema.language import Language
 
 
+FILE_HEADER_SIZE = 8192
+
+
 def custom_generate_unique_id(route: APIRoute):
     return f"{route.tags[0]}-{route.name}"
 
 
 def get_file_extension(file: UploadFile):
-    extension = filetype.guess_extension(file.file)
+    # type is sniffed from the first chunk (magic numbers), the rest of file is streamed to storage later
+    header = file.file.read(FILE_HEADER_SIZE)
+    file.file.seek(0)
+    extension = filetype.guess_extension(header)
 
     if not extension:
         log(log.ERROR, "Extension not found for image [%s]", file.filename)
@@ -28,12 +45,12 @@ def mark_as_deleted():
     return f"deleted-{current_timestamp}"
 
 
-def format_location_string(location: m.Location, address: m.Address, lang: Language):
+def format_location_string(location_id: int | None, address: m.Address | None, lang: Language, db: Session):
     ALL_UKRAINE = "Вся Україна" if lang == Language.UA else "All Ukraine"
     job_location = ALL_UKRAINE
 
-    if location:
-        job_location = location.region[0].name_ua if lang == Language.UA else location.region[0].name_en
+    if location_id:
+        job_location = region_names.get(location_id, db).name(lang)
 
     job_address = None
     if address:
@@ -42,3 +59,76 @@ def format_location_string(location: m.Location, address: m.Address, lang: Langu
         job_address = f"{lang_type} {lang_name}"
 
     return (job_location, job_address)
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    """Checks If-None-Match request header against response ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encodes keyset pagination values (last row sort key and id) into opaque cursor"""
+    data = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Decodes cursor created by encode_cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        log(log.ERROR, "Invalid cursor [%s]", cursor)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if not isinstance(values, list):
+        log(log.ERROR, "Invalid cursor [%s]", cursor)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return values
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """In-process LRU cache which entries expire after ttl seconds (shared by requests of API worker)"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, key: K):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -171,6 +171,55 @@ def init(app: Flask):
         fix_users_average_rate()
         print("done")
 
+    @app.cli.command("dispatch-notifications")
+    @click.option("--once", is_flag=True, help="Send due messages and exit")
+    def dispatch_notifications(once: bool):
+        """Send push notifications from outbox (runs as a separate service)"""
+        from .push_notification import dispatch_outbox
+
+        dispatch_outbox(once)
+
+    @app.cli.command("check-push-receipts")
+    def check_push_receipts():
+        """Check receipts of sent push notifications, delete devices with unregistered tokens"""
+        from .push_notification import check_receipts
+
+        check_receipts()
+        print("done")
+
+    @app.cli.command("generate-file-variants")
+    @click.option("--once", is_flag=True, help="Generate variants of current files and exit")
+    def generate_file_variants(once: bool):
+        """Generate thumbnails and webp/avif variants of uploaded images (runs as a separate service)"""
+        from .file import generate_variants
+
+        generate_variants(once)
+
+    @app.cli.command("delete-files")
+    @click.option("--once", is_flag=True, help="Delete queued and orphan files and exit")
+    def delete_files(once: bool):
+        """Delete files from S3 in batches and collect orphan files (runs as a separate service)"""
+        from .file import delete_files
+
+        delete_files(once)
+
+    @app.cli.command("benchmark-password-hashing")
+    @click.option("--logins", default=16, type=int, help="Count of concurrent logins")
+    def benchmark_password_hashing(logins: int):
+        """Measure password checks per second with current hashing method and workers"""
+        from .password import benchmark_password_hashing
+
+        benchmark_password_hashing(logins)
+
+    @app.cli.command("refresh-job-statistics")
+    @click.option("--once", is_flag=True, help="Refresh statistics and exit")
+    def refresh_job_statistics(once: bool):
+        """Refresh public job statistics by schedule (runs as a separate service)"""
+        from .job import refresh_jobs_statistics
+
+        refresh_jobs_statistics(once)
+        print("done")
+
     @app.cli.command()
     def get_rayons():
         """Get rayons from Meest Express Public API"""
@@ -0,0 +1,50 @@
+import time
+
+from api.controllers import (
+    collect_orphan_files,
+    delete_queued_files,
+    generate_files_variants,
+    get_files_without_variants,
+)
+from api.dependency.s3_client import get_s3_connect
+from app import db
+from app.logger import log
+from config import config
+
+CFG = config()
+
+FILES_BATCH = 100
+
+
+def generate_variants(once: bool = False):
+    """Generate derivatives of uploaded images which have none, wait for new uploads if once is False"""
+    s3_client = get_s3_connect()
+    while True:
+        with db.Session() as session:
+            file_ids = get_files_without_variants(session)
+            for i in range(0, len(file_ids), FILES_BATCH):
+                generate_files_variants(session, s3_client, file_ids[i : i + FILES_BATCH])
+        if file_ids:
+            log(log.INFO, "Variants of [%d] files processed", len(file_ids))
+        if once:
+            return
+        time.sleep(CFG.FILE_VARIANTS_INTERVAL)
+
+
+def delete_files(once: bool = False):
+    """Delete queued files from S3 and collect orphan files, wait for new ones if once is False"""
+    s3_client = get_s3_connect()
+    collected_at = 0.0
+    while True:
+        with db.Session() as session:
+            if time.monotonic() - collected_at > CFG.ORPHAN_FILES_INTERVAL:
+                while collect_orphan_files(session):
+                    pass
+                collected_at = time.monotonic()
+            count = delete_queued_files(session, s3_client)
+        if count:
+            log(log.DEBUG, "Deleted [%d] files from S3", count)
+            continue
+        if once:
+            return
+        time.sleep(CFG.FILE_DELETIONS_INTERVAL)
@@ -1,9 +1,11 @@
 import json
+import time
 from datetime import datetime
 
 import sqlalchemy as sa
 from googleapiclient.discovery import build
 
+from api.controllers import refresh_job_statistics
 from app import models as m
 from app import schema as s
 from app.database import db
@@ -36,6 +38,18 @@ STATUS = "status"
 TEST_DATA = "01.11.2023"
 
 
+def refresh_jobs_statistics(once: bool = False):
+    """Recalculate public jobs and experts counts per location, repeat by schedule if once is False.
+    API updates counts of changed locations itself, schedule covers changes made by admin and commands
+    """
+    while True:
+        with db.begin() as session:
+            refresh_job_statistics(session)
+        if once:
+            return
+        time.sleep(CFG.JOB_STATISTICS_REFRESH_INTERVAL)
+
+
 def write_jobs_in_db(jobs: list[s.JobCompletedCreate]):
     with db.begin() as session:
         if not session.scalar(sa.select(m.Location)):
@@ -108,6 +122,7 @@ def write_jobs_in_db(jobs: list[s.JobCompletedCreate]):
             log(log.DEBUG, "Job with title [%s] created", job.title)
 
     fix_users_average_rate()
+    refresh_jobs_statistics(once=True)
 
 
 def export_jobs_from_google_spreadsheets(with_print: bool = True, in_json: bool = False):
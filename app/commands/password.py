@@ -0,0 +1,29 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.controllers import password_hasher
+from app.logger import log
+from config import config
+
+CFG = config()
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def benchmark_password_hashing(logins: int):
+    """Check passwords of concurrent logins in hashing processes, report logins per second"""
+    password_hash = password_hasher.hash(BENCHMARK_PASSWORD)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max(CFG.PASSWORD_HASH_WORKERS, 1) * 2) as executor:
+        results = list(executor.map(lambda _: password_hasher.check(password_hash, BENCHMARK_PASSWORD), range(logins)))
+    duration = time.perf_counter() - start
+    assert all(results), "password check failed"
+    cores = min(max(CFG.PASSWORD_HASH_WORKERS, 1), os.cpu_count() or 1)
+    log(
+        log.INFO,
+        "Password checks [%s]: [%.1f] logins/sec, [%.1f] per core",
+        CFG.PASSWORD_HASH_METHOD,
+        logins / duration,
+        logins / duration / cores,
+    )
@@ -0,0 +1,30 @@
+import time
+
+from api.controllers import check_push_receipts, dispatch_push_notifications
+from app import db
+from app.logger import log
+from config import config
+
+CFG = config()
+
+
+def dispatch_outbox(once: bool = False):
+    """Send due push messages from outbox and check their receipts, wait for new ones if once is False"""
+    while True:
+        with db.Session() as session:
+            count = dispatch_push_notifications(session)
+            receipts_count = check_push_receipts(session)
+        if count or receipts_count:
+            log(log.DEBUG, "Dispatched [%d] push messages, checked [%d] receipts", count, receipts_count)
+            continue
+        if once:
+            return
+        time.sleep(CFG.PUSH_DISPATCH_INTERVAL)
+
+
+def check_receipts():
+    """Check all due receipts of sent push messages"""
+    while True:
+        with db.Session() as session:
+            if not check_push_receipts(session):
+                return
@@ -1,14 +1,8 @@
 from app import db
-import sqlalchemy as sa
-from app import models as m
-from api.controllers import update_user_average_rate
+from api.controllers import fix_users_rates
 
 
 def fix_users_average_rate():
-    """Update users average rate"""
+    """Update users rates count, sum and average rate"""
     with db.begin() as session:
-        stmt = sa.select(m.User)
-        users = session.scalars(stmt).all()
-
-        for user in users:
-            update_user_average_rate(user, session)
+        fix_users_rates(session)
@@ -1,2 +1,3 @@
 # ruff: noqa: F401
 from .pagination import create_pagination
+from .region_names import RegionNames, region_names
@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app import models as m
+from app import schema as s
+from app.logger import log
+from app.schema.language import Language
+from config import config
+
+CFG = config()
+
+
+class RegionNames(NamedTuple):
+    location_id: int
+    location_uuid: str
+    name_ua: str
+    name_en: str
+
+    def name(self, lang: Language | str | None) -> str:
+        return self.name_ua if lang in (Language.UA, CFG.UA) else self.name_en
+
+    def location_strings(self, lang: Language | str | None) -> s.LocationStrings:
+        return s.LocationStrings(uuid=self.location_uuid, name=self.name(lang))
+
+
+class RegionNamesCache:
+    """In-process cache of region names by location id and uuid
+
+    Regions are loaded once and reloaded only when their version (count and last update time) changes.
+    Version is checked not more often than CFG.REGION_NAMES_CHECK_INTERVAL seconds,
+    so changes made by other processes (Flask admin) are picked up by every API worker.
+    """
+
+    def __init__(self, check_interval: int):
+        self.check_interval = check_interval
+        self.by_id: dict[int, RegionNames] = {}
+        self.by_uuid: dict[str, RegionNames] = {}
+        self.version: tuple | None = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        self.version = None
+        self.checked_at = 0.0
+
+    def refresh(self, db: Session):
+        if self.version is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return
+
+        with self.lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.check_interval:
+                return
+
+            version = tuple(db.execute(sa.select(sa.func.count(m.Region.id), sa.func.max(m.Region.updated_at))).one())
+            if version != self.version:
+                rows = db.execute(
+                    sa.select(m.Location.id, m.Location.uuid, m.Region.name_ua, m.Region.name_en)
+                    .join(m.Region, m.Region.location_id == m.Location.id)
+                    .order_by(m.Region.id.desc())
+                ).all()
+                # first region of location wins (same as location.region[0])
+                by_id = {row.id: RegionNames(*row) for row in rows}
+                self.by_uuid = {names.location_uuid: names for names in by_id.values()}
+                self.by_id = by_id
+                self.version = version
+                log(log.DEBUG, "Region names cache loaded: [%d] locations", len(by_id))
+
+            self.checked_at = time.monotonic()
+
+    def get(self, location_id: int, db: Session) -> RegionNames:
+        self.refresh(db)
+        names = self.by_id.get(location_id)
+        if names is None:
+            # region could be added after last check, version is checked again (reloaded only if changed)
+            self.checked_at = 0.0
+            self.refresh(db)
+            names = self.by_id.get(location_id)
+        if names is None:
+            log(log.WARNING, "Region of location [%s] not found", location_id)
+            location_uuid = db.scalar(sa.select(m.Location.uuid).where(m.Location.id == location_id))
+            names = RegionNames(location_id, location_uuid or "", "", "")
+        return names
+
+    def get_by_uuid(self, location_uuid: str, db: Session) -> RegionNames | None:
+        self.refresh(db)
+        return self.by_uuid.get(location_uuid)
+
+    def all(self, db: Session) -> list[RegionNames]:
+        self.refresh(db)
+        return sorted(self.by_id.values(), key=lambda names: names.location_id)
+
+
+region_names = RegionNamesCache(CFG.REGION_NAMES_CHECK_INTERVAL)
@@ -1,5 +1,7 @@
 from typing import Generator
 
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from config import config
@@ -20,3 +22,10 @@ if CFG.IS_API:
 def get_db() -> Generator[Session, None, None]:
     with db.Session() as session:
         yield session
+
+
+def dialect_insert(table: sa.Table | type, session: Session) -> postgresql.Insert | sqlite.Insert:
+    """Returns INSERT for session database which supports ON CONFLICT (PostgreSQL in production, SQLite in tests)"""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
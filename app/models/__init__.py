@@ -18,10 +18,12 @@ from .auth_account import AuthAccount
 from .job_services import JobService
 
 from .files_job import files_job
+from .file_deletions import file_deletions
 from .favorite_jobs import favorite_jobs
 from .favorite_experts import favorite_experts
 from .job_applications import job_applications
 from .job_rates import job_rates, JobRate
+from .job_statistics import JobStatistics
 from .device import Device
 from .notification_devices import notification_devices
 from .notification_users import notification_users
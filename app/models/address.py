@@ -9,14 +9,24 @@ from app.database import db
 from .utils import ModelMixin
 
 
+def normalize_address_name(name: str) -> str:
+    """Normalized street name for search (same as lower(trim(name)) in SQL)"""
+    return name.strip().lower()
+
+
 class Address(db.Model, ModelMixin):
     __tablename__ = "addresses"
 
+    __table_args__ = (
+        sa.Index("ix_addresses_city_id_search_ua", "city_id", "search_ua"),
+        sa.Index("ix_addresses_city_id_search_en", "city_id", "search_en"),
+    )
+
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     uuid: orm.Mapped[str] = orm.mapped_column(sa.String(36), default=lambda: str(uuid4()))
 
     # From Meest Express Public API
-    street_id: orm.Mapped[str] = orm.mapped_column(sa.String(36))
+    street_id: orm.Mapped[str] = orm.mapped_column(sa.String(36), index=True)
     city_id: orm.Mapped[str] = orm.mapped_column(sa.String(36))
 
     # name ua
@@ -24,6 +34,10 @@ class Address(db.Model, ModelMixin):
     # name en
     line2: orm.Mapped[str] = orm.mapped_column(sa.String(255))
 
+    # normalized line1 and line2, filled on set (see validate_lines)
+    search_ua: orm.Mapped[str] = orm.mapped_column(sa.String(255), server_default="", default="")
+    search_en: orm.Mapped[str] = orm.mapped_column(sa.String(255), server_default="", default="")
+
     # вул. парк пл. ст. просп. пров. шосе...
     street_type_ua: orm.Mapped[str] = orm.mapped_column(sa.String(36), server_default="", default="")
     street_type_en: orm.Mapped[str] = orm.mapped_column(sa.String(36), server_default="", default="")
@@ -46,5 +60,13 @@ class Address(db.Model, ModelMixin):
     )
     is_deleted: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
 
+    @orm.validates("line1", "line2")
+    def validate_lines(self, key: str, value: str) -> str:
+        if key == "line1":
+            self.search_ua = normalize_address_name(value)
+        else:
+            self.search_en = normalize_address_name(value)
+        return value
+
     def __repr__(self):
         return f"<{self.id}: {self.line1} >"
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import TYPE_CHECKING
 from uuid import uuid4
 import enum
 
@@ -9,6 +10,9 @@ from app.database import db
 
 from .utils import ModelMixin
 
+if TYPE_CHECKING:
+    from .user import User
+
 
 class ApplicationType(enum.Enum):
     INVITE = "invite"
@@ -24,6 +28,8 @@ class ApplicationStatus(enum.Enum):
 class Application(db.Model, ModelMixin):
     __tablename__ = "applications"
 
+    __table_args__ = (sa.Index("ix_applications_worker_id_status", "worker_id", "status"),)
+
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     uuid: orm.Mapped[str] = orm.mapped_column(sa.String(36), default=lambda: str(uuid4()))
 
@@ -47,5 +53,7 @@ class Application(db.Model, ModelMixin):
     )
     is_deleted: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
 
+    worker: orm.Mapped["User"] = orm.relationship(viewonly=True)
+
     def __repr__(self):
         return f"<Application {self.id}: worker {self.worker_id} -> job {self.job_id} ({self.type})>"
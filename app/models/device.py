@@ -25,7 +25,7 @@ class Device(db.Model, ModelMixin):
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     device_id: orm.Mapped[str] = orm.mapped_column(sa.String(64), nullable=False)  # Device ID, received from the device
-    user_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey("users.id"))
+    user_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey("users.id"), index=True)
     push_token: orm.Mapped[str] = orm.mapped_column(
         sa.String(512), nullable=False
     )  # Push token, received from the device
@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import datetime
 from uuid import uuid4
 
 import sqlalchemy as sa
@@ -31,8 +31,11 @@ class File(db.Model, ModelMixin):
 
     is_deleted: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
 
+    # derivatives of image (thumbnail, resized webp/avif), None until they are generated
+    variants: orm.Mapped[list[dict] | None] = orm.mapped_column(sa.JSON, nullable=True)
+
     updated_at: orm.Mapped[datetime] = orm.mapped_column(
-        sa.DateTime, default=datetime.now(UTC), server_default=sa.func.now(), onupdate=sa.func.now()
+        sa.DateTime, default=sa.func.now(), server_default=sa.func.now(), onupdate=sa.func.now()
     )
 
     @property
@@ -43,6 +46,17 @@ class File(db.Model, ModelMixin):
     def s3_url(self):
         return f"s3://{CFG.AWS_S3_BUCKET_NAME}/{self.key}"
 
+    @property
+    def images(self) -> list[dict]:
+        return [dict(variant, url=f"{CFG.AWS_S3_BUCKET_URL}{variant['key']}") for variant in self.variants or []]
+
+    @property
+    def thumbnail_url(self) -> str | None:
+        for variant in self.variants or []:
+            if variant["name"] == "thumbnail":
+                return f"{CFG.AWS_S3_BUCKET_URL}{variant['key']}"
+        return None
+
     def mark_as_deleted(self):
         delete_date = datetime.now().strftime("%y-%m-%d_%H:%M:%S")
         delete_suffix = f"-deleted-{delete_date}"
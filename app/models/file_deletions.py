@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app.database import db
+
+# S3 keys of deleted files, objects are deleted in batches by command (see api/controllers/file_deletion.py)
+file_deletions = sa.Table(
+    "file_deletions",
+    db.Model.metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("key", sa.String(512), nullable=False),
+    sa.Column("attempts", sa.Integer, default=0, server_default="0", nullable=False),
+    sa.Column("next_attempt_at", sa.DateTime, default=datetime.utcnow, server_default=sa.func.now(), nullable=False),
+    sa.Column("error", sa.String(256), default="", server_default="", nullable=False),
+    sa.Index("ix_file_deletions_next_attempt_at", "next_attempt_at"),
+    # pending presigned uploads are cancelled by key
+    sa.Index("ix_file_deletions_key", "key"),
+)
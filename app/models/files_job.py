@@ -15,4 +15,5 @@ files_job = sa.Table(
         "job_id",
         sa.ForeignKey("jobs.id"),
     ),
+    sa.Index("ix_files_job_file_id", "file_id"),
 )
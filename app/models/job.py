@@ -3,6 +3,7 @@ from uuid import uuid4
 
 import sqlalchemy as sa
 from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
 
 from app.database import db
 from app import schema as s
@@ -25,9 +26,23 @@ if TYPE_CHECKING:
     from .file import File
 
 
+# same expression as in migration b002ba1a7484_jobs_full_text_search
+JOBS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
 class Job(db.Model, ModelMixin):
     __tablename__ = "jobs"
 
+    __table_args__ = (
+        sa.Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        # jobs of user by status (see api/controllers/job.py get_user_jobs)
+        sa.Index("ix_jobs_owner_id_status_updated_at", "owner_id", "status", "updated_at"),
+        sa.Index("ix_jobs_worker_id_status_updated_at", "worker_id", "status", "updated_at"),
+    )
+
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
 
     uuid: orm.Mapped[str] = orm.mapped_column(sa.String(36), default=lambda: str(uuid4()))
@@ -55,7 +70,9 @@ class Job(db.Model, ModelMixin):
 
     cost: orm.Mapped[float | None] = orm.mapped_column(sa.Float)
 
-    location_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey("locations.id"), nullable=True)
+    location_id: orm.Mapped[int] = orm.mapped_column(
+        sa.Integer, sa.ForeignKey("locations.id"), nullable=True, index=True
+    )
 
     owner_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
 
@@ -74,6 +91,14 @@ class Job(db.Model, ModelMixin):
 
     is_deleted: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
 
+    # generated by PostgreSQL from title and description, used for full text search
+    search_vector: orm.Mapped[str | None] = orm.mapped_column(
+        sa.Text().with_variant(postgresql.TSVECTOR(), "postgresql"),
+        sa.Computed(JOBS_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+        info={"postgresql_only": True},
+    )
+
     location: orm.Mapped["Location"] = orm.relationship()
     address: orm.Mapped["Address"] = orm.relationship()
 
@@ -89,6 +114,8 @@ class Job(db.Model, ModelMixin):
         backref="jobs",
     )
 
+    owner: orm.Mapped["User"] = orm.relationship(foreign_keys=[owner_id], viewonly=True)
+
     applications: orm.Mapped[list["Application"]] = orm.relationship(secondary=job_applications)
 
     rates: orm.Mapped[list["Rate"]] = orm.relationship(secondary=job_rates)
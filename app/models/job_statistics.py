@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from app.database import db
+
+
+class JobStatistics(db.Model):
+    """Public jobs and experts counts per location (see api/controllers/job.py refresh_job_statistics)"""
+
+    __tablename__ = "job_statistics"
+
+    location_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey("locations.id"), primary_key=True)
+    jobs_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+    experts_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+
+    updated_at: orm.Mapped[datetime] = orm.mapped_column(
+        sa.DateTime,
+        default=sa.func.now(),
+        onupdate=sa.func.now(),
+    )
+
+    def __repr__(self):
+        return f"<JobStatistics {self.location_id}: {self.jobs_count} jobs, {self.experts_count} experts>"
@@ -1,11 +1,31 @@
+from datetime import datetime
+
 import sqlalchemy as sa
 
 from app.database import db
+from app.schema.push_notification import PushDeliveryStatus
 
+# notification recipients, also used as push messages outbox (see api/controllers/push_dispatcher.py)
 notification_devices = sa.Table(
     "notification_devices",
     db.Model.metadata,
     sa.Column("id", sa.Integer, primary_key=True),
     sa.Column("notification_id", sa.ForeignKey("push_notifications.id")),
     sa.Column("device_id", sa.ForeignKey("devices.id")),
+    sa.Column(
+        "status",
+        sa.String(16),
+        default=PushDeliveryStatus.PENDING.value,
+        server_default=PushDeliveryStatus.PENDING.value,
+        nullable=False,
+    ),
+    sa.Column("attempts", sa.Integer, default=0, server_default="0", nullable=False),
+    sa.Column("next_attempt_at", sa.DateTime, default=datetime.utcnow, server_default=sa.func.now(), nullable=False),
+    # Expo push ticket id, used to get push receipt
+    sa.Column("ticket_id", sa.String(64), default="", server_default="", nullable=False),
+    sa.Column("sent_at", sa.DateTime, nullable=True),
+    sa.Column("error", sa.String(256), default="", server_default="", nullable=False),
+    sa.Index("ix_notification_devices_status_next_attempt_at", "status", "next_attempt_at"),
+    # notifications of user devices (inbox)
+    sa.Index("ix_notification_devices_device_id_notification_id", "device_id", "notification_id"),
 )
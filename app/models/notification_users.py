@@ -8,4 +8,6 @@ notification_users = sa.Table(
     sa.Column("id", sa.Integer, primary_key=True),
     sa.Column("notification_id", sa.ForeignKey("push_notifications.id")),
     sa.Column("user_id", sa.ForeignKey("users.id")),
+    # notification is read by user once, read state is looked up by (user_id, notification_id)
+    sa.Index("ix_notification_users_user_id_notification_id", "user_id", "notification_id", unique=True),
 )
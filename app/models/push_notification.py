@@ -49,6 +49,11 @@ class PushNotification(db.Model, ModelMixin):
     )
     is_deleted: orm.Mapped[bool] = orm.mapped_column(default=False)
 
+    # delivery stats of push messages (see api/controllers/push_dispatcher.py)
+    sent_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+    delivered_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+    failed_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+
     created_by_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
     job_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey("jobs.id"), nullable=True)
 
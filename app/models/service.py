@@ -3,6 +3,7 @@ from uuid import uuid4
 
 import sqlalchemy as sa
 from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
 
 from app.database import db
 from app.schema.service import ServiceDB
@@ -16,9 +17,15 @@ if TYPE_CHECKING:
     from .job import Job
 
 
+# same expression as in migration b002ba1a7484_jobs_full_text_search
+SERVICES_SEARCH_VECTOR = "to_tsvector('simple', coalesce(name_ua, '') || ' ' || coalesce(name_en, ''))"
+
+
 class Service(db.Model, ModelMixin):
     __tablename__ = "services"
 
+    __table_args__ = (sa.Index("ix_services_search_vector", "search_vector", postgresql_using="gin"),)
+
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     uuid: orm.Mapped[str] = orm.mapped_column(sa.String(36), default=lambda: str(uuid4()))
 
@@ -36,6 +43,14 @@ class Service(db.Model, ModelMixin):
     )
     is_deleted: orm.Mapped[bool] = orm.mapped_column(default=False)
 
+    # generated by PostgreSQL from name_ua and name_en, used for full text search of jobs
+    search_vector: orm.Mapped[str | None] = orm.mapped_column(
+        sa.Text().with_variant(postgresql.TSVECTOR(), "postgresql"),
+        sa.Computed(SERVICES_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+        info={"postgresql_only": True},
+    )
+
     jobs: orm.Mapped[list["Job"]] = orm.relationship("Job", secondary=job_services, back_populates="services")
 
     @property
@@ -36,7 +36,7 @@ class User(db.Model, ModelMixin):
         sa.CheckConstraint(f"average_rate <= {CFG.MAXIMUM_RATE}", name="max_rate_check"),
     )
 
-    avatar_id: orm.Mapped[int | None] = orm.mapped_column(sa.ForeignKey("files.id"), nullable=True)
+    avatar_id: orm.Mapped[int | None] = orm.mapped_column(sa.ForeignKey("files.id"), nullable=True, index=True)
 
     rates_as_giver: orm.Mapped[list["Rate"]] = orm.relationship(
         "Rate",
@@ -75,6 +75,9 @@ class User(db.Model, ModelMixin):
     is_deleted: orm.Mapped[bool] = orm.mapped_column(default=False)
 
     average_rate: orm.Mapped[float] = orm.mapped_column(sa.Float, default=0)
+    # number and sum of received rates, updated with average_rate (see api/controllers/rate.py)
+    owned_rates_count: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0", index=True)
+    rates_sum: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
 
     # Relationships
     avatar: orm.Mapped["File"] = orm.relationship("File", uselist=False)
@@ -100,6 +103,12 @@ class User(db.Model, ModelMixin):
             return self.avatar.url
         return None
 
+    @property
+    def avatar_thumbnail_url(self):
+        if self.avatar:
+            return self.avatar.thumbnail_url
+        return None
+
     @property
     def basic_auth_account(self):
         for acc in self.auth_accounts:
@@ -115,10 +124,6 @@ class User(db.Model, ModelMixin):
     def apple_auth_accounts(self):
         return [acc for acc in self.auth_accounts if acc.auth_type == AuthType.APPLE]
 
-    @property
-    def owned_rates_count(self) -> int:
-        return len(self.rates_as_receiver)
-
     @property
     def active_devices(self):
         return [device for device in self.devices if not device.is_deleted]
@@ -129,7 +134,7 @@ class User(db.Model, ModelMixin):
 
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, CFG.PASSWORD_HASH_METHOD)
 
     @classmethod
     def authenticate(
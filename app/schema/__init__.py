@@ -58,7 +58,7 @@ from .location import (
     AddressesListOut,
 )
 from .pagination import Pagination
-from .token import Token, TokenData
+from .token import Token, TokenData, UserPrincipal
 from .user import (
     User,
     UserFile,
@@ -111,8 +111,27 @@ from .meest_api import (
     AddressMeestApi,
     AddressList,
 )
-from .file import FileType, File, FileIn, FileOut, Files
+from .file import (
+    FileType,
+    File,
+    FileImage,
+    FileIn,
+    FileOut,
+    Files,
+    FileUploadIn,
+    FileUploadOut,
+    FileUploadCompleteIn,
+    FileUploadToken,
+    FILE_UPLOAD_TOKEN_AUDIENCE,
+)
 from .city import City, CityIn, CityOut, CitiesFile, CityAddressesOut
 
 from .device import DeviceIn, DeviceOut, DevicePlatform
-from .push_notification import PushNotificationType, PushNotificationOut
+from .push_notification import (
+    PushNotificationType,
+    PushNotificationOut,
+    PushDeliveryStatus,
+    PushNotificationsList,
+    UnreadNotificationsCount,
+    PushNotificationsReadIn,
+)
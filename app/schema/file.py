@@ -1,5 +1,8 @@
 import enum
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Final, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FileType(enum.Enum):
@@ -10,11 +13,21 @@ class FileType(enum.Enum):
     UNKNOWN = "unknown"
 
 
+class FileImage(BaseModel):
+    name: str  # thumbnail or width of image
+    format: str
+    width: int
+    height: int
+    url: str
+
+
 class File(BaseModel):
     name: str
     original_name: str
     type: str = FileType.IMAGE.value
     url: str
+    thumbnail_url: str | None = None
+    images: list[FileImage] = []  # smaller and compressed images, original url is used if empty
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -45,3 +58,37 @@ class Files(BaseModel):
     model_config = ConfigDict(
         from_attributes=True,
     )
+
+
+class FileUploadIn(BaseModel):
+    filename: str = Field(min_length=1, max_length=128)
+    content_type: str
+    size: int = Field(gt=0)
+
+
+class FileUploadOut(BaseModel):
+    url: str
+    fields: dict[str, str]  # form fields of POST request, file goes last
+    key: str
+    upload_token: str
+    expires_in: int
+
+
+class FileUploadCompleteIn(BaseModel):
+    upload_token: str
+
+
+# audience of upload tokens, they are signed with JWT_SECRET like access tokens
+FILE_UPLOAD_TOKEN_AUDIENCE: Final = "file_upload"
+
+
+class FileUploadToken(BaseModel):
+    aud: Literal["file_upload"]
+    uploader_id: int
+    uuid: str
+    name: str
+    original_name: str
+    key: str
+    content_type: str
+    size: int
+    exp: datetime
@@ -172,7 +172,7 @@ class JobSearch(BaseModel):
     uuid: str
     title: str
     description: str
-    location: LocationStrings
+    location: LocationStrings | None = None
     cost: int
     is_saved: bool
 
@@ -195,7 +195,7 @@ class JobCard(BaseModel):
     description: str
     cost: float
     is_saved: bool
-    location: LocationStrings
+    location: LocationStrings | None = None
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -292,6 +292,7 @@ class JobOutput(BaseModel):
 
 class JobsOut(BaseModel):
     items: list[JobOutput]
+    next_cursor: str | None = None  # cursor of the next page, None for the last page
 
 
 class JobByStatus(BaseModel):
@@ -316,6 +317,7 @@ class JobByStatus(BaseModel):
 
 class JobsByStatusList(BaseModel):
     items: list[JobByStatus]
+    next_cursor: str | None = None  # cursor of the next page, None for the last page
 
     model_config = ConfigDict(
         from_attributes=True,
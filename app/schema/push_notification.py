@@ -17,6 +17,13 @@ class PushNotificationType(Enum):
     job_canceled = "job_canceled"
 
 
+class PushDeliveryStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"  # accepted by Expo, waiting for receipt
+    DELIVERED = "delivered"  # delivered to Apple/Google push service
+    FAILED = "failed"
+
+
 class PushNotificationOut(BaseModel):
     uuid: str
     n_type: PushNotificationType
@@ -28,3 +35,16 @@ class PushNotificationOut(BaseModel):
     model_config = ConfigDict(
         from_attributes=True,
     )
+
+
+class PushNotificationsList(BaseModel):
+    items: list[PushNotificationOut]
+    next_cursor: str | None = None  # cursor of the next page, None for the last page
+
+
+class UnreadNotificationsCount(BaseModel):
+    count: int
+
+
+class PushNotificationsReadIn(BaseModel):
+    uuids: list[str] | None = None  # None marks all notifications as read
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Token(BaseModel):
@@ -10,3 +10,14 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: int
     exp: datetime
+
+
+class UserPrincipal(BaseModel):
+    """Authenticated user without ORM model, enough for most routes"""
+
+    id: int
+    uuid: str
+    location_ids: list[int] = []
+    service_ids: list[int] = []
+
+    model_config = ConfigDict(frozen=True)
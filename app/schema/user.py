@@ -154,6 +154,7 @@ class UserProfileOut(User):
     favorite_experts: list[UserFavoriteExpert] = []
     created_at: datetime
     avatar_url: str | None = None
+    avatar_thumbnail_url: str | None = None
 
     __hash__ = object.__hash__
 
@@ -194,3 +195,4 @@ class UserPut(BaseModel):
     locations: list[str] = []
     services: list[str] = []
     avatar_url: str | None = None
+    avatar_thumbnail_url: str | None = None
@@ -12,7 +12,7 @@ from flask_login import login_required
 from app import db
 from app import forms as f
 from app import models as m
-from app.controllers import create_pagination
+from app.controllers import create_pagination, region_names
 from app.logger import log
 from app.utilities import arg_params, Params
 
@@ -85,6 +85,7 @@ def edit(id: str):
         region.name_en = form.name_en.data.strip()
 
         db.session.commit()
+        region_names.invalidate()
         flash("Region updated", "success")
         log(log.INFO, "Region updated: [%s]", region)
         return redirect(url_for("region.get_all", **arg_params()))
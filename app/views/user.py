@@ -92,6 +92,8 @@ def delete(id: int):
         flash("There is no such user", "danger")
         return "no user", 404
 
+    # cached principals of API workers expire after CFG.USER_PRINCIPAL_CACHE_TTL seconds,
+    # routes which load user model (get_current_user) reject deleted user at once
     u.is_deleted = True
     db.session.commit()
     log(log.INFO, "User deleted. User: [%s]", u)
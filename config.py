@@ -45,6 +45,17 @@ class BaseConfig(BaseSettings):
     # API
     JWT_SECRET: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # werkzeug method and cost of new password hashes, older hashes are upgraded on login
+    PASSWORD_HASH_METHOD: str = "scrypt:32768:8:1"
+    PASSWORD_HASH_WORKERS: int = 2  # processes of every API worker, 0 hashes in request thread
+    PASSWORD_HASH_QUEUE_SIZE: int = 16  # requests waiting for hashing worker
+    PASSWORD_HASH_QUEUE_TIMEOUT: int = 2  # seconds, then request is rejected with 503
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    # decoded access tokens and user principals are cached between requests for a short time,
+    # so user deleted by admin keeps access to principal only routes up to USER_PRINCIPAL_CACHE_TTL seconds
+    ACCESS_TOKEN_CACHE_TTL: int = 60
+    USER_PRINCIPAL_CACHE_TTL: int = 30
+    AUTH_CACHE_SIZE: int = 10000
 
     # Business logic
 
@@ -57,6 +68,12 @@ class BaseConfig(BaseSettings):
     MAX_USER_SEARCH_RESULTS: int = 10
     MAX_JOBS_SEARCH_RESULTS: int = 15
 
+    JOBS_PAGE_LIMIT: int = 20
+    MAX_JOBS_PAGE_LIMIT: int = 100
+    # seconds public job statistics may be cached by clients and proxies
+    JOB_STATISTICS_MAX_AGE: int = 300
+    JOB_STATISTICS_REFRESH_INTERVAL: int = 10 * 60  # all locations are recalculated by refresh-job-statistics
+
     # for test data from google spreadsheets
 
     SCOPES: list[str] = ["https://www.googleapis.com/auth/spreadsheets"]
@@ -69,6 +86,20 @@ class BaseConfig(BaseSettings):
 
     USER_CAROUSEL_LIMIT: int = 16
 
+    # seconds between checks of regions table version by region names cache
+    REGION_NAMES_CHECK_INTERVAL: int = 60
+
+    SETTLEMENTS_LIMIT: int = 20
+    MAX_SETTLEMENTS_LIMIT: int = 100
+    # seconds between checks of settlements table version by settlements index
+    SETTLEMENTS_CHECK_INTERVAL: int = 300
+
+    ADDRESSES_LIMIT: int = 20
+    MAX_ADDRESSES_LIMIT: int = 100
+
+    NOTIFICATIONS_PAGE_LIMIT: int = 20
+    MAX_NOTIFICATIONS_PAGE_LIMIT: int = 100
+
     # Meest Public API
     SUCCESS_STATUS: int = 1
     REGIONS_API_URL: str = "https://publicapi.meest.com/geo_regions"
@@ -90,11 +121,16 @@ class BaseConfig(BaseSettings):
 
     # GOOGLE AUTH
     GOOGLE_CLIENT_ID: str = ""
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
 
     # APPLE AUTH
     APPLE_PUBLIC_KEY_URL: str = "https://appleid.apple.com/auth/keys"
     APPLE_ISSUER: str = "https://appleid.apple.com"
     APPLE_DECODE_ALGORITHMS: list[str] = ["RS256"]
+    # public keys of Apple and Google are cached, stale keys are used while refreshed in background
+    JWKS_CACHE_TTL: int = 3600
+    JWKS_MIN_REFRESH_INTERVAL: int = 60  # unknown key id refreshes keys not more often
+    JWKS_REQUEST_TIMEOUT: int = 10
 
     # S3
     AWS_ACCESS_KEY: str | None
@@ -102,9 +138,47 @@ class BaseConfig(BaseSettings):
     AWS_REGION: str | None
     AWS_S3_BUCKET_NAME: str = "kraftjar"
     AWS_S3_BUCKET_URL: str
+    # uploads are sent in multipart parts, memory of one file upload ~ S3_UPLOAD_PART_SIZE * S3_UPLOAD_CONCURRENCY
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    S3_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    S3_UPLOAD_CONCURRENCY: int = 4  # parts of one file sent at once
+    S3_UPLOAD_MAX_FILES: int = 4  # files uploaded at once by the process
+    # files uploaded by clients straight to S3 with presigned POST
+    S3_PRESIGNED_UPLOAD_EXPIRATION: int = 900
+    MAX_JOB_FILE_SIZE: int = 1024 * 1024 * 1024
+    MAX_AVATAR_FILE_SIZE: int = 10 * 1024 * 1024
+    # derivatives of uploaded images are generated by generate-file-variants command (service) next to original
+    FILE_VARIANTS_INTERVAL: int = 10  # seconds between checks for new uploads
+    IMAGE_VARIANT_MAX_SOURCE_SIZE: int = 50 * 1024 * 1024  # larger images are not read to memory, no variants
+    IMAGE_THUMBNAIL_SIZE: int = 128  # square thumbnail of cards and avatars
+    IMAGE_VARIANT_WIDTHS: list[int] = [640, 1280]
+    IMAGE_VARIANT_FORMATS: list[str] = ["webp", "avif"]  # formats not supported by Pillow build are skipped
+    IMAGE_VARIANT_QUALITY: int = 75
+    # deleted files are removed from S3 in batches by delete-files command (service)
+    FILE_DELETIONS_BATCH: int = 1000  # max keys of S3 DeleteObjects request
+    FILE_DELETIONS_INTERVAL: int = 60
+    FILE_DELETION_LEASE_SECONDS: int = 300
+    FILE_DELETION_MAX_ATTEMPTS: int = 5
+    ORPHAN_FILE_MAX_AGE: int = 24 * 60 * 60  # uploaded files not attached to job or avatar are deleted after
+    PENDING_UPLOAD_MAX_AGE: int = 60 * 60  # presigned uploads which are not completed are deleted after
+    ORPHAN_FILES_INTERVAL: int = 60 * 60
 
     # EXPO
     EXPO_TOKEN: str
+    EXPO_HOST: str = "https://exp.host"
+    EXPO_REQUEST_TIMEOUT: int = 10
+
+    # push messages outbox dispatcher
+    PUSH_CHUNK_SIZE: int = 100  # Expo limit of messages per request
+    PUSH_MAX_WORKERS: int = 4  # chunks sent concurrently
+    PUSH_DISPATCH_BATCH: int = 1000  # messages claimed at once
+    PUSH_DISPATCH_INTERVAL: int = 5  # seconds between outbox checks when it is empty
+    PUSH_LEASE_SECONDS: int = 60  # claimed messages are retried after lease if dispatcher fails
+    PUSH_MAX_ATTEMPTS: int = 5
+    PUSH_RETRY_BACKOFF: int = 30  # seconds before the first retry, doubled for every next one
+    PUSH_RECEIPT_DELAY: int = 900  # seconds before receipts are checked (Expo recommends 15 minutes)
+    PUSH_RECEIPT_MAX_AGE: int = 86400  # Expo keeps receipts for 24 hours
+    PUSH_RECEIPTS_BATCH: int = 1000  # Expo limit of receipt ids per request
 
     @staticmethod
     def configure(app):
@@ -0,0 +1,44 @@
+"""notifications inbox indexes
+
+Revision ID: 0b7e4d2a9c58
+Revises: f2b6d8a4c913
+Create Date: 2026-10-18 20:14:09.361742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e4d2a9c58'
+down_revision = 'f2b6d8a4c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep one read mark of notification per user
+    op.execute(
+        'DELETE FROM notification_users WHERE id NOT IN '
+        '(SELECT min(id) FROM notification_users GROUP BY user_id, notification_id)'
+    )
+
+    with op.batch_alter_table('devices', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_devices_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_devices_device_id_notification_id', ['device_id', 'notification_id'], unique=False)
+
+    with op.batch_alter_table('notification_users', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_users_user_id_notification_id', ['user_id', 'notification_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('notification_users', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_users_user_id_notification_id')
+
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_devices_device_id_notification_id')
+
+    with op.batch_alter_table('devices', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_devices_user_id'))
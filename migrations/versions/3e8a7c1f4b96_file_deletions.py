@@ -0,0 +1,49 @@
+"""file deletions
+
+Revision ID: 3e8a7c1f4b96
+Revises: 9c3f6a1d5e72
+Create Date: 2026-10-19 00:12:48.204613
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8a7c1f4b96'
+down_revision = '9c3f6a1d5e72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('file_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('error', sa.String(length=256), server_default='', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('file_deletions', schema=None) as batch_op:
+        batch_op.create_index('ix_file_deletions_next_attempt_at', ['next_attempt_at'], unique=False)
+
+    # references of files, unreferenced files are collected as garbage
+    with op.batch_alter_table('files_job', schema=None) as batch_op:
+        batch_op.create_index('ix_files_job_file_id', ['file_id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_avatar_id'), ['avatar_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_avatar_id'))
+
+    with op.batch_alter_table('files_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_files_job_file_id')
+
+    with op.batch_alter_table('file_deletions', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_deletions_next_attempt_at')
+
+    op.drop_table('file_deletions')
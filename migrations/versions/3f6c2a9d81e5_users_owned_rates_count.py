@@ -0,0 +1,32 @@
+"""users owned rates count
+
+Revision ID: 3f6c2a9d81e5
+Revises: b002ba1a7484
+Create Date: 2026-10-18 11:20:37.518245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6c2a9d81e5'
+down_revision = 'b002ba1a7484'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('owned_rates_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_users_owned_rates_count'), ['owned_rates_count'], unique=False)
+
+    op.execute(
+        'UPDATE users SET owned_rates_count = (SELECT count(rates.id) FROM rates WHERE rates.receiver_id = users.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_owned_rates_count'))
+        batch_op.drop_column('owned_rates_count')
@@ -0,0 +1,38 @@
+"""addresses search columns
+
+Revision ID: 5b8e1f4c9a37
+Revises: 7d41e0b5c2a8
+Create Date: 2026-10-18 14:21:37.402115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e1f4c9a37'
+down_revision = '7d41e0b5c2a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_ua', sa.String(length=255), server_default='', nullable=False))
+        batch_op.add_column(sa.Column('search_en', sa.String(length=255), server_default='', nullable=False))
+
+    op.execute('UPDATE addresses SET search_ua = lower(trim(line1)), search_en = lower(trim(line2))')
+
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.create_index('ix_addresses_city_id_search_ua', ['city_id', 'search_ua'], unique=False)
+        batch_op.create_index('ix_addresses_city_id_search_en', ['city_id', 'search_en'], unique=False)
+        batch_op.create_index(batch_op.f('ix_addresses_street_id'), ['street_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_addresses_street_id'))
+        batch_op.drop_index('ix_addresses_city_id_search_en')
+        batch_op.drop_index('ix_addresses_city_id_search_ua')
+        batch_op.drop_column('search_en')
+        batch_op.drop_column('search_ua')
@@ -0,0 +1,26 @@
+"""file deletions key index
+
+Revision ID: 7b2e9f4c1a63
+Revises: 3e8a7c1f4b96
+Create Date: 2026-10-19 10:21:37.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9f4c1a63'
+down_revision = '3e8a7c1f4b96'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('file_deletions', schema=None) as batch_op:
+        batch_op.create_index('ix_file_deletions_key', ['key'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('file_deletions', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_deletions_key')
@@ -0,0 +1,30 @@
+"""users rates sum
+
+Revision ID: 7d41e0b5c2a8
+Revises: 3f6c2a9d81e5
+Create Date: 2026-10-18 11:52:09.631870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d41e0b5c2a8'
+down_revision = '3f6c2a9d81e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rates_sum', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        'UPDATE users SET rates_sum = (SELECT coalesce(sum(rates.rate), 0) FROM rates WHERE rates.receiver_id = users.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('rates_sum')
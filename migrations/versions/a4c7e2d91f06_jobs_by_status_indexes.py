@@ -0,0 +1,34 @@
+"""jobs by status indexes
+
+Revision ID: a4c7e2d91f06
+Revises: 5b8e1f4c9a37
+Create Date: 2026-10-18 15:07:12.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e2d91f06'
+down_revision = '5b8e1f4c9a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_owner_id_status_updated_at', ['owner_id', 'status', 'updated_at'], unique=False)
+        batch_op.create_index('ix_jobs_worker_id_status_updated_at', ['worker_id', 'status', 'updated_at'], unique=False)
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.create_index('ix_applications_worker_id_status', ['worker_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_applications_worker_id_status')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_worker_id_status_updated_at')
+        batch_op.drop_index('ix_jobs_owner_id_status_updated_at')
@@ -0,0 +1,48 @@
+"""jobs full text search
+
+Revision ID: b002ba1a7484
+Revises: 1024f3058b04
+Create Date: 2026-10-18 10:45:12.104512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b002ba1a7484'
+down_revision = '1024f3058b04'
+branch_labels = None
+depends_on = None
+
+
+JOBS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+SERVICES_SEARCH_VECTOR = "to_tsvector('simple', coalesce(name_ua, '') || ' ' || coalesce(name_en, ''))"
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(JOBS_SEARCH_VECTOR, persisted=True), nullable=True)
+        )
+        batch_op.create_index('ix_jobs_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+    with op.batch_alter_table('services', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SERVICES_SEARCH_VECTOR, persisted=True), nullable=True)
+        )
+        batch_op.create_index('ix_services_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('services', schema=None) as batch_op:
+        batch_op.drop_index('ix_services_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
@@ -0,0 +1,42 @@
+"""job statistics
+
+Revision ID: c81d5f3a7e24
+Revises: a4c7e2d91f06
+Create Date: 2026-10-18 16:02:48.573910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81d5f3a7e24'
+down_revision = 'a4c7e2d91f06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_statistics',
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('jobs_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('experts_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], name=op.f('fk_job_statistics_location_id_locations')),
+    sa.PrimaryKeyConstraint('location_id', name=op.f('pk_job_statistics'))
+    )
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_jobs_location_id'), ['location_id'], unique=False)
+
+    op.execute(
+        'INSERT INTO job_statistics (location_id, jobs_count, experts_count, updated_at) '
+        'SELECT location_id, count(id), count(DISTINCT worker_id), CURRENT_TIMESTAMP FROM jobs '
+        'WHERE location_id IS NOT NULL GROUP BY location_id'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_location_id'))
+
+    op.drop_table('job_statistics')
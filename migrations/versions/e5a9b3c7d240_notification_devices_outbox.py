@@ -0,0 +1,39 @@
+"""notification devices outbox
+
+Revision ID: e5a9b3c7d240
+Revises: c81d5f3a7e24
+Create Date: 2026-10-18 17:11:05.934127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9b3c7d240'
+down_revision = 'c81d5f3a7e24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=16), server_default='pending', nullable=False))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+        batch_op.add_column(sa.Column('ticket_id', sa.String(length=64), server_default='', nullable=False))
+        batch_op.add_column(sa.Column('error', sa.String(length=256), server_default='', nullable=False))
+        batch_op.create_index('ix_notification_devices_status_next_attempt_at', ['status', 'next_attempt_at'], unique=False)
+
+    # notifications created before outbox were already sent
+    op.execute("UPDATE notification_devices SET status = 'sent'")
+
+
+def downgrade():
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_devices_status_next_attempt_at')
+        batch_op.drop_column('error')
+        batch_op.drop_column('ticket_id')
+        batch_op.drop_column('next_attempt_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('status')
@@ -0,0 +1,41 @@
+"""push receipts
+
+Revision ID: f2b6d8a4c913
+Revises: e5a9b3c7d240
+Create Date: 2026-10-18 19:02:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8a4c913'
+down_revision = 'e5a9b3c7d240'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sent_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('push_notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('delivered_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # messages sent before outbox have no Expo ticket, their receipts can't be checked
+    op.execute("UPDATE notification_devices SET status = 'delivered' WHERE status = 'sent' AND ticket_id = ''")
+
+
+def downgrade():
+    op.execute("UPDATE notification_devices SET status = 'sent' WHERE status = 'delivered'")
+
+    with op.batch_alter_table('push_notifications', schema=None) as batch_op:
+        batch_op.drop_column('failed_count')
+        batch_op.drop_column('delivered_count')
+        batch_op.drop_column('sent_count')
+
+    with op.batch_alter_table('notification_devices', schema=None) as batch_op:
+        batch_op.drop_column('sent_at')
@@ -6,7 +6,7 @@ from fastapi import status
 from moto import mock_aws
 from mypy_boto3_s3 import S3Client
 
-from test_api.utils import do_nothing
+from test_api.utils import FakeExpoServer, FakeKeysServer, do_nothing
 
 load_dotenv("test_api/test.env")
 
@@ -18,6 +18,9 @@ from sqlalchemy import orm, select
 
 from api import app
 from app import models as m
+from api.controllers import apple_keys, google_certs, settlements_index
+from api.dependency.user import user_principals
+from app.controllers import region_names
 from app import schema as s
 from config import config
 
@@ -48,6 +51,10 @@ def db() -> Generator[orm.Session, None, None]:
         export_addresses_from_json_file(with_print=False)
         export_jobs_from_json_file()
 
+        # regions and settlements are recreated for every test
+        region_names.invalidate()
+        settlements_index.invalidate()
+
         def override_get_db() -> Generator:
             yield session
 
@@ -85,7 +92,9 @@ def s3_client() -> Generator[S3Client, None, None]:
 @pytest.fixture
 def client(db, monkeypatch) -> Generator[TestClient, None, None]:
     """Returns a non-authorized test client for the API"""
-    monkeypatch.setattr("api.routes.job.c.send_created_job_notification", do_nothing)
+    monkeypatch.setattr("api.routes.job.c.dispatch_notification", do_nothing)
+    # users of previous tests have the same ids
+    user_principals.clear()
 
     with TestClient(app) as c:
         yield c
@@ -137,3 +146,28 @@ def worker_header(
     authorized_header["Authorization"] = f"Bearer {token.access_token}"
 
     yield authorized_header
+
+
+@pytest.fixture
+def expo_server(monkeypatch: pytest.MonkeyPatch) -> Generator[FakeExpoServer, None, None]:
+    """Runs local fake Expo push API and sends push notifications to it"""
+    server = FakeExpoServer(delay=0.1)
+    server.start()
+    monkeypatch.setattr(CFG, "EXPO_HOST", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def keys_server(monkeypatch: pytest.MonkeyPatch) -> Generator[FakeKeysServer, None, None]:
+    """Runs local Apple and Google public keys endpoints and verifies id tokens with them"""
+    server = FakeKeysServer()
+    server.start()
+    monkeypatch.setattr(apple_keys, "url", f"{server.url}/apple/keys")
+    monkeypatch.setattr(google_certs, "url", f"{server.url}/google/certs")
+    apple_keys.clear()
+    google_certs.clear()
+    yield server
+    apple_keys.clear()
+    google_certs.clear()
+    server.stop()
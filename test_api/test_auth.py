@@ -1,14 +1,20 @@
+import threading
+import time
+
 import pytest
 import sqlalchemy as sa
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
+from werkzeug.security import generate_password_hash
 
 from app.schema import GoogleTokenVerification, AppleTokenVerification
 
+from api.controllers import apple_keys, oauth2, password_hasher
 from app import models as m
 from app import schema as s
 from config import config
+from test_api.utils import FakeKeysServer, count_queries
 
 CFG = config()
 
@@ -58,3 +64,174 @@ def test_auth(db: Session, client: TestClient):
     header = dict(Authorization=f"Bearer {token.access_token}")
     res = client.get("api/users/me", headers=header)
     assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_auth_cache(
+    db: Session,
+    client: TestClient,
+    auth_header: dict[str, str],
+    worker_header: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    decoded_tokens: list[str] = []
+    decode = oauth2.jwt.decode
+
+    def count_decode(token: str, *args, **kwargs):
+        decoded_tokens.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(oauth2.jwt, "decode", count_decode)
+    oauth2.access_tokens.clear()
+
+    response = client.get("/api/push_notifications/unread-count", headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(decoded_tokens) == 1
+
+    # token and user principal are cached, only unread notifications are counted
+    with count_queries(db) as statements:
+        response = client.get("/api/push_notifications/unread-count", headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+    assert len(decoded_tokens) == 1
+
+    # route which needs user model loads it by cached principal
+    response = client.get("/api/whoami/user", headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(decoded_tokens) == 1
+
+    # deleted user is not authorized with cached token
+    response = client.delete("/api/users/", headers=auth_header)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.get("/api/push_notifications/unread-count", headers=auth_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    # user deleted by admin (other process) keeps cached principal, but user model is not loaded
+    response = client.get("/api/push_notifications/unread-count", headers=worker_header)
+    assert response.status_code == status.HTTP_200_OK
+    worker = db.scalar(sa.select(m.User).where(m.User.id == 2))
+    assert worker
+    worker.is_deleted = True
+    db.commit()
+    response = client.get("/api/whoami/user", headers=worker_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = client.get("/api/push_notifications/unread-count", headers=worker_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_oauth_login_with_cached_keys(
+    db: Session, client: TestClient, keys_server: FakeKeysServer, monkeypatch: pytest.MonkeyPatch
+):
+    LOGINS_COUNT = 10
+    db.add(m.AuthAccount(user_id=1, email="apple@example.com", oauth_id="apple_id", auth_type=s.AuthType.APPLE))
+    db.add(m.AuthAccount(user_id=1, email="google@example.com", oauth_id="google_id", auth_type=s.AuthType.GOOGLE))
+    db.commit()
+
+    def apple_login(kid: str | None = None) -> int:
+        id_token = keys_server.sign(
+            dict(
+                DUMMY_IOS_VALIDATION.model_dump(exclude={"iat", "exp"}),
+                aud=CFG.MOBILE_APP_ID,
+                email="apple@example.com",
+                sub="apple_id",
+            ),
+            kid,
+        )
+        response = client.post("/api/auth/apple", json=s.AppleAuthTokenIn(id_token=id_token).model_dump())
+        return response.status_code
+
+    def google_login() -> int:
+        id_token = keys_server.sign(
+            dict(
+                DUMMY_GOOGLE_VALIDATION.model_dump(exclude={"iat", "exp"}),
+                aud=CFG.GOOGLE_CLIENT_ID,
+                email="google@example.com",
+                sub="google_id",
+            )
+        )
+        response = client.post("/api/auth/google", json=s.GoogleAuthIn(id_token=id_token).model_dump())
+        return response.status_code
+
+    # keys are fetched once by the first login
+    for _ in range(LOGINS_COUNT):
+        assert apple_login() == status.HTTP_200_OK
+        assert google_login() == status.HTTP_200_OK
+    assert keys_server.requests_count == {"/apple/keys": 1, "/google/certs": 1}
+
+    # token signed by new key refreshes keys
+    monkeypatch.setattr(apple_keys, "min_refresh_interval", 0)
+    new_kid = keys_server.rotate_keys()
+    assert apple_login(new_kid) == status.HTTP_200_OK
+    assert keys_server.requests_count["/apple/keys"] == 2
+
+    # stale keys are used while refreshed in background
+    apple_keys.fetched_at -= apple_keys.ttl + 1
+    assert apple_login() == status.HTTP_200_OK
+    for _ in range(50):
+        if not apple_keys.is_refreshing:
+            break
+        time.sleep(0.1)
+    assert keys_server.requests_count["/apple/keys"] == 3
+
+    # unknown key is rejected, keys are not refreshed by every such token
+    monkeypatch.setattr(apple_keys, "min_refresh_interval", 3600)
+    assert apple_login(keys_server.rotate_keys()) == status.HTTP_403_FORBIDDEN
+    assert keys_server.requests_count["/apple/keys"] == 3
+
+    # cached keys are used while other thread fetches keys
+    with apple_keys.fetch_lock:
+        assert apple_login(new_kid) == status.HTTP_200_OK
+
+    # invalid keys response is reported as unavailable keys
+    keys_server.invalid_json = True
+    apple_keys.clear()
+    assert apple_login(new_kid) == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_password_hashing(db: Session, client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user
+
+    # hash of older method is upgraded on login
+    user.password_hash = generate_password_hash(USER_PASSWORD, "pbkdf2:sha256:1000")
+    db.commit()
+    login_data = {"username": user.phone, "password": USER_PASSWORD}
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+    db.refresh(user)
+    assert user.password_hash.startswith(f"{CFG.PASSWORD_HASH_METHOD}$")
+    response = client.post("/api/auth/login", data=dict(login_data, password="wrong"))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    # short method name is expanded in hash ("pbkdf2:sha256:600000$..."), but hash is not upgraded again
+    monkeypatch.setattr(CFG, "PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+    db.refresh(user)
+    password_hash = user.password_hash
+    assert password_hash.startswith("pbkdf2:sha256:")
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+    db.refresh(user)
+    assert user.password_hash == password_hash
+
+    # broken pool (killed process) is reported as 503 and replaced on next login
+    executor = password_hasher.get_executor()
+    for process in list(executor._processes.values()):  # type: ignore[attr-defined]
+        process.kill()
+        process.join()
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_200_OK
+
+    # login is rejected when hashing queue is full
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, "slots", slots)
+    monkeypatch.setattr(CFG, "PASSWORD_HASH_QUEUE_TIMEOUT", 0)
+    response = client.post("/api/auth/login", data=login_data)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == str(CFG.PASSWORD_HASH_RETRY_AFTER)
@@ -1,16 +1,28 @@
+import io
+import os
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from botocore.exceptions import ClientError
 from mypy_boto3_s3 import S3Client
 import pytest
+import requests
+from PIL import Image, features
 
 import sqlalchemy as sa
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from api import app
-from api.dependency.user import get_current_user
+from api import controllers as c
+from api.controllers.job import CARDS_LIMIT
+from api.dependency.user import get_current_principal, load_user_principal, user_principals
 from app import models as m
+from app.controllers import region_names
 from app import schema as s
 from app.schema.language import Language
 from config import config
+from test_api.utils import count_queries
 
 CFG = config()
 
@@ -37,6 +49,42 @@ CFG = config()
 #     assert len(jobs.recommended_jobs) > 0
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_jobs_on_home_page_queries_count(db: Session):
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user
+
+    pending_jobs = db.scalars(sa.select(m.Job).where(m.Job.status == s.JobStatus.PENDING.value)).all()
+    assert len(pending_jobs) > CARDS_LIMIT
+
+    # leave only one public job
+    for job in pending_jobs[1:]:
+        job.is_public = False
+    db.execute(sa.insert(m.saved_jobs).values(user_id=user.id, job_id=pending_jobs[0].id))
+    db.commit()
+
+    query = s.JobHomePage(lang=CFG.UA)
+    assert user.id
+    region_names.refresh(db)
+    with count_queries(db) as statements:
+        cards = c.get_jobs_on_home_page(query, user, db)
+    assert len(cards.recommended_jobs) == 1
+    assert cards.recommended_jobs[0].is_saved
+    queries_count = len(statements)
+
+    for job in pending_jobs:
+        job.is_public = True
+    db.commit()
+
+    assert user.id
+    with count_queries(db) as statements:
+        cards = c.get_jobs_on_home_page(query, user, db)
+    assert len(cards.recommended_jobs) == CARDS_LIMIT
+    assert len(cards.jobs_near_you) == CARDS_LIMIT
+    assert len({card.location.uuid for card in cards.recommended_jobs if card.location}) > 1
+    assert len(statements) == queries_count
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_create_job(client: TestClient, db: Session, auth_header: dict[str, str], s3_client: S3Client):
     with open("test_api/test_data/image_1.jpg", "rb") as image:
@@ -117,9 +165,9 @@ def test_create_job(client: TestClient, db: Session, auth_header: dict[str, str]
     assert job_data.uuid == job.uuid
 
     # Another user should see the job in the main list
-    mock_current_user = db.scalar(sa.select(m.User).where(m.User.id == 5))
+    mock_current_user = load_user_principal(5, db)
     assert mock_current_user
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    app.dependency_overrides[get_current_principal] = lambda: mock_current_user
 
     query_data = s.JobsIn(query=job.title)
     response = client.get(
@@ -130,7 +178,7 @@ def test_create_job(client: TestClient, db: Session, auth_header: dict[str, str]
     assert data.items[0].title == job.title
 
     # reset user dependency
-    app.dependency_overrides[get_current_user] = get_current_user
+    app.dependency_overrides.pop(get_current_principal)
 
     # Delete job
     response = client.delete(f"/api/jobs/{job.uuid}", headers=auth_header)
@@ -140,6 +188,311 @@ def test_create_job(client: TestClient, db: Session, auth_header: dict[str, str]
     assert deleted_job.is_deleted
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_upload_job_files(
+    client: TestClient, db: Session, auth_header: dict[str, str], s3_client: S3Client, monkeypatch: pytest.MonkeyPatch
+):
+    # mp4 header and body of 2.5 multipart parts
+    video = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * (CFG.S3_UPLOAD_PART_SIZE * 5 // 2)
+    with open("test_api/test_data/image_1.jpg", "rb") as image:
+        response = client.post(
+            "/api/jobs/files",
+            headers=auth_header,
+            files=[("files", ("image_1.jpg", image, "image/jpeg")), ("files", ("video.mp4", video, "video/mp4"))],
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    image_uuid, video_uuid = response.json()
+
+    video_file = db.scalar(sa.select(m.File).where(m.File.uuid == video_uuid))
+    assert video_file
+    assert video_file.type == s.FileType.VIDEO.value
+    assert video_file.key.endswith(".mp4")
+    video_object = s3_client.head_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=video_file.key)
+    assert video_object["ContentLength"] == len(video)
+    # sent in 3 parts
+    assert video_object["ETag"].strip('"').endswith("-3")
+
+    image_file = db.scalar(sa.select(m.File).where(m.File.uuid == image_uuid))
+    assert image_file
+    assert image_file.type == s.FileType.IMAGE.value
+    image_object = s3_client.head_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=image_file.key)
+    assert image_object["ContentLength"] == os.path.getsize("test_api/test_data/image_1.jpg")
+
+    # nothing is uploaded if one of files is unknown
+    objects_count = s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME)["KeyCount"]
+    response = client.post(
+        "/api/jobs/files",
+        headers=auth_header,
+        files=[("files", ("video.mp4", video, "video/mp4")), ("files", ("text.txt", b"text", "text/plain"))],
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME)["KeyCount"] == objects_count
+
+    # files uploaded before failed one are queued for deletion
+    upload_fileobj = s3_client.upload_fileobj
+
+    def fail_video_upload(fileobj, bucket: str, key: str, **kwargs):
+        if key.endswith(".mp4"):
+            raise RuntimeError("Upload failed")
+        upload_fileobj(fileobj, bucket, key, **kwargs)
+
+    monkeypatch.setattr(s3_client, "upload_fileobj", fail_video_upload)
+    files_count = db.scalar(sa.select(sa.func.count(m.File.id)))
+    with open("test_api/test_data/image_1.jpg", "rb") as image:
+        response = client.post(
+            "/api/jobs/files",
+            headers=auth_header,
+            files=[("files", ("image_1.jpg", image, "image/jpeg")), ("files", ("video.mp4", video, "video/mp4"))],
+        )
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert db.scalar(sa.select(sa.func.count(m.File.id))) == files_count
+    queued_keys = db.scalars(sa.select(m.file_deletions.c.key)).all()
+    assert len(queued_keys) == 1 and queued_keys[0].endswith(".jpg")
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_presigned_job_file_upload(client: TestClient, db: Session, auth_header: dict[str, str], s3_client: S3Client):
+    with open("test_api/test_data/image_1.jpg", "rb") as image:
+        image_data = image.read()
+    file_in = s.FileUploadIn(filename="image 1.jpg", content_type="image/jpeg", size=len(image_data))
+
+    response = client.post("/api/jobs/files/upload-url", headers=auth_header, json=file_in.model_dump())
+    assert response.status_code == status.HTTP_201_CREATED
+    upload = s.FileUploadOut.model_validate(response.json())
+    assert upload.key.startswith("jobs/files/") and upload.key.endswith(".jpg")
+
+    # client sends file straight to S3
+    upload_response = requests.post(upload.url, data=upload.fields, files={"file": image_data})
+    assert upload_response.ok
+    assert not db.scalar(sa.select(m.File).where(m.File.key == upload.key))
+
+    complete_in = s.FileUploadCompleteIn(upload_token=upload.upload_token).model_dump()
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json=complete_in)
+    assert response.status_code == status.HTTP_201_CREATED
+    file_out = s.FileOut.model_validate(response.json())
+    assert file_out.original_name == "image 1.jpg"
+    file_model = db.scalar(sa.select(m.File).where(m.File.uuid == file_out.uuid))
+    assert file_model and file_model.key == upload.key
+    assert file_model.type == s.FileType.IMAGE.value
+    # completed upload is not deleted
+    assert not db.scalar(sa.select(m.file_deletions.c.id).where(m.file_deletions.c.key == upload.key))
+
+    # repeated completion returns the same file
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json=complete_in)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["uuid"] == file_out.uuid
+
+    # unknown type and too large files are not allowed
+    response = client.post(
+        "/api/jobs/files/upload-url", headers=auth_header, json=dict(file_in.model_dump(), content_type="text/plain")
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.post(
+        "/api/jobs/files/upload-url",
+        headers=auth_header,
+        json=dict(file_in.model_dump(), size=CFG.MAX_JOB_FILE_SIZE + 1),
+    )
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    # file content is checked by magic bytes
+    fake_image = b"not an image".ljust(len(image_data), b" ")
+    response = client.post("/api/jobs/files/upload-url", headers=auth_header, json=file_in.model_dump())
+    upload = s.FileUploadOut.model_validate(response.json())
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json={"upload_token": upload.upload_token})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert requests.post(upload.url, data=upload.fields, files={"file": fake_image}).ok
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json={"upload_token": upload.upload_token})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert c.delete_queued_files(db, s3_client) == 1
+    assert s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME, Prefix=upload.key)["KeyCount"] == 0
+
+    # upload token can not be used as access token
+    response = client.get("/api/whoami/user", headers={"Authorization": f"Bearer {upload.upload_token}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json={"upload_token": "invalid"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    # and access token can not be used as upload token
+    access_token = auth_header["Authorization"].split(" ")[1]
+    response = client.post("/api/jobs/files/complete", headers=auth_header, json={"upload_token": access_token})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # upload which is not completed is deleted after CFG.PENDING_UPLOAD_MAX_AGE
+    response = client.post("/api/jobs/files/upload-url", headers=auth_header, json=file_in.model_dump())
+    upload = s.FileUploadOut.model_validate(response.json())
+    assert requests.post(upload.url, data=upload.fields, files={"file": image_data}).ok
+    assert c.delete_queued_files(db, s3_client) == 0
+    db.execute(sa.update(m.file_deletions).values(next_attempt_at=datetime.utcnow()))
+    db.commit()
+    assert c.delete_queued_files(db, s3_client) == 1
+    assert s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME, Prefix=upload.key)["KeyCount"] == 0
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_image_variants(
+    client: TestClient, db: Session, auth_header: dict[str, str], s3_client: S3Client, monkeypatch: pytest.MonkeyPatch
+):
+    image = io.BytesIO()
+    Image.new("RGB", (2000, 1500), "green").save(image, format="JPEG")
+    response = client.post(
+        "/api/jobs/files", headers=auth_header, files={"files": ("photo.jpg", image.getvalue(), "image/jpeg")}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    # variants are generated by generate-file-variants service after upload
+    file = db.scalar(sa.select(m.File).where(m.File.uuid == response.json()[0]))
+    assert file
+    assert not file.variants
+    assert c.generate_files_variants(db, s3_client, c.get_files_without_variants(db)) == 1
+    db.refresh(file)
+    assert file.variants
+    sizes = {(variant["name"], variant["format"]): (variant["width"], variant["height"]) for variant in file.variants}
+    formats = [image_format for image_format in CFG.IMAGE_VARIANT_FORMATS if features.check(image_format)]
+    assert "webp" in formats
+    for image_format in formats:
+        assert sizes["thumbnail", image_format] == (CFG.IMAGE_THUMBNAIL_SIZE, CFG.IMAGE_THUMBNAIL_SIZE)
+        assert sizes["640", image_format] == (640, 480)
+        assert sizes["1280", image_format] == (1280, 960)
+    for variant in file.variants:
+        assert variant["key"].startswith(file.key.rsplit(".", 1)[0])
+        s3_object = s3_client.head_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=variant["key"])
+        assert s3_object["ContentType"] == f"image/{variant['format']}"
+
+    file_out = s.FileOut.model_validate(file)
+    assert file_out.thumbnail_url and file_out.thumbnail_url.endswith("_thumbnail.webp")
+    assert len(file_out.images) == len(file.variants)
+
+    # variants of files uploaded before are generated by command, original is not upscaled
+    key = "jobs/files/old_photo.png"
+    image = io.BytesIO()
+    Image.new("RGBA", (800, 400)).save(image, format="PNG")
+    s3_client.put_object(Bucket=CFG.AWS_S3_BUCKET_NAME, Key=key, Body=image.getvalue())
+    old_file = m.File(type=s.FileType.IMAGE.value, original_name="old_photo.png", name="old_photo.png", key=key)
+    db.add(old_file)
+    db.commit()
+    assert old_file.id in c.get_files_without_variants(db)
+    c.generate_files_variants(db, s3_client, c.get_files_without_variants(db))
+    db.refresh(old_file)
+    assert old_file.variants
+    assert {variant["name"] for variant in old_file.variants} == {"thumbnail", "640"}
+    assert not c.get_files_without_variants(db)
+
+    # variants are deleted with file
+    prefix = file.key.rsplit(".", 1)[0]
+    response = client.delete(f"/api/jobs/file/{file.uuid}", headers=auth_header)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert c.delete_queued_files(db, s3_client) == len(file.variants) + 1
+    assert s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME, Prefix=prefix)["KeyCount"] == 0
+
+    # variants uploaded before failed one are queued for deletion, file is processed again by next run
+    db.execute(sa.update(m.File).where(m.File.id == old_file.id).values(variants=sa.null()))
+    db.commit()
+    upload_fileobj = s3_client.upload_fileobj
+    uploaded_keys: list[str] = []
+
+    def fail_second_upload(fileobj, bucket, key, **kwargs):
+        if uploaded_keys:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "PutObject")
+        upload_fileobj(fileobj, bucket, key, **kwargs)
+        uploaded_keys.append(key)
+
+    monkeypatch.setattr(s3_client, "upload_fileobj", fail_second_upload)
+    c.generate_files_variants(db, s3_client, [old_file.id])
+    db.refresh(old_file)
+    assert old_file.variants is None
+    assert len(uploaded_keys) == 1
+    assert db.scalars(sa.select(m.file_deletions.c.key)).all() == uploaded_keys
+    monkeypatch.undo()
+    c.generate_files_variants(db, s3_client, [old_file.id])
+    db.refresh(old_file)
+    assert old_file.variants
+    assert not db.scalar(sa.select(sa.func.count()).select_from(m.file_deletions))
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_delete_files(
+    client: TestClient, db: Session, auth_header: dict[str, str], s3_client: S3Client, monkeypatch: pytest.MonkeyPatch
+):
+    def count_objects(prefix: str) -> int:
+        return s3_client.list_objects_v2(Bucket=CFG.AWS_S3_BUCKET_NAME, Prefix=prefix)["KeyCount"]
+
+    with open("test_api/test_data/image_1.jpg", "rb") as image:
+        image_data = image.read()
+    response = client.post(
+        "/api/jobs/files",
+        headers=auth_header,
+        files=[("files", (f"image_{i}.jpg", image_data, "image/jpeg")) for i in range(3)],
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    files = db.scalars(sa.select(m.File).where(m.File.uuid.in_(response.json())).order_by(m.File.id)).all()
+    avatar, deleted_file, orphan = files
+    avatar_key, deleted_key, orphan_key, orphan_id = avatar.key, deleted_file.key, orphan.key, orphan.id
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user
+    user.avatar_id = avatar.id
+    db.commit()
+
+    # request deletes file from db only, its objects are deleted by command
+    response = client.delete(f"/api/jobs/file/{deleted_file.uuid}", headers=auth_header)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert count_objects(deleted_key) == 1
+
+    # files not attached to job or avatar are deleted after CFG.ORPHAN_FILE_MAX_AGE
+    assert not c.collect_orphan_files(db)
+    db.execute(sa.update(m.File).values(updated_at=datetime.utcnow() - timedelta(seconds=CFG.ORPHAN_FILE_MAX_AGE + 1)))
+    db.commit()
+    attached_files_ids = db.scalars(sa.select(m.files_job.c.file_id)).all()
+    assert c.collect_orphan_files(db)
+    assert not db.scalar(sa.select(m.File).where(m.File.id == orphan_id))
+    assert db.scalar(sa.select(m.File).where(m.File.id == avatar.id))
+    assert set(attached_files_ids) <= set(db.scalars(sa.select(m.File.id)).all())
+    assert count_objects(orphan_key) == 1
+
+    # queued objects are deleted in batches
+    queued_keys = db.scalars(sa.select(m.file_deletions.c.key)).all()
+    assert deleted_key in queued_keys and orphan_key in queued_keys
+    monkeypatch.setattr(CFG, "FILE_DELETIONS_BATCH", 2)
+    while c.delete_queued_files(db, s3_client):
+        pass
+    assert not db.scalar(sa.select(sa.func.count()).select_from(m.file_deletions))
+    assert count_objects(deleted_key) == 0
+    assert count_objects(orphan_key) == 0
+    assert count_objects(avatar_key) == 1
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_job_queries_count(client: TestClient, auth_header: dict[str, str], db: Session):
+    job = db.scalar(sa.select(m.Job).where(m.Job.status == s.JobStatus.PENDING.value))
+    assert job
+    workers = db.scalars(sa.select(m.User).where(m.User.id != job.owner_id)).all()
+    assert len(workers) > 4
+
+    def add_applications(workers: Sequence[m.User]):
+        for worker in workers:
+            application = m.Application(type=m.ApplicationType.APPLY, worker_id=worker.id, job_id=job.id)
+            job.applications.append(application)
+        db.commit()
+
+    def get_job() -> tuple[s.JobInfo, int]:
+        region_names.refresh(db)
+        # every request loads user principal
+        user_principals.clear()
+        db.expire_all()
+        with count_queries(db) as statements:
+            response = client.get(f"/api/jobs/{job.uuid}", headers=auth_header)
+        assert response.status_code == status.HTTP_200_OK
+        return s.JobInfo.model_validate(response.json()), len(statements)
+
+    add_applications(workers[:2])
+    job_info, queries_count = get_job()
+    assert len(job_info.applications) == 2
+
+    add_applications(workers[2:])
+    job_info, more_queries_count = get_job()
+    assert len(job_info.applications) == len(workers)
+    assert {application.owner.uuid for application in job_info.applications} == {worker.uuid for worker in workers}
+    assert more_queries_count == queries_count
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_get_jobs_by_query_params(client: TestClient, auth_header: dict[str, str], db: Session):
     # Житомирська, Львівська
@@ -229,6 +582,130 @@ def test_get_jobs_by_query_params(client: TestClient, auth_header: dict[str, str
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_jobs_pagination(client: TestClient, auth_header: dict[str, str], db: Session):
+    for order_by in s.JobsOrderBy:
+        for ascending in (True, False):
+            params = {
+                "selected_locations": CFG.ALL_UKRAINE,
+                "order_by": order_by.value,
+                "ascending": ascending,
+                "limit": CFG.MAX_JOBS_PAGE_LIMIT,
+            }
+            response = client.get("/api/jobs", params=params, headers=auth_header)
+            assert response.status_code == status.HTTP_200_OK
+            all_jobs = s.JobsOut.model_validate(response.json())
+
+            # Walk through pages
+            PAGE_LIMIT = 30
+            pages_jobs: list[s.JobOutput] = []
+            cursor = None
+            while len(pages_jobs) < len(all_jobs.items):
+                page_params = {**params, "limit": PAGE_LIMIT}
+                if cursor:
+                    page_params["cursor"] = cursor
+                response = client.get("/api/jobs", params=page_params, headers=auth_header)
+                assert response.status_code == status.HTTP_200_OK
+                page = s.JobsOut.model_validate(response.json())
+                assert len(page.items) <= PAGE_LIMIT
+                pages_jobs += page.items
+                if not page.next_cursor:
+                    break
+                cursor = page.next_cursor
+
+            assert len(all_jobs.items) > PAGE_LIMIT
+            assert len({job.uuid for job in pages_jobs}) == len(pages_jobs)
+            assert [job.uuid for job in pages_jobs[: len(all_jobs.items)]] == [job.uuid for job in all_jobs.items]
+
+    # Check order
+    params = {"selected_locations": CFG.ALL_UKRAINE, "order_by": s.JobsOrderBy.COST.value, "ascending": False}
+    response = client.get("/api/jobs", params=params, headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    costs = [job.cost for job in s.JobsOut.model_validate(response.json()).items]
+    assert costs == sorted(costs)
+
+    # Invalid cursor
+    response = client.get("/api/jobs", params={"cursor": "invalid"}, headers=auth_header)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_search_jobs_ranked(db: Session):
+    job = db.scalar(sa.select(m.Job).where(m.Job.is_deleted.is_(False)))
+    assert job
+    word = job.title.split()[0]
+
+    jobs = c.search_jobs_ranked(sa.select(m.Job).where(m.Job.is_deleted.is_(False)), word, db)
+    assert job in jobs
+    ranks = [c.search.rank_job(found_job, [word]) for found_job in jobs]
+    assert ranks == sorted(ranks, reverse=True)
+    assert ranks[0] >= c.search.TITLE_RANK
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_search_jobs_all_ukraine(db: Session):
+    job = db.scalar(
+        sa.select(m.Job).where(
+            m.Job.is_deleted.is_(False), m.Job.is_public.is_(True), m.Job.status == s.JobStatus.PENDING.value
+        )
+    )
+    assert job
+    db.execute(sa.update(m.Job).where(m.Job.id == job.id).values(location_id=None))
+    db.commit()
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user
+
+    # job without location is for all Ukraine
+    found = c.search_jobs(s.JobSearchIn(query=job.title.split()[0]), user, db)
+    job_out = next(job_out for job_out in found.jobs if job_out.id == job.id)
+    assert job_out.location is None
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_public_job_statistics(client: TestClient, auth_header: dict[str, str], db: Session):
+    def get_expected() -> dict[int, s.PublicJobStatistics]:
+        rows = db.execute(
+            sa.select(m.Job.location_id, sa.func.count(m.Job.id), sa.func.count(sa.func.distinct(m.Job.worker_id)))
+            .where(m.Job.location_id.is_not(None))
+            .group_by(m.Job.location_id)
+        ).all()
+        return {row[0]: s.PublicJobStatistics(jobs_count=row[1], experts_count=row[2]) for row in rows}
+
+    # filled by jobs export
+    response = client.get("/api/jobs/public-job-statistics/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    data = s.PublicJobDict.model_validate(response.json())
+    assert data.statistics
+    assert data.statistics == get_expected()
+
+    etag = response.headers["ETag"]
+    response = client.get("/api/jobs/public-job-statistics/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # job moved to another location
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user
+    job = db.scalar(sa.select(m.Job).where(m.Job.owner_id == user.id, m.Job.location_id.is_not(None)))
+    assert job
+    location_id = db.scalar(sa.select(m.Location.id).where(m.Location.id.not_in(list(data.statistics))))
+    assert location_id
+    response = client.put(f"/api/jobs/{job.id}", headers=auth_header, json={"location_id": location_id})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get("/api/jobs/public-job-statistics/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    data = s.PublicJobDict.model_validate(response.json())
+    assert data.statistics[location_id].jobs_count == 1
+    assert data.statistics == get_expected()
+
+    # full refresh
+    db.execute(sa.delete(m.JobStatistics))
+    c.refresh_job_statistics(db)
+    db.commit()
+    assert c.job_statistics(db).statistics == get_expected()
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_get_jobs_by_status(client: TestClient, auth_header: dict[str, str], db: Session):
     job: m.Job | None = db.scalar(
@@ -314,6 +791,97 @@ def test_get_jobs_by_status(client: TestClient, auth_header: dict[str, str], db:
     assert data.items
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_jobs_by_status_pagination(client: TestClient, auth_header: dict[str, str], db: Session):
+    current_user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert current_user
+
+    all_jobs = db.scalars(sa.select(m.Job).where(m.Job.is_deleted.is_(False))).all()
+    views = [
+        (s.JobStatus.PENDING, s.JobUserStatus.OWNER, "owner_id", [s.JobStatus.PENDING.value]),
+        (s.JobStatus.IN_PROGRESS, s.JobUserStatus.WORKER, "worker_id", c.job.ACTIVE_JOB_STATUSES),
+        (s.JobStatus.COMPLETED, s.JobUserStatus.OWNER, "owner_id", c.job.ARCHIVED_JOB_STATUSES),
+    ]
+    for job_status, job_user_status, user_field, statuses in views:
+        expected = {
+            job.uuid for job in all_jobs if getattr(job, user_field) == current_user.id and job.status in statuses
+        }
+        assert expected
+
+        uuids: list[str] = []
+        cursor = None
+        while True:
+            params: dict = {"job_status": job_status.value, "job_user_status": job_user_status.value, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/jobs/jobs-by-status/", params=params, headers=auth_header)
+            assert response.status_code == status.HTTP_200_OK
+            data = s.JobsByStatusList.model_validate(response.json())
+            assert len(data.items) <= 2
+            uuids += [job.uuid for job in data.items]
+            cursor = data.next_cursor
+            if not cursor:
+                break
+
+        assert len(uuids) == len(set(uuids))
+        assert set(uuids) == expected
+
+    # cursor keeps position when the last job of page is updated
+    params = {"job_status": s.JobStatus.COMPLETED.value, "job_user_status": s.JobUserStatus.OWNER.value, "limit": 2}
+    response = client.get("/api/jobs/jobs-by-status/", params=params, headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    first_jobs = s.JobsByStatusList.model_validate(response.json()).items
+    assert len(first_jobs) == 2
+    response = client.get("/api/jobs/jobs-by-status/", params={**params, "limit": 1}, headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    first_page = s.JobsByStatusList.model_validate(response.json())
+    assert first_page.next_cursor
+    db.execute(sa.update(m.Job).where(m.Job.uuid == first_page.items[-1].uuid).values(updated_at=datetime(2000, 1, 1)))
+    db.commit()
+    response = client.get(
+        "/api/jobs/jobs-by-status/",
+        params={**params, "limit": 1, "cursor": first_page.next_cursor},
+        headers=auth_header,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    second_page = s.JobsByStatusList.model_validate(response.json())
+    assert [job.uuid for job in second_page.items] == [first_jobs[1].uuid]
+
+    response = client.get("/api/jobs/jobs-by-status/", params={"cursor": "invalid"}, headers=auth_header)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_jobs_required_rates(db: Session):
+    jobs = db.scalars(sa.select(m.Job).where(m.Job.worker_id.is_not(None))).all()
+    completed_jobs = [job for job in jobs if job.status == s.JobStatus.COMPLETED.value]
+    assert len(completed_jobs) > 1
+
+    owner_rated, both_rated = completed_jobs[0], completed_jobs[1]
+    for job, givers in (
+        (owner_rated, [owner_rated.owner_id]),
+        (both_rated, [both_rated.owner_id, both_rated.worker_id]),
+    ):
+        for gives_id in givers:
+            receiver_id = job.worker_id if gives_id == job.owner_id else job.owner_id
+            assert receiver_id
+            rate = m.Rate(rate=5, gives_id=gives_id, receiver_id=receiver_id, job_id=job.id)
+            db.add(rate)
+            db.flush()
+            db.add(m.JobRate(rate_id=rate.id, job_id=job.id))
+    db.commit()
+    jobs = db.scalars(sa.select(m.Job).where(m.Job.worker_id.is_not(None))).all()
+
+    with count_queries(db) as statements:
+        required_rates = c.get_jobs_required_rates(jobs, db)
+    assert len(statements) == 1
+
+    for job in jobs:
+        assert required_rates[job.id] == (job.required_rate_owner, job.required_rate_worker)
+    assert required_rates[owner_rated.id] == (False, True)
+    assert required_rates[both_rated.id] == (False, False)
+
+
 @pytest.mark.skipif(
     not CFG.IS_API,
     reason="API is not enabled",
@@ -1,13 +1,19 @@
+import time
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
+from api import controllers as c
 from app import schema as s
 from app import models as m
+from app.controllers import region_names
+from app.logger import log
 from app.schema.language import Language
 from config import config
+from test_api.utils import count_queries
 
 
 CFG = config()
@@ -26,6 +32,50 @@ def test_get_locations(client: TestClient, full_db: Session):
     assert len(db_regions) == len(locations)
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_cached_locations(client: TestClient, db: Session):
+    response = client.get("/api/locations", params={"lang": CFG.EN}, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert etag
+    assert "Content-Encoding" not in response.headers
+    res = s.LocationsOut.model_validate(response.json())
+    assert res.locations
+    assert res.locations[0].svg
+
+    # Not modified
+    response = client.get(
+        "/api/locations", params={"lang": CFG.EN}, headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+    # Compressed
+    response = client.get("/api/locations", params={"lang": CFG.EN}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] != etag
+    assert s.LocationsOut.model_validate(response.json()) == res
+
+    # Payload is rebuilt when region is changed
+    region = db.scalar(sa.select(m.Region).where(m.Region.is_deleted == sa.false()))
+    assert region
+    region.is_deleted = True
+    db.commit()
+    region_names.invalidate()
+
+    response = client.get(
+        "/api/locations", params={"lang": CFG.EN}, headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(s.LocationsOut.model_validate(response.json()).locations) == len(res.locations) - 1
+
+    # only known languages are cached
+    response = client.get("/api/locations", params={"lang": "unknown"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_get_all_locations(client: TestClient, full_db: Session):
     db = full_db
@@ -43,6 +93,40 @@ def test_get_all_locations(client: TestClient, full_db: Session):
     assert len(data.locations) == len(db_locations)
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_region_names_cache(client: TestClient, db: Session):
+    region = db.scalar(sa.select(m.Region).order_by(m.Region.id))
+    assert region
+    location_uuid = region.location.uuid
+
+    response = client.get("/api/locations/all", params={"lang": Language.EN.value})
+    assert response.status_code == status.HTTP_200_OK
+    data = s.LocationsListOut.model_validate(response.json())
+    assert s.LocationStrings(uuid=location_uuid, name=region.name_en) in data.locations
+
+    # cached names are used until cache is invalidated
+    region.name_en = "Updated region"
+    db.commit()
+    assert region_names.get(region.location_id, db).name_en != region.name_en
+
+    region_names.invalidate()
+    response = client.get("/api/locations/all", params={"lang": Language.EN.value})
+    assert response.status_code == status.HTTP_200_OK
+    data = s.LocationsListOut.model_validate(response.json())
+    assert s.LocationStrings(uuid=location_uuid, name="Updated region") in data.locations
+
+    # region added by other process is picked up on miss, location without region has empty names
+    location = m.Location()
+    db.add(location)
+    db.commit()
+    names = region_names.get(location.id, db)
+    assert names.location_uuid == location.uuid
+    assert not names.name_en
+    db.add(m.Region(location_id=location.id, name_ua="Нова область", name_en="New region"))
+    db.commit()
+    assert region_names.get(location.id, db).name_en == "New region"
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_get_addresses(client: TestClient, auth_header: dict[str, str], full_db: Session):
     # Test get settlements
@@ -88,3 +172,75 @@ def test_get_addresses(client: TestClient, auth_header: dict[str, str], full_db:
         headers=auth_header,
     )
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_search_settlements(client: TestClient, auth_header: dict[str, str], db: Session):
+    LIMIT = 5
+    response = client.get(
+        "/api/locations/settlements",
+        params={"lang": Language.UA.value, "query": "ов", "limit": LIMIT},
+        headers=auth_header,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    settlements = s.SettlementsListOut.model_validate(response.json()).settlements
+    assert len(settlements) == LIMIT
+    # cities first
+    assert settlements[0].location.startswith("м. ")
+
+    # one word queries are served from in-memory index, without SQL queries
+    names = db.scalars(sa.select(m.Settlement.name_ua)).all()
+    assert names
+    durations = []
+    with count_queries(db) as statements:
+        for name in names:
+            start = time.perf_counter()
+            found = c.search_settlements(name[:4], Language.UA, CFG.SETTLEMENTS_LIMIT, db)
+            durations.append(time.perf_counter() - start)
+            assert found
+            assert all(name[:4].lower() in settlement.location.lower() for settlement in found)
+    assert not statements
+    durations.sort()
+    log(log.INFO, "Settlements search p99: [%.4f] sec", durations[int(len(durations) * 0.99)])
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_search_addresses(client: TestClient, auth_header: dict[str, str], db: Session):
+    city_id = db.scalar(
+        sa.select(m.Address.city_id).group_by(m.Address.city_id).order_by(sa.func.count(m.Address.id).desc())
+    )
+    assert city_id
+
+    LIMIT = 3
+    response = client.get(
+        "/api/locations/addresses",
+        params={"query": "а", "uuid": city_id, "lang": Language.UA.value, "limit": LIMIT},
+        headers=auth_header,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    addresses = s.AddressesListOut.model_validate(response.json()).addresses
+    assert len(addresses) == LIMIT
+
+    # prefix matches go first
+    found = c.search_addresses("ва", city_id, Language.UA, CFG.MAX_ADDRESSES_LIMIT, db)
+    starts = [address.name.split(" ", 1)[1].lower().startswith("ва") for address in found]
+    assert starts == sorted(starts, reverse=True)
+
+    # search uses (city_id, search_ua) index
+    plan = db.execute(
+        sa.text("EXPLAIN QUERY PLAN SELECT id FROM addresses WHERE city_id = :city_id AND search_ua LIKE '%а%'"),
+        {"city_id": city_id},
+    ).all()
+    assert "ix_addresses_city_id_search_ua" in str(plan)
+
+    # data/address.json queries
+    rows = db.execute(sa.select(m.Address.city_id, m.Address.line1).where(m.Address.line1 != "***")).all()
+    assert rows
+    durations = []
+    for row in rows:
+        start = time.perf_counter()
+        found = c.search_addresses(row.line1[:4], row.city_id, Language.UA, CFG.ADDRESSES_LIMIT, db)
+        durations.append(time.perf_counter() - start)
+        assert found
+    durations.sort()
+    log(log.INFO, "Addresses search p99: [%.4f] sec", durations[int(len(durations) * 0.99)])
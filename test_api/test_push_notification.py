@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 import pytest
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
@@ -6,8 +8,11 @@ from fastapi.testclient import TestClient
 
 from app import models as m, schema as s
 
-from api.controllers.push_notification import create_new_job_notification
+from api import controllers as c
+from api.controllers.push_notification import add_notification_recipients, create_new_job_notification
+from api.dependency.user import user_principals
 from config import config
+from test_api.utils import FakeExpoServer, count_queries
 
 
 CFG = config()
@@ -69,6 +74,77 @@ def test_get_my_push_notifications(client: TestClient, db: Session, auth_header:
     assert notifications[0].uuid == notification.uuid
 
 
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_get_notifications_inbox(client: TestClient, db: Session, auth_header: dict[str, str]):
+    NOTIFICATIONS_COUNT = 7
+    LIMIT = 3
+    user = db.scalar(sa.select(m.User))
+    assert user
+    other_user = db.scalar(sa.select(m.User).where(m.User.id != user.id))
+    assert other_user
+    job = db.scalar(sa.select(m.Job))
+    assert job
+    devices = [m.Device(push_token=f"token_{i}", device_id=f"device_{i}", user_id=user.id) for i in range(2)]
+    other_device = m.Device(push_token="other_token", device_id="other_device", user_id=other_user.id)
+    db.add_all(devices + [other_device])
+    notifications = []
+    for i in range(NOTIFICATIONS_COUNT):
+        notification = m.PushNotification(
+            title=f"Test {i}", content="Test", n_type=s.PushNotificationType.job_created.value, created_by_id=1, job=job
+        )
+        # sent to both devices of user, but listed once
+        notification.sent_to.extend(devices)
+        if i % 2:
+            notification.read_by.append(user)
+        notifications.append(notification)
+    not_my_notification = m.PushNotification(
+        title="Other", content="Test", n_type=s.PushNotificationType.job_created.value, created_by_id=1, job=job
+    )
+    not_my_notification.sent_to.append(other_device)
+    db.add_all(notifications + [not_my_notification])
+    db.commit()
+
+    # user principal is loaded (and cached) by the first request
+    user_principals.clear()
+    assert client.get("/api/push_notifications/unread-count", headers=auth_header).status_code == 200
+
+    received: list[s.PushNotificationOut] = []
+    cursor = None
+    while True:
+        params: dict = {"limit": LIMIT}
+        if cursor:
+            params["cursor"] = cursor
+        with count_queries(db) as statements:
+            response = client.get("/api/push_notifications/inbox", headers=auth_header, params=params)
+        assert response.status_code == 200
+        # user and page of notifications with jobs and read state
+        assert len(statements) <= 2
+        page = s.PushNotificationsList.model_validate(response.json())
+        assert len(page.items) <= LIMIT
+        received += page.items
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    assert [notification.uuid for notification in received] == [n.uuid for n in reversed(notifications)]
+    read_by_me = {notification.uuid: notification.read_by_me for notification in received}
+    assert read_by_me == {n.uuid: bool(i % 2) for i, n in enumerate(notifications)}
+    assert received[0].job_uuid == job.uuid
+    assert received[0].job_title == job.title
+
+    # list without pagination is kept for old clients
+    response = client.get("/api/push_notifications", headers=auth_header)
+    assert response.status_code == 200
+    assert [notification["uuid"] for notification in response.json()] == [n.uuid for n in received]
+
+    response = client.get("/api/push_notifications/unread-count", headers=auth_header)
+    assert response.status_code == 200
+    assert s.UnreadNotificationsCount.model_validate(response.json()).count == (NOTIFICATIONS_COUNT + 1) // 2
+
+    response = client.get("/api/push_notifications/inbox", headers=auth_header, params={"cursor": "invalid"})
+    assert response.status_code == 400
+
+
 @pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
 def test_mark_notification_as_read(client: TestClient, db: Session, auth_header: dict[str, str]):
     user = db.scalar(sa.select(m.User))
@@ -103,3 +179,168 @@ def test_mark_notification_as_read(client: TestClient, db: Session, auth_header:
     assert response.status_code == 200
     notification_res = s.PushNotificationOut.model_validate(response.json())
     assert notification_res.read_by_me
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_dispatch_push_notifications(db: Session, expo_server: FakeExpoServer):
+    DEVICES_PER_USER = 2
+    users = db.scalars(sa.select(m.User)).all()
+    for user in users:
+        for i in range(DEVICES_PER_USER):
+            push_token = f"ExponentPushToken[{user.id}_{i}]"
+            db.add(m.Device(push_token=push_token, device_id=f"device_{user.id}_{i}", user_id=user.id))
+    db.add(m.Device(push_token="invalid", device_id="invalid", user_id=users[0].id))
+    db.commit()
+    devices_count = len(users) * DEVICES_PER_USER
+    assert CFG.PUSH_CHUNK_SIZE * 2 < devices_count < CFG.PUSH_DISPATCH_BATCH
+
+    job = db.scalar(sa.select(m.Job))
+    assert job
+    notification = m.PushNotification(
+        title="Test", content="Test", n_type=s.PushNotificationType.job_created.value, created_by_id=1, job=job
+    )
+    db.add(notification)
+    add_notification_recipients(db, notification, sa.select(m.User.id))
+    db.commit()
+
+    outbox = m.notification_devices
+
+    def get_statuses() -> dict[str, int]:
+        rows = db.execute(sa.select(outbox.c.status, sa.func.count()).group_by(outbox.c.status)).all()
+        return {row[0]: row[1] for row in rows}
+
+    assert get_statuses() == {s.PushDeliveryStatus.PENDING.value: devices_count + 1}
+
+    # messages are sent in order of outbox
+    push_tokens = db.scalars(
+        sa.select(m.Device.push_token)
+        .join(outbox, outbox.c.device_id == m.Device.id)
+        .where(m.Device.push_token != "invalid")
+        .order_by(outbox.c.next_attempt_at, outbox.c.id)
+    ).all()
+
+    # request of the second chunk fails, one token (of the first chunk) is not registered
+    expo_server.failing_tokens.add(push_tokens[CFG.PUSH_CHUNK_SIZE])
+    expo_server.unregistered_tokens.add(push_tokens[0])
+    assert c.dispatch_push_notifications(db) == devices_count
+    assert all(size <= CFG.PUSH_CHUNK_SIZE for size in expo_server.requests_sizes)
+    # chunks are sent concurrently
+    assert 1 < expo_server.max_in_flight <= CFG.PUSH_MAX_WORKERS
+    assert get_statuses() == {
+        s.PushDeliveryStatus.SENT.value: devices_count - CFG.PUSH_CHUNK_SIZE - 1,
+        s.PushDeliveryStatus.PENDING.value: CFG.PUSH_CHUNK_SIZE,
+        s.PushDeliveryStatus.FAILED.value: 2,
+    }
+    errors = db.scalars(sa.select(outbox.c.error).where(outbox.c.status == s.PushDeliveryStatus.FAILED.value)).all()
+    assert set(errors) == {"DeviceNotRegistered", "Invalid push token"}
+    assert db.scalar(sa.select(sa.func.count()).where(outbox.c.ticket_id != "")) == get_statuses()["sent"]
+
+    # failed chunk waits for retry
+    assert c.dispatch_push_notifications(db) == 0
+    retry_at = db.scalar(sa.select(sa.func.min(outbox.c.next_attempt_at)).where(outbox.c.status == "pending"))
+    assert retry_at > datetime.utcnow() + timedelta(seconds=CFG.PUSH_RETRY_BACKOFF - 5)
+
+    db.execute(sa.update(outbox).values(next_attempt_at=datetime.utcnow()))
+    db.commit()
+    assert c.dispatch_push_notifications(db) == CFG.PUSH_CHUNK_SIZE
+    assert get_statuses() == {s.PushDeliveryStatus.SENT.value: devices_count - 1, s.PushDeliveryStatus.FAILED.value: 2}
+    assert len(expo_server.messages) == devices_count
+    assert expo_server.messages[0]["data"]["original_uuid"] == notification.uuid
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_check_push_receipts(db: Session, expo_server: FakeExpoServer):
+    users = db.scalars(sa.select(m.User)).all()
+    for user in users:
+        db.add(m.Device(push_token=f"ExponentPushToken[{user.id}]", device_id=f"device_{user.id}", user_id=user.id))
+    db.commit()
+
+    job = db.scalar(sa.select(m.Job))
+    assert job
+    notification = m.PushNotification(
+        title="Test", content="Test", n_type=s.PushNotificationType.job_created.value, created_by_id=1, job=job
+    )
+    db.add(notification)
+    add_notification_recipients(db, notification, sa.select(m.User.id))
+    db.commit()
+    assert c.dispatch_push_notifications(db) == len(users)
+    db.refresh(notification)
+    assert notification.sent_count == len(users)
+    assert notification.delivered_count == 0
+
+    # receipts are not ready right after sending
+    assert c.check_push_receipts(db) == 0
+
+    outbox = m.notification_devices
+    db.execute(sa.update(outbox).values(next_attempt_at=datetime.utcnow()))
+    db.commit()
+    unregistered_token = f"ExponentPushToken[{users[0].id}]"
+    expo_server.unregistered_tokens.add(unregistered_token)
+    expo_server.not_ready_receipts.add(f"ExponentPushToken[{users[1].id}]")
+
+    assert c.check_push_receipts(db) == len(users)
+    # all receipts are fetched with one request
+    assert expo_server.receipts_requests_sizes == [len(users)]
+    rows = db.execute(sa.select(outbox.c.status, sa.func.count()).group_by(outbox.c.status)).all()
+    assert {row[0]: row[1] for row in rows} == {
+        s.PushDeliveryStatus.DELIVERED.value: len(users) - 2,
+        s.PushDeliveryStatus.SENT.value: 1,
+        s.PushDeliveryStatus.FAILED.value: 1,
+    }
+    db.refresh(notification)
+    assert notification.sent_count == len(users) - 1
+    assert notification.delivered_count == len(users) - 2
+    assert notification.failed_count == 1
+
+    # dead token is pruned, next notifications are not sent to it
+    device = db.scalar(sa.select(m.Device).where(m.Device.push_token == unregistered_token))
+    assert device and device.is_deleted
+    next_notification = create_new_job_notification(db, job)
+    assert device not in next_notification.sent_to
+
+    # receipt which is not ready is checked later
+    assert c.check_push_receipts(db) == 0
+    retry_at = db.scalar(sa.select(outbox.c.next_attempt_at).where(outbox.c.status == s.PushDeliveryStatus.SENT.value))
+    assert retry_at and retry_at > datetime.utcnow() + timedelta(seconds=CFG.PUSH_RECEIPT_DELAY - 5)
+
+    # messages sent before outbox (without ticket) are not polled
+    db.execute(sa.update(outbox).values(ticket_id="", next_attempt_at=datetime.utcnow()))
+    db.commit()
+    assert c.check_push_receipts(db) == 0
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_mark_notifications_as_read(client: TestClient, db: Session, auth_header: dict[str, str]):
+    user = db.scalar(sa.select(m.User))
+    assert user
+    other_user = db.scalar(sa.select(m.User).where(m.User.id != user.id))
+    assert other_user
+    job = db.scalar(sa.select(m.Job))
+    assert job
+    device = m.Device(push_token="token", device_id="device", user_id=user.id)
+    other_device = m.Device(push_token="other_token", device_id="other_device", user_id=other_user.id)
+    notifications = []
+    for i in range(5):
+        notification = m.PushNotification(
+            title=f"Test {i}", content="Test", n_type=s.PushNotificationType.job_created.value, created_by_id=1, job=job
+        )
+        notification.sent_to.extend([device, other_device])
+        notifications.append(notification)
+    db.add_all(notifications)
+    db.commit()
+
+    uuids = [notifications[0].uuid, notifications[1].uuid]
+    for _ in range(2):
+        # already read notifications are skipped
+        response = client.put("/api/push_notifications/read", headers=auth_header, json={"uuids": uuids})
+        assert response.status_code == 200
+        assert s.UnreadNotificationsCount.model_validate(response.json()).count == len(notifications) - len(uuids)
+
+    response = client.put("/api/push_notifications/read", headers=auth_header, json={})
+    assert response.status_code == 200
+    assert s.UnreadNotificationsCount.model_validate(response.json()).count == 0
+
+    readers = db.execute(sa.select(m.notification_users.c.user_id, m.notification_users.c.notification_id)).all()
+    assert sorted(readers) == sorted((user.id, notification.id) for notification in notifications)
+    assert c.notification_is_read_by_user(notifications[0], user.id, db)
+    assert not c.notification_is_read_by_user(notifications[0], other_user.id, db)
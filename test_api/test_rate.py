@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 import sqlalchemy as sa
 from sqlalchemy import select
 
+from api import controllers as c
 from app import models as m
 from app import schema as s
 from config import config
@@ -22,6 +23,7 @@ def test_create_rate(client: TestClient, auth_header: dict[str, str], full_db: S
 
     job_worker = full_db.scalar(select(m.User).where(m.User.id == current_user_job.worker_id))
     assert job_worker
+    worker_rates_count = job_worker.owned_rates_count
 
     data: s.RateIn = s.RateIn(
         rate=5,
@@ -44,6 +46,11 @@ def test_create_rate(client: TestClient, auth_header: dict[str, str], full_db: S
     assert response.json()["giver"]["uuid"] == current_user.uuid
     rate_1_uuid = response.json()["uuid"]
     assert rate_1_uuid
+    full_db.refresh(job_worker)
+    assert job_worker.owned_rates_count == worker_rates_count + 1
+    worker_rates = full_db.scalars(select(m.Rate.rate).where(m.Rate.receiver_id == job_worker.id)).all()
+    assert job_worker.rates_sum == sum(worker_rates)
+    assert job_worker.average_rate == pytest.approx(sum(worker_rates) / len(worker_rates))
 
     # get rate 1 by uuid
     response = client.get(f"/api/rates/{rate_1_uuid}", headers=auth_header)
@@ -113,3 +120,22 @@ def test_create_rate(client: TestClient, auth_header: dict[str, str], full_db: S
     response_4 = client.get(f"/api/rates/{specialist_uuid_2}/specialist", headers=authorized_header)
     assert response_4.status_code == status.HTTP_200_OK
     assert len(response_4.json()["items"]) == len(db_rates_worker)
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_fix_users_rates(db: Session):
+    user = db.scalar(select(m.User).where(m.User.rates_sum > 0))
+    assert user
+    user_rates = db.scalars(select(m.Rate.rate).where(m.Rate.receiver_id == user.id)).all()
+
+    user.owned_rates_count = 0
+    user.rates_sum = 0
+    user.average_rate = 0
+    db.commit()
+
+    c.fix_users_rates(db)
+    db.commit()
+
+    assert user.owned_rates_count == len(user_rates)
+    assert user.rates_sum == sum(user_rates)
+    assert user.average_rate == pytest.approx(sum(user_rates) / len(user_rates))
@@ -1,18 +1,23 @@
 from typing import Sequence
 import pytest
+import requests
 import sqlalchemy as sa
 from fastapi import status
 from fastapi.testclient import TestClient
+from mypy_boto3_s3 import S3Client
 from sqlalchemy.orm import Session
 from unittest import mock
 from api import app
+from api.controllers.user import create_out_search_users
 from api.dependency.user import get_current_user
 
 from app import models as m
+from app.controllers import region_names
 from app import schema as s
 from app.schema.language import Language
 from config import config
 from test_api.test_auth import DUMMY_GOOGLE_VALIDATION, DUMMY_IOS_VALIDATION
+from test_api.utils import count_queries
 
 CFG = config()
 
@@ -194,6 +199,16 @@ def test_get_users_by_query_params(client: TestClient, auth_header: dict[str, st
     data = s.UsersOut.model_validate(response.json())
     assert len(data.items) > 0
 
+    # Order by rates count
+    response = client.get(f"/api/users?order_by={s.UsersOrderBy.OWNED_RATES_COUNT.value}", headers=auth_header)
+    assert response.status_code == status.HTTP_200_OK
+    data = s.UsersOut.model_validate(response.json())
+    rates_counts = [user.owned_rates_count for user in data.items]
+    assert rates_counts == sorted(rates_counts, reverse=True)
+    for user in data.items:
+        rates_count = db.scalar(sa.select(sa.func.count(m.Rate.id)).where(m.Rate.receiver_id == user.id))
+        assert user.owned_rates_count == rates_count
+
     # Test no results
     query_data = s.UsersIn(query="Тест")
     response = client.get(f"/api/users?query={query_data.query}", headers=auth_header)
@@ -362,3 +377,61 @@ def test_update_favorite_experts(client: TestClient, auth_header: dict[str, str]
 
     # reset user dependency
     app.dependency_overrides[get_current_user] = get_current_user
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_create_out_search_users_queries_count(db: Session):
+    me = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert me
+    expert = db.scalar(sa.select(m.User).where(m.User.id != me.id))
+    assert expert
+    me.favorite_experts.append(expert)
+    db.commit()
+
+    users: Sequence[m.User] = db.scalars(sa.select(m.User).where(m.User.id != me.id).order_by(m.User.id)).all()
+    assert len(users) > 2
+    assert me.id
+    region_names.refresh(db)
+
+    with count_queries(db) as few_users_queries:
+        create_out_search_users(users[:2], Language.UA, db, me)
+    with count_queries(db) as all_users_queries:
+        users_out = create_out_search_users(users, Language.UA, db, me)
+
+    # queries count doesn't depend on the number of users
+    assert len(all_users_queries) == len(few_users_queries) <= 4
+
+    for user, user_out in zip(users, users_out):
+        assert user_out.uuid == user.uuid
+        assert {service.uuid for service in user_out.services} == {service.uuid for service in user.services}
+        assert {location.uuid for location in user_out.locations} == {location.uuid for location in user.locations}
+        assert user_out.owned_rates_count == user.owned_rates_count
+        assert user_out.is_favorite == (user in me.favorite_experts)
+    assert any(user_out.is_favorite for user_out in users_out)
+
+
+@pytest.mark.skipif(not CFG.IS_API, reason="API is not enabled")
+def test_presigned_avatar_upload(client: TestClient, auth_header: dict[str, str], db: Session, s3_client: S3Client):
+    with open("test_api/test_data/image_2.png", "rb") as image:
+        image_data = image.read()
+    file_in = s.FileUploadIn(filename="avatar.png", content_type="image/png", size=len(image_data)).model_dump()
+
+    # job file can not be set as avatar
+    response = client.post("/api/jobs/files/upload-url", headers=auth_header, json=file_in)
+    job_upload = s.FileUploadOut.model_validate(response.json())
+    assert requests.post(job_upload.url, data=job_upload.fields, files={"file": image_data}).ok
+    response = client.put(
+        "/api/users/avatar/complete", headers=auth_header, json={"upload_token": job_upload.upload_token}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.post("/api/users/avatar/upload-url", headers=auth_header, json=file_in)
+    assert response.status_code == status.HTTP_201_CREATED
+    upload = s.FileUploadOut.model_validate(response.json())
+    assert requests.post(upload.url, data=upload.fields, files={"file": image_data}).ok
+
+    response = client.put("/api/users/avatar/complete", headers=auth_header, json={"upload_token": upload.upload_token})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["avatar_url"].endswith(upload.key)
+    user = db.scalar(sa.select(m.User).where(m.User.id == 1))
+    assert user and user.avatar and user.avatar.key == upload.key
@@ -1,5 +1,240 @@
-from typing import Any
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Generator
+from uuid import uuid4
+
+import jwt
+import sqlalchemy as sa
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from sqlalchemy.orm import Session
 
 
 def do_nothing(*_: list[Any]) -> None:
     return None
+
+
+@contextmanager
+def count_queries(db: Session) -> Generator[list[str], None, None]:
+    """Collects SQL statements executed through the session engine"""
+
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class FakeExpoServer:
+    """Local Expo push API: accepts messages, answers with tickets and receipts and can fail requests"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages: list[dict] = []
+        self.requests_sizes: list[int] = []
+        self.failing_tokens: set[str] = set()  # next send request with one of tokens is answered with 503
+        self.unregistered_tokens: set[str] = set()
+        self.tickets: dict[str, str] = {}  # ticket id -> push token
+        self.not_ready_receipts: set[str] = set()  # push tokens without receipts yet
+        self.receipts_requests_sizes: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.create_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_tickets(self, messages: list[dict]) -> list[dict]:
+        tickets = []
+        for message in messages:
+            if message["to"] in self.unregistered_tokens:
+                tickets.append(
+                    {
+                        "status": "error",
+                        "message": f"{message['to']} is not a registered push notification recipient",
+                        "details": {"error": "DeviceNotRegistered"},
+                    }
+                )
+            else:
+                ticket_id = str(uuid4())
+                self.tickets[ticket_id] = message["to"]
+                tickets.append({"status": "ok", "id": ticket_id})
+        return tickets
+
+    def get_receipts(self, ids: list[str]) -> dict[str, dict]:
+        receipts = {}
+        for ticket_id in ids:
+            push_token = self.tickets.get(ticket_id)
+            if push_token is None or push_token in self.not_ready_receipts:
+                continue
+            if push_token in self.unregistered_tokens:
+                receipts[ticket_id] = {
+                    "status": "error",
+                    "message": f"{push_token} is not a registered push notification recipient",
+                    "details": {"error": "DeviceNotRegistered"},
+                }
+            else:
+                receipts[ticket_id] = {"status": "ok"}
+        return receipts
+
+    def create_handler(self) -> type[BaseHTTPRequestHandler]:
+        expo = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any):
+                pass
+
+            def send_json(self, code: int, data: Any):
+                body = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with expo.lock:
+                    expo.in_flight += 1
+                    expo.max_in_flight = max(expo.max_in_flight, expo.in_flight)
+                    failed_tokens = {
+                        message["to"] for message in data if isinstance(message, dict)
+                    } & expo.failing_tokens
+                    expo.failing_tokens -= failed_tokens
+                    is_failed = bool(failed_tokens)
+                time.sleep(expo.delay)
+                with expo.lock:
+                    expo.in_flight -= 1
+
+                if is_failed:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if self.path.endswith("/push/send"):
+                    with expo.lock:
+                        expo.messages += data
+                        expo.requests_sizes.append(len(data))
+                    self.send_json(200, {"data": expo.get_tickets(data)})
+                    return
+
+                if self.path.endswith("/push/getReceipts"):
+                    with expo.lock:
+                        expo.receipts_requests_sizes.append(len(data["ids"]))
+                        receipts = expo.get_receipts(data["ids"])
+                    self.send_json(200, {"data": receipts})
+                    return
+
+                self.send_json(404, {"errors": [{"code": "NOT_FOUND", "message": self.path}]})
+
+        return Handler
+
+
+class FakeKeysServer:
+    """Local public keys of identity providers: Apple JWKS (/apple/keys) and Google certs (/google/certs)
+
+    Signs Apple and Google id tokens with its private keys, so logins are verified without outside services.
+    """
+
+    def __init__(self):
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.requests_count: dict[str, int] = {"/apple/keys": 0, "/google/certs": 0}
+        # answers with not JSON body (e.g. error page of proxy)
+        self.invalid_json = False
+        self.lock = threading.Lock()
+        self.kid = self.rotate_keys()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.create_handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def rotate_keys(self) -> str:
+        """Adds new signing key, returns its id"""
+        self.kid = uuid4().hex
+        self.keys[self.kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return self.kid
+
+    def get_jwks(self) -> dict:
+        keys = []
+        for kid, private_key in self.keys.items():
+            key_data = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            keys.append(dict(key_data, kid=kid, use="sig", alg="RS256"))
+        return {"keys": keys}
+
+    def get_certs(self) -> dict[str, str]:
+        certs = {}
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "kraftjar.test")])
+        now = datetime.utcnow()
+        for kid, private_key in self.keys.items():
+            cert = (
+                x509.CertificateBuilder()
+                .subject_name(name)
+                .issuer_name(name)
+                .public_key(private_key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - timedelta(days=1))
+                .not_valid_after(now + timedelta(days=1))
+                .sign(private_key, hashes.SHA256())
+            )
+            certs[kid] = cert.public_bytes(serialization.Encoding.PEM).decode()
+        return certs
+
+    def sign(self, claims: dict[str, Any], kid: str | None = None) -> str:
+        kid = kid or self.kid
+        now = int(time.time())
+        return jwt.encode(dict(dict(iat=now, exp=now + 600), **claims), self.keys[kid], "RS256", headers={"kid": kid})
+
+    def create_handler(self) -> type[BaseHTTPRequestHandler]:
+        keys_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any):
+                pass
+
+            def do_GET(self):
+                if self.path == "/apple/keys":
+                    data: dict = keys_server.get_jwks()
+                elif self.path == "/google/certs":
+                    data = keys_server.get_certs()
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                with keys_server.lock:
+                    keys_server.requests_count[self.path] += 1
+                body = b"<html></html>" if keys_server.invalid_json else json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler